@@ -0,0 +1 @@
+"""Performance benchmarks for the ThanimamPro and UGP hot paths."""
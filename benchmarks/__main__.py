@@ -0,0 +1,85 @@
+"""
+Run the benchmarks and compare them with the stored baseline.
+
+    python -m benchmarks                  # run all, fail on regressions
+    python -m benchmarks -k predict       # only names containing "predict"
+    python -m benchmarks --update         # record the current numbers as the baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks import cases  # noqa: F401 registers the benchmark cases
+from benchmarks.harness import (
+    BASELINE_PATH,
+    BENCHMARKS,
+    DEFAULT_THRESHOLD,
+    compare,
+    format_row,
+    load_baseline,
+    measure,
+    save_baseline,
+)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ThanimamPro / UGP benchmarks")
+    parser.add_argument("-k", "--filter", action="append", default=None, help="Run cases whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed relative slowdown or memory growth before a case counts as a regression",
+    )
+    parser.add_argument("--repeat", type=int, default=None, help="Override the timed repetitions per case")
+    parser.add_argument("--update", action="store_true", help="Write the results to the baseline instead of comparing")
+    parser.add_argument("--list", action="store_true", help="List the benchmark names and exit")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    selected = [
+        case for name, case in BENCHMARKS.items() if not args.filter or any(part in name for part in args.filter)
+    ]
+    if args.list:
+        for case in selected:
+            print(case.name)
+        return 0
+    if not selected:
+        print("No benchmarks match the filter", file=sys.stderr)
+        return 2
+
+    baseline = load_baseline(args.baseline)
+    print(f"{'benchmark':<40} {'median':>14} {'best':>14} {'peak':>13} {'vs base':>8}")
+    measurements = []
+    for case in selected:
+        result = measure(case, args.repeat)
+        measurements.append(result)
+        print(format_row(result, baseline["results"].get(case.name)), flush=True)
+
+    if args.update:
+        save_baseline(measurements, args.baseline)
+        print(f"Updated {len(measurements)} entries in {args.baseline}")
+        return 0
+
+    missing = [m.name for m in measurements if m.name not in baseline["results"]]
+    if missing:
+        print(f"No baseline for: {', '.join(missing)} (run with --update to record)")
+    regressions = compare(measurements, baseline, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name} {regression.metric}: "
+            f"{regression.baseline:.4g} -> {regression.current:.4g} (x{regression.ratio:.2f})",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Benchmark cases. Inputs are synthetic and seeded so every run measures the same work.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.harness import benchmark
+from thanimampro_api.database import LiteratureStore, search_literature
+from thanimampro_api.inverse import suggest_synthesis_conditions
+from thanimampro_api.mapper import build_adaptive_property_map, build_bandgap_map
+from thanimampro_api.predict import predict_properties, predict_properties_batch
+from thanimampro_api.schemas import DesiredPropertyTargets, SynthesisInput
+from thanimampro_api.sensitivity import morris_effects, sobol_indices
+from thanimampro_api.structure import analyze_structure_file
+from thanimampro_api.surrogate import fit_surrogate
+
+ROOT = Path(__file__).resolve().parents[1]
+SAMPLES = ROOT / "samples"
+# Scratch files for the IO cases; removed with the interpreter.
+_SCRATCH = tempfile.TemporaryDirectory(prefix="thanimampro-bench-")
+SCRATCH = Path(_SCRATCH.name)
+
+BASELINE = SynthesisInput(
+    temperature_c=600.0,
+    heating_rate_c_min=5.0,
+    annealing_time_h=2.0,
+    atmosphere="air",
+    precursor_ratio=1.0,
+    pH=7.0,
+    solvent_type="water",
+    concentration_m=0.5,
+    pressure_bar=1.0,
+    milling_time_h=0.0,
+    calcination_time_h=2.0,
+    method="sol-gel",
+)
+
+
+def _rng() -> np.random.Generator:
+    return np.random.default_rng(20240601)
+
+
+# --- property prediction -------------------------------------------------------
+
+
+@benchmark("predict.scalar_x1000")
+def _predict_scalar():
+    inputs = [replace(BASELINE, temperature_c=400.0 + i * 0.5, pH=3.0 + (i % 9)) for i in range(1000)]
+    return lambda: [predict_properties(s) for s in inputs]
+
+
+@benchmark("predict.batch_1m")
+def _predict_batch():
+    rng = _rng()
+    columns = {"temperature_c": rng.uniform(300, 900, 1_000_000), "pH": rng.uniform(2, 12, 1_000_000)}
+    return lambda: predict_properties_batch(columns, None, baseline=BASELINE)
+
+
+for _points in (25, 100, 400):
+
+    @benchmark(f"mapper.bandgap_{_points}x{_points}", repeat=3 if _points > 100 else 5)
+    def _bandgap_map(points: int = _points):
+        return lambda: build_bandgap_map(BASELINE, None, 400.0, 900.0, 2.0, 12.0, points=points)
+
+
+@benchmark("mapper.adaptive_conductivity_513")
+def _adaptive_map():
+    # Same resolution as a uniform 513x513 grid; conductivity's exponential and clamps need refinement.
+    axes = {"temperature_c": (100.0, 1500.0), "pH": (0.0, 14.0)}
+    return lambda: build_adaptive_property_map(BASELINE, None, axes, "conductivity_s_cm", max_points=513)
+
+
+@benchmark("inverse.suggest_top5")
+def _suggest():
+    desired = DesiredPropertyTargets(target_band_gap_ev=2.9, min_surface_area_m2_g=40.0, max_particle_size_nm=35.0)
+    return lambda: suggest_synthesis_conditions(BASELINE, desired, top_k=5)
+
+
+@benchmark("sensitivity.sobol_786k", repeat=3)
+def _sobol():
+    # 2**16 base samples x (10 parameters + 2) evaluations.
+    return lambda: sobol_indices(BASELINE, samples=2**16)
+
+
+@benchmark("sensitivity.morris_220k", repeat=3)
+def _morris():
+    return lambda: morris_effects(BASELINE, trajectories=20_000)
+
+
+# --- structure analysis ----------------------------------------------------------
+
+
+def _synthetic_cif(sites: int) -> bytes:
+    rng = _rng()
+    xyz = rng.random((sites, 3))
+    rows = "\n".join(f"Ti{i} Ti {x:.5f} {y:.5f} {z:.5f} 1.0" for i, (x, y, z) in enumerate(xyz))
+    return (SAMPLES / "sample_tio2_anatase.cif").read_bytes() + (
+        "\nloop_\n_atom_site_label\n_atom_site_type_symbol\n_atom_site_fract_x\n"
+        "_atom_site_fract_y\n_atom_site_fract_z\n_atom_site_occupancy\n" + rows + "\n"
+    ).encode()
+
+
+def _synthetic_pattern(points: int) -> bytes:
+    rng = _rng()
+    two_theta = np.linspace(10.0, 90.0, points)
+    intensity = 50.0 + rng.normal(0.0, 2.0, points)
+    for center in (25.3, 37.8, 48.0, 53.9, 55.1, 62.7, 68.8, 75.0):
+        intensity += 900.0 * np.exp(-0.5 * ((two_theta - center) / 0.12) ** 2)
+    body = "\n".join(f"{t:.4f} {y:.2f}" for t, y in zip(two_theta, intensity))
+    return ("# synthetic anatase pattern\n# phase: anatase\n" + body + "\n").encode()
+
+
+@benchmark("structure.cif_small")
+def _cif_small():
+    content = (SAMPLES / "sample_tio2_anatase.cif").read_bytes()
+    return lambda: analyze_structure_file("sample.cif", content)
+
+
+@benchmark("structure.cif_50k_sites", repeat=3)
+def _cif_large():
+    content = _synthetic_cif(50_000)
+    return lambda: analyze_structure_file("large.cif", content)
+
+
+@benchmark("structure.xrd_small")
+def _xrd_small():
+    content = (SAMPLES / "sample_nife2o4_spinel.xy").read_bytes()
+    return lambda: analyze_structure_file("sample.xy", content)
+
+
+@benchmark("structure.xrd_200k_points", repeat=3)
+def _xrd_large():
+    content = _synthetic_pattern(200_000)
+    return lambda: analyze_structure_file("large.xy", content)
+
+
+# --- literature search -----------------------------------------------------------
+
+_LITERATURE_ROWS = 1_000_000
+
+
+def _literature_frame() -> pd.DataFrame:
+    rng = _rng()
+    systems = np.array(["TiO2", "ZnO", "SrTiO3", "NiFe2O4", "BiVO4", "WO3", "Fe2O3", "CeO2", "g-C3N4", "CdS"])
+    methods = np.array(["sol-gel", "hydrothermal", "co-precipitation", "solid-state", "combustion", "other"])
+    n = _LITERATURE_ROWS
+    return pd.DataFrame(
+        {
+            "material_system": systems[rng.integers(0, systems.size, n)],
+            "method": methods[rng.integers(0, methods.size, n)],
+            "temperature_c": rng.uniform(300, 1000, n).round(0),
+            "pH": rng.uniform(1, 13, n).round(1),
+            "band_gap_ev": rng.uniform(1.5, 4.0, n).round(2),
+            "surface_area_m2_g": rng.uniform(5, 200, n).round(1),
+            "doi": np.char.add("10.1000/bench.", np.arange(n).astype(str)),
+        }
+    )
+
+
+@benchmark("literature.search_frame_1m", repeat=3)
+def _search_frame():
+    frame = _literature_frame()
+    return lambda: search_literature(frame, "srtio3", "hydro", 3.0, 3.3)
+
+
+@benchmark("literature.search_store_1m", repeat=3)
+def _search_store():
+    store = LiteratureStore.from_frame(_literature_frame())
+    return lambda: search_literature(store, "srtio3", "hydro", 3.0, 3.3)
+
+
+@benchmark("surrogate.fit_1m", repeat=3)
+def _surrogate_fit():
+    frame = _literature_frame()
+    return lambda: fit_surrogate(frame)
+
+
+@benchmark("surrogate.predict_batch_1m", repeat=3)
+def _surrogate_predict():
+    frame = _literature_frame()
+    model = fit_surrogate(frame.head(100_000))
+    return lambda: model.predict_batch(frame, baseline=BASELINE, return_std=True)
+
+
+# --- UGP -------------------------------------------------------------------------
+
+
+def _ugp_dataset(size: int):
+    from ugp.models import ColumnarDataset, MineralAnalysis, SampleMetadata, ThermoDataset
+
+    rng = _rng()
+    oxides = ("SiO2", "Al2O3", "FeO", "MgO", "CaO", "Na2O", "K2O", "TiO2")
+    values = rng.uniform(0.1, 60.0, (size, len(oxides)))
+    analyses = [
+        MineralAnalysis(
+            mineral=("garnet", "biotite", "plagioclase")[i % 3],
+            oxides_wt_pct=dict(zip(oxides, row.tolist())),
+            metadata=SampleMetadata(sample_id=f"S{i // 20}"),
+        )
+        for i, row in enumerate(values)
+    ]
+    thermo = ThermoDataset(analyses=analyses)
+    return thermo, ColumnarDataset.from_dataset(thermo)
+
+
+def _silica_engine():
+    from ugp.calculators.base import CalculatorEngine
+    from ugp.models import PTEnsemble, PTPoint
+
+    class SilicaEngine(CalculatorEngine):
+        def run(self, dataset):
+            silica = float(np.mean([a.oxides_wt_pct["SiO2"] for a in dataset.analyses]))
+            return PTEnsemble(results=[PTPoint(silica / 50.0, 10.0 * silica, "bench")])
+
+    return SilicaEngine(None)
+
+
+@benchmark("ugp.bootstrap_500x500", repeat=3)
+def _bootstrap():
+    from ugp.models import UncertaintyConfig
+    from ugp.uncertainty.bootstrap import bootstrap_ensemble
+
+    _, dataset = _ugp_dataset(500)
+    config = UncertaintyConfig(bootstrap_iterations=500, random_seed=7, workers=1, executor="serial")
+    engine = _silica_engine()
+    return lambda: bootstrap_ensemble(engine, dataset, config)
+
+
+_IO_ROWS = 200_000
+
+
+def _write_inputs(suffix: str) -> Path:
+    from ugp.io.binary import write_columnar
+
+    path = SCRATCH / f"dataset{suffix}"
+    if path.exists():
+        return path
+    thermo, columnar = _ugp_dataset(_IO_ROWS)
+    if suffix == ".ugpc":
+        write_columnar(columnar, path)
+    elif suffix == ".csv":
+        frame = pd.DataFrame(columnar.values, columns=list(columnar.oxides))
+        frame.insert(0, "sample_id", [columnar.sample_metadata[s].sample_id for s in columnar.samples])
+        frame.insert(0, "mineral", [columnar.mineral_names[m] for m in columnar.minerals])
+        frame.to_csv(path, index=False)
+    else:
+        with open(path, "w", encoding="utf-8") as handle:
+            for a in thermo.analyses:
+                metadata = {"sample_id": a.metadata.sample_id}
+                handle.write(json.dumps({"mineral": a.mineral, "oxides_wt_pct": a.oxides_wt_pct, "metadata": metadata}))
+                handle.write("\n")
+    return path
+
+
+for _suffix in (".ndjson", ".csv", ".ugpc"):
+
+    @benchmark(f"ugp.io.read{_suffix}_200k", repeat=3)
+    def _read(suffix: str = _suffix):
+        from ugp.io.reader import read_dataset
+
+        path = _write_inputs(suffix)
+        return lambda: read_dataset(str(path))
+
+
+@benchmark("ugp.io.write.ugpc_200k", repeat=3)
+def _write_columnar():
+    from ugp.io.binary import write_columnar
+
+    _, columnar = _ugp_dataset(_IO_ROWS)
+    return lambda: write_columnar(columnar, SCRATCH / "written.ugpc")
+
+
+def _points(n: int):
+    from ugp.models import PTPoint
+
+    rng = _rng()
+    pressures, temperatures = rng.normal(0.8, 0.05, n), rng.normal(650.0, 20.0, n)
+    return [
+        PTPoint(float(p), float(t), "bench", {"iteration": i // 100})
+        for i, (p, t) in enumerate(zip(pressures, temperatures))
+    ]
+
+
+for _suffix in (".ndjson", ".ugpr"):
+
+    @benchmark(f"ugp.io.write_result{_suffix}_200k", repeat=3)
+    def _write_result(suffix: str = _suffix):
+        from ugp.io.writer import open_result_writer
+
+        points = _points(_IO_ROWS)
+
+        def run() -> None:
+            with open_result_writer(SCRATCH / f"result{suffix}") as writer:
+                writer.write_points(points)
+
+        return run
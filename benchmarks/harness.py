@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.3
+# Differences below these floors are timer or allocator noise, never regressions.
+TIME_FLOOR_S = 0.002
+MEMORY_FLOOR_MIB = 1.0
+
+Setup = Callable[[], Callable[[], Any]]
+
+
+@dataclass
+class Benchmark:
+    """``setup`` builds the inputs (untimed) and returns the zero-argument call to measure."""
+
+    name: str
+    setup: Setup
+    repeat: int = 5
+
+
+@dataclass
+class Measurement:
+    name: str
+    median_s: float
+    min_s: float
+    peak_mib: float
+    repeat: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("name")
+        return data
+
+
+@dataclass
+class Comparison:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, repeat: int = 5) -> Callable[[Setup], Setup]:
+    def decorator(setup: Setup) -> Setup:
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark '{name}' already registered")
+        BENCHMARKS[name] = Benchmark(name, setup, repeat)
+        return setup
+
+    return decorator
+
+
+def measure(case: Benchmark, repeat: Optional[int] = None) -> Measurement:
+    """
+    Median and best wall time over ``repeat`` runs after one warm-up run, then
+    the peak traced allocation of one more run (tracing is kept out of the
+    timed runs because it slows allocation-heavy code several-fold).
+    """
+    call = case.setup()
+    call()
+    timings: List[float] = []
+    for _ in range(repeat or case.repeat):
+        gc.collect()
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(case.name, statistics.median(timings), min(timings), peak / 2**20, len(timings))
+
+
+def environment() -> Dict[str, str]:
+    import numpy
+    import pandas
+
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": platform.processor() or "unknown",
+    }
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    if not path.exists():
+        return {"results": {}}
+    return json.loads(path.read_text())
+
+
+def save_baseline(measurements: List[Measurement], path: Path = BASELINE_PATH, merge: bool = True) -> None:
+    """Write measurements to the baseline, keeping entries for cases that were not run."""
+    results = load_baseline(path)["results"] if merge else {}
+    results.update({m.name: m.to_dict() for m in measurements})
+    payload = {"environment": environment(), "results": dict(sorted(results.items()))}
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def compare(
+    measurements: List[Measurement], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> List[Comparison]:
+    """Median time or peak memory more than ``threshold`` (relative) above the baseline."""
+    regressions = []
+    for m in measurements:
+        reference = baseline.get("results", {}).get(m.name)
+        if reference is None:
+            continue
+        if m.median_s > reference["median_s"] * (1 + threshold) and m.median_s - reference["median_s"] > TIME_FLOOR_S:
+            regressions.append(Comparison(m.name, "median_s", reference["median_s"], m.median_s))
+        if m.peak_mib > reference["peak_mib"] * (1 + threshold) and m.peak_mib - reference["peak_mib"] > MEMORY_FLOOR_MIB:
+            regressions.append(Comparison(m.name, "peak_mib", reference["peak_mib"], m.peak_mib))
+    return regressions
+
+
+def format_row(m: Measurement, reference: Optional[Dict[str, Any]]) -> str:
+    change = ""
+    if reference:
+        change = f"{(m.median_s / reference['median_s'] - 1) * 100:+6.1f}%" if reference["median_s"] else ""
+    return f"{m.name:<40} {m.median_s * 1e3:>11.2f} ms {m.min_s * 1e3:>11.2f} ms {m.peak_mib:>9.1f} MiB {change:>8}"
+
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import json
 import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
@@ -11,15 +13,63 @@ ROOT = Path(__file__).resolve().parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from thanimampro_api.database import load_literature_data, search_literature
-from thanimampro_api.inverse import suggest_synthesis_conditions
-from thanimampro_api.mapper import build_bandgap_map
-from thanimampro_api.predict import predict_properties
-from thanimampro_api.schemas import DesiredPropertyTargets, StructureFeatures, SynthesisInput
-from thanimampro_api.structure import analyze_structure_file
+import thanimampro_telemetry as telemetry
+from thanimampro_api.app_cache import (
+    cached_analyze_structure,
+    cached_morris,
+    cached_optimize,
+    cached_pareto,
+    cached_predict,
+    cached_property_map,
+    cached_sobol,
+    cached_suggest,
+)
+from thanimampro_api.cache import cache_stats, clear_caches
+from thanimampro_api.database import load_literature_store, search_literature
+from thanimampro_api.mapper import PropertyMap, iter_adaptive_property_map
+from thanimampro_api.schemas import (
+    NUMERIC_SYNTHESIS_FIELDS,
+    PROPERTY_NAMES,
+    DesiredPropertyTargets,
+    StructureFeatures,
+    SynthesisInput,
+)
+from thanimampro_api.sensitivity import DEFAULT_RANGES, SobolIndices
 
 SEED_DATA_PATH = ROOT / "data" / "literature_seed.csv"
 LOGO_PATH = ROOT / "streamlit_app" / "assets" / "thanimampro_logo.svg"
+LITERATURE_STORE_DIR = ROOT / ".thanimampro_cache" / "literature_store"
+
+# Slider bounds and default sweep for each mappable synthesis field (mirrors the input form limits).
+AXIS_LIMITS = {
+    "temperature_c": (100.0, 1500.0),
+    "heating_rate_c_min": (0.1, 100.0),
+    "annealing_time_h": (0.1, 48.0),
+    "precursor_ratio": (0.01, 10.0),
+    "pH": (0.0, 14.0),
+    "concentration_m": (0.001, 10.0),
+    "pressure_bar": (0.1, 500.0),
+    "milling_time_h": (0.0, 72.0),
+    "calcination_time_h": (0.1, 48.0),
+}
+AXIS_DEFAULTS = {
+    "temperature_c": (450.0, 900.0),
+    "heating_rate_c_min": (1.0, 20.0),
+    "annealing_time_h": (1.0, 12.0),
+    "precursor_ratio": (0.5, 2.0),
+    "pH": (2.0, 12.0),
+    "concentration_m": (0.1, 2.0),
+    "pressure_bar": (1.0, 100.0),
+    "milling_time_h": (0.0, 12.0),
+    "calcination_time_h": (1.0, 12.0),
+}
+
+
+@st.cache_resource(show_spinner=False)
+def _literature_store(csv_path: str, csv_stat: tuple):
+    # (mtime, size) is part of the key so an edited seed CSV is picked up without a
+    # restart; the on-disk store itself is keyed on the file's content hash.
+    return load_literature_store(csv_path, LITERATURE_STORE_DIR)
 
 
 def _init_state() -> None:
@@ -76,6 +126,74 @@ def _render_structure_metrics(features: StructureFeatures) -> None:
         st.caption(f"Source: {features.source}")
 
 
+def _iso_map_figure(grid: PropertyMap, x_field: str, y_field: str, prop: str):
+    return px.imshow(
+        grid.values[prop].T,
+        x=grid.axes[x_field],
+        y=grid.axes[y_field],
+        labels={"x": x_field, "y": y_field, "color": prop},
+        origin="lower",
+        aspect="auto",
+        title="Iso-performance map",
+    )
+
+
+def _render_cache_panel() -> None:
+    with st.sidebar.expander("Cache statistics"):
+        stats = pd.DataFrame(
+            [
+                {
+                    "cache": entry.name,
+                    "hits": entry.hits,
+                    "misses": entry.misses,
+                    "hit rate": round(entry.hit_rate, 3),
+                    "evictions": entry.evictions,
+                    "entries": f"{entry.size}/{entry.maxsize}",
+                }
+                for entry in cache_stats()
+            ]
+        )
+        st.dataframe(stats, use_container_width=True, hide_index=True)
+        if st.button("Clear caches"):
+            clear_caches()
+            _literature_store.clear()
+            st.rerun()
+
+
+def _render_telemetry_panel() -> None:
+    with st.sidebar.expander("Telemetry"):
+        recording = st.toggle("Record timings", value=telemetry.enabled())
+        if recording:
+            telemetry.enable()
+        else:
+            telemetry.disable()
+        data = telemetry.snapshot()
+        if not data["spans"]:
+            st.caption("No spans recorded yet." if recording else "Recording is off.")
+            return
+        spans = pd.DataFrame(
+            [
+                {
+                    "span": name,
+                    "calls": summary["count"],
+                    "total ms": round(summary["total_s"] * 1e3, 2),
+                    "mean ms": round(summary["mean_s"] * 1e3, 3),
+                    "p95 ms": round(summary["p95_s"] * 1e3, 3),
+                    "max ms": round(summary["max_s"] * 1e3, 3),
+                }
+                for name, summary in data["spans"].items()
+            ]
+        ).sort_values("total ms", ascending=False)
+        st.dataframe(spans, use_container_width=True, hide_index=True)
+        json_col, prom_col = st.columns(2)
+        json_col.download_button("JSON", json.dumps(data, indent=2), "telemetry.json", "application/json")
+        prom_col.download_button("Prometheus", telemetry.to_prometheus(data), "telemetry.prom", "text/plain")
+        if st.button("Reset timings"):
+            telemetry.reset()
+            st.rerun()
+
+
+@telemetry.timed("app.render")
 def main() -> None:
     st.set_page_config(page_title="ThanimamPro", layout="wide")
     _init_state()
@@ -94,8 +212,9 @@ def main() -> None:
             "2) Structure Analysis",
             "3) Property Prediction",
             "4) Relationship Mapper",
-            "5) Inverse Design",
-            "6) Literature Database",
+            "5) Sensitivity Analysis",
+            "6) Inverse Design",
+            "7) Literature Database",
         ]
     )
 
@@ -138,7 +257,7 @@ def main() -> None:
         st.subheader("CIF/XRD Upload")
         uploaded = st.file_uploader("Upload CIF/XRD file", type=["cif", "xrd", "xy", "txt"])
         if uploaded is not None and st.button("Analyze Structure", type="primary"):
-            features = analyze_structure_file(uploaded.name, uploaded.getvalue())
+            features = cached_analyze_structure(uploaded.name, uploaded.getvalue())
             st.session_state["structure"] = features
         if st.session_state["structure"] is not None:
             _render_structure_metrics(st.session_state["structure"])
@@ -148,7 +267,7 @@ def main() -> None:
     with tabs[2]:
         st.subheader("Predicted Functional Properties")
         synthesis = _synthesis_from_state()
-        prediction = predict_properties(synthesis, st.session_state["structure"])
+        prediction = cached_predict(synthesis, st.session_state["structure"])
         pred_df = pd.DataFrame(
             [{"property": key, "value": value} for key, value in prediction.to_dict().items()]
         )
@@ -161,32 +280,115 @@ def main() -> None:
             st.plotly_chart(fig, use_container_width=True)
 
     with tabs[3]:
-        st.subheader("Band Gap Sensitivity: Temperature vs pH")
-        temp_range = st.slider("Temperature range (C)", 200, 1200, (450, 900), step=10)
-        ph_range = st.slider("pH range", 0.0, 14.0, (2.0, 12.0), step=0.2)
-        points = st.slider("Grid density", 10, 50, 25)
-        if st.button("Generate Heatmap"):
+        st.subheader("Property Sensitivity Map")
+        axis_x_col, axis_y_col, prop_col = st.columns(3)
+        with axis_x_col:
+            x_field = st.selectbox("X axis", NUMERIC_SYNTHESIS_FIELDS, index=NUMERIC_SYNTHESIS_FIELDS.index("temperature_c"))
+        with axis_y_col:
+            y_field = st.selectbox("Y axis", NUMERIC_SYNTHESIS_FIELDS, index=NUMERIC_SYNTHESIS_FIELDS.index("pH"))
+        with prop_col:
+            map_property = st.selectbox("Property", PROPERTY_NAMES, index=PROPERTY_NAMES.index("band_gap_ev"))
+        x_range = st.slider(f"{x_field} range", *AXIS_LIMITS[x_field], value=AXIS_DEFAULTS[x_field])
+        y_range = st.slider(f"{y_field} range", *AXIS_LIMITS[y_field], value=AXIS_DEFAULTS[y_field])
+        points = st.slider("Grid density", 10, 200, 50)
+        adaptive = st.toggle("Adaptive refinement", help="Refine the grid above only where the map bends.")
+        if adaptive:
+            max_points = st.select_slider("Resolution cap", [129, 257, 513, 1025], value=513)
+        if x_field == y_field:
+            st.warning("Pick two different axes.")
+        elif st.button("Generate Heatmap"):
+            synthesis = _synthesis_from_state()
+            if adaptive:
+                chart, status = st.empty(), st.empty()
+                for progress in iter_adaptive_property_map(
+                    baseline=synthesis,
+                    structure=st.session_state["structure"],
+                    axes={x_field: x_range, y_field: y_range},
+                    prop=map_property,
+                    # The density slider goes past the smallest cap; start no finer than it.
+                    initial_points=min(points, max_points),
+                    max_points=max_points,
+                ):
+                    grid = progress.map
+                    fig = _iso_map_figure(grid, x_field, y_field, map_property)
+                    chart.plotly_chart(fig, use_container_width=True)
+                    share = progress.evaluations / progress.uniform_evaluations
+                    status.caption(
+                        f"Pass {progress.level}: {grid.shape[0]}x{grid.shape[1]} grid, "
+                        f"{progress.evaluations:,} evaluations ({share:.1%} of a uniform grid)"
+                    )
+            else:
+                grid = cached_property_map(
+                    baseline=synthesis,
+                    structure=st.session_state["structure"],
+                    axes={
+                        x_field: np.linspace(float(x_range[0]), float(x_range[1]), points),
+                        y_field: np.linspace(float(y_range[0]), float(y_range[1]), points),
+                    },
+                    properties=[map_property],
+                )
+                st.plotly_chart(_iso_map_figure(grid, x_field, y_field, map_property), use_container_width=True)
+            st.dataframe(grid.to_frame().head(20), use_container_width=True, hide_index=True)
+
+    with tabs[4]:
+        st.subheader("Global Parameter Sensitivity")
+        st.caption("Numeric parameters vary over their default sweeps and the method over every route.")
+        method_col, budget_col, prop_col = st.columns(3)
+        with method_col:
+            sa_method = st.radio("Method", ["Sobol indices", "Morris screening"], horizontal=True)
+        with budget_col:
+            sa_samples = st.select_slider("Base samples", [256, 1024, 4096, 16384, 65536], value=4096)
+        with prop_col:
+            sa_property = st.selectbox("Rank for property", PROPERTY_NAMES, index=PROPERTY_NAMES.index("band_gap_ev"))
+        if st.button("Run Sensitivity Analysis"):
             synthesis = _synthesis_from_state()
-            map_df = build_bandgap_map(
-                baseline=synthesis,
-                structure=st.session_state["structure"],
-                temp_min=float(temp_range[0]),
-                temp_max=float(temp_range[1]),
-                ph_min=float(ph_range[0]),
-                ph_max=float(ph_range[1]),
-                points=points,
+            if sa_method == "Sobol indices":
+                result = cached_sobol(
+                    baseline=synthesis,
+                    structure=st.session_state["structure"],
+                    ranges=DEFAULT_RANGES,
+                    samples=int(sa_samples),
+                )
+            else:
+                result = cached_morris(
+                    baseline=synthesis,
+                    structure=st.session_state["structure"],
+                    ranges=DEFAULT_RANGES,
+                    trajectories=int(sa_samples),
+                )
+            # Kept in the session so the charts survive reruns from other widgets.
+            st.session_state["sensitivity"] = result
+        result = st.session_state.get("sensitivity")
+        if result is not None:
+            if isinstance(result, SobolIndices):
+                score, spread = "ST", "S1"
+                matrix = result.total_order
+            else:
+                score, spread = "mu_star", "sigma"
+                # Scale per property so the heatmap compares parameters, not property units.
+                matrix = result.mu_star / np.maximum(result.mu_star.max(axis=1, keepdims=True), 1e-300)
+            st.caption(f"{result.evaluations:,} model evaluations")
+            ranking = result.ranking(sa_property)
+            fig = px.bar(
+                ranking,
+                x="parameter",
+                y=[score, spread],
+                barmode="group",
+                title=f"Parameter ranking for {sa_property}",
             )
-            pivot = map_df.pivot(index="pH", columns="temperature_c", values="band_gap_ev")
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(ranking, use_container_width=True, hide_index=True)
             fig = px.imshow(
-                pivot,
-                labels={"x": "Temperature (C)", "y": "pH", "color": "Band gap (eV)"},
+                matrix,
+                x=result.parameters,
+                y=result.properties,
+                labels={"x": "parameter", "y": "property", "color": score},
                 aspect="auto",
-                title="Iso-performance map",
+                title="Influence of every parameter on every property",
             )
             st.plotly_chart(fig, use_container_width=True)
-            st.dataframe(map_df.head(20), use_container_width=True, hide_index=True)
 
-    with tabs[4]:
+    with tabs[5]:
         st.subheader("Target-Driven Inverse Design")
         col_a, col_b, col_c = st.columns(3)
         with col_a:
@@ -195,6 +397,11 @@ def main() -> None:
             min_sa = st.number_input("Min surface area (m2/g)", 1.0, 500.0, 50.0, step=1.0)
         with col_c:
             max_ps = st.number_input("Max particle size (nm)", 2.0, 500.0, 20.0, step=1.0)
+        mode_col, budget_col = st.columns(2)
+        with mode_col:
+            search_mode = st.radio("Search mode", ["Exhaustive grid", "CMA-ES", "Multi-start local search"], horizontal=True)
+        with budget_col:
+            budget = st.number_input("Evaluation budget", 100, 100000, 2000, step=100)
         if st.button("Suggest Synthesis Conditions", type="primary"):
             targets = DesiredPropertyTargets(
                 target_band_gap_ev=float(target_bg),
@@ -202,17 +409,61 @@ def main() -> None:
                 max_particle_size_nm=float(max_ps),
             )
             baseline = _synthesis_from_state()
-            suggestions = suggest_synthesis_conditions(
-                baseline=baseline,
-                desired=targets,
-                structure=st.session_state["structure"],
-                top_k=5,
-            )
+            if search_mode == "Exhaustive grid":
+                suggestions = cached_suggest(
+                    baseline=baseline,
+                    desired=targets,
+                    structure=st.session_state["structure"],
+                    top_k=5,
+                )
+            else:
+                result = cached_optimize(
+                    baseline=baseline,
+                    desired=targets,
+                    structure=st.session_state["structure"],
+                    method="cmaes" if search_mode == "CMA-ES" else "multistart",
+                    budget=int(budget),
+                    top_k=5,
+                )
+                suggestions = result.candidates
+                st.caption(
+                    f"{result.evaluations} evaluations, {result.iterations} iterations, "
+                    f"converged: {result.converged}"
+                )
+                st.line_chart(pd.DataFrame({"best score": result.best_score_history}))
             st.dataframe(pd.DataFrame(suggestions), use_container_width=True, hide_index=True)
 
-    with tabs[5]:
+        with st.expander("Pareto trade-offs"):
+            st.caption("Non-dominated conditions for band-gap error, surface area (max) and particle size (min).")
+            if st.button("Compute Pareto Front"):
+                pareto = cached_pareto(
+                    baseline=_synthesis_from_state(),
+                    objectives={
+                        "band_gap_ev": float(target_bg),
+                        "specific_surface_area_m2_g": "max",
+                        "estimated_particle_size_nm": "min",
+                    },
+                    structure=st.session_state["structure"],
+                    samples=int(budget) * 10,
+                )
+                front_df = pd.DataFrame(pareto.front)
+                fig = px.scatter(
+                    front_df,
+                    x="specific_surface_area_m2_g",
+                    y="estimated_particle_size_nm",
+                    color="band_gap_ev",
+                    hover_data=list(front_df.columns),
+                    title=f"Pareto front ({len(front_df)} of {pareto.evaluated} candidates)",
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                st.dataframe(front_df, use_container_width=True, hide_index=True)
+
+    with tabs[6]:
         st.subheader("Literature Records (Seed Dataset)")
-        frame = load_literature_data(SEED_DATA_PATH)
+        # A missing seed file yields an empty store (same columns) rather than an error.
+        seed_stat = SEED_DATA_PATH.stat() if SEED_DATA_PATH.exists() else None
+        seed_key = (seed_stat.st_mtime_ns, seed_stat.st_size) if seed_stat else (0, 0)
+        store = _literature_store(str(SEED_DATA_PATH), seed_key)
         material_filter, method_filter = st.columns(2)
         with material_filter:
             mat = st.text_input("Filter by material system")
@@ -224,15 +475,27 @@ def main() -> None:
         with bg_max:
             max_bg = st.number_input("Max band gap filter", 0.0, 6.0, 6.0, step=0.1)
 
-        filtered = search_literature(
-            frame=frame,
-            material_system=mat,
-            method=meth,
-            min_band_gap=float(min_bg),
-            max_band_gap=float(max_bg),
-        )
+        fuzzy_query = st.text_input("Fuzzy search (typos and names like 'titania' or 'sol gel' are fine)")
+
+        if fuzzy_query:
+            filtered = store.fuzzy_search(
+                fuzzy_query,
+                ranges={"band_gap_ev": (float(min_bg), float(max_bg))},
+            ).to_frame()
+        else:
+            filtered = search_literature(
+                frame=store,
+                material_system=mat,
+                method=meth,
+                min_band_gap=float(min_bg),
+                max_band_gap=float(max_bg),
+            )
         st.dataframe(filtered, use_container_width=True, hide_index=True)
 
+    # Rendered last so the counters include this run's lookups.
+    _render_cache_panel()
+    _render_telemetry_panel()
+
 
 if __name__ == "__main__":
     main()
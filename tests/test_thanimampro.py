@@ -1,6 +1,32 @@
-from thanimampro_api.inverse import suggest_synthesis_conditions
-from thanimampro_api.predict import predict_properties
-from thanimampro_api.schemas import DesiredPropertyTargets, SynthesisInput
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import thanimampro_telemetry as telemetry
+from thanimampro_api.batch import analyze_structure_files
+from thanimampro_api.cache import cache_stats, memoize
+from thanimampro_api.cif import parse_cif
+from thanimampro_api.database import LiteratureStore, load_literature_store, search_literature
+from thanimampro_api.inverse import (
+    TopK,
+    optimize_synthesis_conditions,
+    pareto_synthesis_conditions,
+    suggest_synthesis_conditions,
+)
+from thanimampro_api.mapper import build_property_map, iter_adaptive_property_map
+from thanimampro_api.predict import predict_properties, predict_properties_batch
+from thanimampro_api.schemas import DesiredPropertyTargets, StructureFeatures, SynthesisInput
+from thanimampro_api.sensitivity import halton, morris_effects, sobol_indices
+from thanimampro_api.structure import analyze_structure_file
+from thanimampro_api.surrogate import SurrogateModel, SurrogateTrainer, fit_surrogate
 
 
 def _baseline() -> SynthesisInput:
@@ -27,6 +53,35 @@ def test_predict_properties_ranges() -> None:
     assert pred["capacitance_f_g"] > 0.0
 
 
+def test_predict_properties_batch_matches_scalar() -> None:
+    baseline = _baseline()
+    temps, phs = np.meshgrid(np.linspace(100.0, 1500.0, 15), np.linspace(0.0, 14.0, 15), indexing="ij")
+    batch = predict_properties_batch({"temperature_c": temps, "pH": phs}, baseline=baseline)
+    assert batch.band_gap_ev.shape == temps.shape
+    for index in range(temps.size):
+        trial = replace(baseline, temperature_c=float(temps.flat[index]), pH=float(phs.flat[index]))
+        expected = predict_properties(trial).to_dict()
+        got = batch.record(index).to_dict()
+        diffusivity = expected.pop("ion_diffusivity_cm2_s")
+        assert np.isclose(got.pop("ion_diffusivity_cm2_s"), diffusivity, rtol=1e-12, atol=0.0)
+        assert got == expected
+
+
+def test_property_map_grids_follow_axes() -> None:
+    baseline = _baseline()
+    grid = build_property_map(
+        baseline,
+        None,
+        {"temperature_c": np.linspace(400.0, 900.0, 6), "pH": np.linspace(2.0, 12.0, 4), "pressure_bar": [1.0, 50.0]},
+        ["band_gap_ev", "capacitance_f_g"],
+    )
+    assert grid.shape == (6, 4, 2)
+    assert set(grid.values) == {"band_gap_ev", "capacitance_f_g"}
+    expected = predict_properties(replace(baseline, temperature_c=500.0, pH=12.0, pressure_bar=50.0))
+    assert grid.values["capacitance_f_g"][1, 3, 1] == expected.capacitance_f_g
+    assert len(grid.to_frame()) == 48
+
+
 def test_inverse_returns_ranked_candidates() -> None:
     desired = DesiredPropertyTargets(
         target_band_gap_ev=2.5,
@@ -36,3 +91,373 @@ def test_inverse_returns_ranked_candidates() -> None:
     suggestions = suggest_synthesis_conditions(_baseline(), desired, top_k=3)
     assert len(suggestions) == 3
     assert suggestions[0]["score"] <= suggestions[1]["score"]
+    assert suggest_synthesis_conditions(_baseline(), desired, top_k=0) == []
+
+
+def test_optimizer_matches_grid_within_budget() -> None:
+    desired = DesiredPropertyTargets(
+        target_band_gap_ev=3.0,
+        min_surface_area_m2_g=80.0,
+        max_particle_size_nm=15.0,
+    )
+    grid_best = suggest_synthesis_conditions(_baseline(), desired, top_k=1)[0]["score"]
+    for method in ("cmaes", "multistart"):
+        result = optimize_synthesis_conditions(_baseline(), desired, method=method, budget=1500, top_k=3, seed=7)
+        assert result.evaluations <= 1500
+        assert result.candidates[0]["score"] <= grid_best
+        assert all(a >= b for a, b in zip(result.best_score_history, result.best_score_history[1:]))
+        # Tiny budgets are honoured exactly and still produce candidates.
+        for budget in (1, 5):
+            small = optimize_synthesis_conditions(_baseline(), desired, method=method, budget=budget, top_k=3, seed=7)
+            assert small.evaluations == budget
+            assert 1 <= len(small.candidates) <= min(3, budget)
+
+
+def test_top_k_matches_stable_sort() -> None:
+    scores = [3.0, 1.0, 2.0, 1.0, 5.0, 2.0, 0.5]
+    ranked = TopK(4)
+    for index, score in enumerate(scores):
+        ranked.push(score, index)
+    assert ranked.items() == sorted(range(len(scores)), key=lambda i: scores[i])[:4]
+    empty = TopK(0)
+    empty.push(1.0, "ignored")
+    assert empty.items() == []
+
+
+def test_pareto_front_is_non_dominated() -> None:
+    objectives = {"band_gap_ev": 2.8, "specific_surface_area_m2_g": "max", "estimated_particle_size_nm": "min"}
+    result = pareto_synthesis_conditions(_baseline(), objectives, samples=3000, chunk_size=500, top_k=3, seed=3)
+    assert result.evaluated == 3000
+    assert len(result.top) == 3
+    assert result.top[0]["score"] <= result.top[-1]["score"]
+    costs = np.array(
+        [[abs(row["band_gap_ev"] - 2.8), -row["specific_surface_area_m2_g"], row["estimated_particle_size_nm"]] for row in result.front]
+    )
+    dominated = np.all(costs[:, None] <= costs[None], axis=2) & np.any(costs[:, None] < costs[None], axis=2)
+    assert not dominated.any()
+
+
+def test_parse_cif_reads_loops_across_blocks() -> None:
+    content = b"""data_first
+_cell_length_a 3.7842(2)
+_cell_length_c 9.5146
+_symmetry_space_group_name_H-M 'I 41/amd'
+loop_
+_atom_site_label
+_atom_site_type_symbol
+_atom_site_fract_x
+_atom_site_fract_y
+_atom_site_fract_z
+_atom_site_occupancy
+Ti1 Ti 0.0 0.75 0.125 1
+O1 O 0.0 0.75 0.3333(4) .
+# oxygen vacancy noted
+data_second
+_cell_length_a 4.5937
+loop_
+_symmetry_equiv_pos_as_xyz
+'x, y, z'
+'-x, -y, z'
+"""
+    document = parse_cif(content, keywords=("vacancy",))
+    first, second = document.blocks
+    assert (first.name, second.name) == ("first", "second")
+    assert first.cell().a == 3.7842
+    assert first.space_group() == "I 41/amd"
+    sites = first.atom_sites()
+    assert sites.labels == ["Ti1", "O1"]
+    assert sites.fract_z[1] == 0.3333
+    assert np.isnan(sites.occupancy[1])
+    assert second.symmetry_operations() == ["x, y, z", "-x, -y, z"]
+    assert document.keyword_counts["vacancy"] == 1
+
+
+def test_xrd_pattern_recovers_size_and_strain() -> None:
+    size_nm, strain = 20.0, 0.002
+    two_theta = np.arange(20.0, 80.0, 0.01)
+    intensity = 50.0 + 0.3 * (80.0 - two_theta)
+    for center, height in [(25.3, 1000.0), (37.8, 200.0), (48.0, 350.0), (53.9, 220.0), (62.7, 150.0), (75.0, 120.0)]:
+        theta = np.radians(center) / 2.0
+        fwhm = np.degrees(0.9 * 1.5406 / (size_nm * 10.0 * np.cos(theta)) + 4.0 * strain * np.tan(theta))
+        intensity += height * np.exp(-0.5 * ((two_theta - center) / (fwhm / 2.3548)) ** 2)
+    intensity += np.random.default_rng(0).normal(0.0, 2.0, two_theta.size)
+    content = "2theta intensity\n".encode() + "\n".join(f"{x:.3f} {y:.2f}" for x, y in zip(two_theta, intensity)).encode()
+
+    features = analyze_structure_file("pattern.xy", content)
+    assert abs(features.crystallite_size_nm - size_nm) / size_nm < 0.15
+    assert abs(features.microstrain_pct - strain * 100.0) < 0.05
+
+
+def test_batch_analysis_reuses_cache(tmp_path: Path) -> None:
+    samples = Path(__file__).resolve().parents[1] / "samples"
+    cache_dir = tmp_path / "cache"
+    first = {r.name: r for r in analyze_structure_files([samples], workers=1, cache_dir=cache_dir)}
+    second = {r.name: r for r in analyze_structure_files([samples], workers=1, cache_dir=cache_dir)}
+    assert len(first) == 4
+    assert not any(r.cached for r in first.values())
+    assert all(r.cached for r in second.values())
+    for name, result in first.items():
+        assert second[name].features == result.features
+        assert result.features == analyze_structure_file(name, Path(name).read_bytes())
+
+    # Unreadable sources are reported per source and the rest of the run goes on.
+    corrupt = tmp_path / "corrupt.zip"
+    with zipfile.ZipFile(corrupt, "w") as archive:
+        archive.writestr("anatase.cif", (samples / "sample_tio2_anatase.cif").read_bytes())
+    corrupt.write_bytes(corrupt.read_bytes().replace(b"_cell_length_a", b"_cell_length_b", 1))
+    missing = tmp_path / "missing.cif"
+    for workers in (1, 2):
+        results = {r.name: r for r in analyze_structure_files([missing, corrupt, samples], workers=workers)}
+        assert len(results) == 6
+        assert "FileNotFoundError" in results[str(missing)].error
+        assert "BadZipFile" in results[f"{corrupt}!anatase.cif"].error
+        assert all(results[name].features == result.features for name, result in first.items())
+
+
+def test_literature_store_matches_frame_search(tmp_path: Path, monkeypatch) -> None:
+    frame = pd.DataFrame(
+        {
+            "material_system": ["TiO2", "ZnO", "TiO2", None, "N-doped TiO2"],
+            "method": ["sol-gel", "hydrothermal", "Sol-Gel", "sol-gel", "combustion"],
+            "temperature_c": [450.0, 180.0, 600.0, 500.0, 550.0],
+            "pH": [3.0, 9.0, 7.0, 5.0, 6.0],
+            "band_gap_ev": [3.2, 3.3, float("nan"), 2.9, 2.7],
+            "surface_area_m2_g": [80.0, 30.0, 45.0, 60.0, 95.0],
+            "doi": ["10.1/a", "10.1/b", "10.1/c", "10.1/d", "10.1/e"],
+        }
+    )
+    frame.to_csv(tmp_path / "seed.csv", index=False)
+    load_literature_store(tmp_path / "seed.csv", tmp_path / "store")
+    store = load_literature_store(tmp_path / "seed.csv", tmp_path / "store")
+    assert isinstance(store.column("band_gap_ev"), np.memmap)
+    for query in [("tio2", "", None, None), ("", "sol-gel", 2.8, None), ("tio", "", None, 3.0), ("", "", 3.0, 3.3)]:
+        expected = search_literature(frame, *query)
+        got = search_literature(store, *query)
+        assert got["doi"].tolist() == expected["doi"].tolist()
+
+    # An edit that keeps the mtime is still noticed, and saves swap the whole store.
+    stat = (tmp_path / "seed.csv").stat()
+    frame.assign(doi=frame["doi"].str.upper()).to_csv(tmp_path / "seed.csv", index=False)
+    os.utime(tmp_path / "seed.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    edited = load_literature_store(tmp_path / "seed.csv", tmp_path / "store")
+    assert edited.to_frame()["doi"].tolist()[0] == "10.1/A"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["seed.csv", "store"]
+
+    def disk_full(*args, **kwargs) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(np, "save", disk_full)
+    with pytest.raises(OSError):
+        LiteratureStore.from_frame(frame).save(tmp_path / "store")
+    assert LiteratureStore.load(tmp_path / "store").to_frame()["doi"].tolist()[0] == "10.1/A"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["seed.csv", "store"]
+
+
+def test_fuzzy_literature_search_handles_aliases_typos_and_appends() -> None:
+    store = LiteratureStore.from_frame(
+        pd.DataFrame(
+            {
+                "material_system": ["TiO2", "ZnO", "SrTiO3"],
+                "method": ["sol-gel", "hydrothermal", "solid-state"],
+                "band_gap_ev": [3.2, 3.3, 3.25],
+                "doi": ["10.1/a", "10.1/b", "10.1/c"],
+            }
+        )
+    )
+    assert store.fuzzy_search("titania sol gel", limit=1).column("doi").tolist() == ["10.1/a"]
+    assert store.fuzzy_search("hydrotermal", columns=["method"], limit=1).column("doi").tolist() == ["10.1/b"]
+
+    store.append(pd.DataFrame({"material_system": ["Titania nanotubes"], "method": ["anodization"], "band_gap_ev": [3.0], "doi": ["10.1/d"]}))
+    matches = store.fuzzy_search("titania", columns=["material_system"], ranges={"band_gap_ev": (2.9, 3.1)})
+    assert matches.column("doi").tolist() == ["10.1/d"]
+    assert store.search(min_band_gap=3.0, max_band_gap=3.2).column("doi").tolist() == ["10.1/a", "10.1/d"]
+
+
+def test_memoize_keys_on_values_and_evicts_lru() -> None:
+    calls = []
+
+    @memoize(maxsize=2, name="test predictions")
+    def cached(synthesis: SynthesisInput, axis: np.ndarray) -> float:
+        calls.append(1)
+        return predict_properties(synthesis).band_gap_ev + float(axis.sum())
+
+    first = cached(_baseline(), np.arange(3.0))
+    assert cached(_baseline(), np.arange(3.0)) == first
+    cached(replace(_baseline(), pH=5.0), np.arange(3.0))
+    cached(_baseline(), np.arange(4.0))
+    cached(_baseline(), np.arange(3.0))
+
+    stats = cached.cache.stats()
+    assert len(calls) == 4
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 4, 2, 2)
+    assert any(entry.name == "test predictions" for entry in cache_stats())
+
+
+def test_telemetry_records_spans_only_when_enabled(monkeypatch) -> None:
+    monkeypatch.delenv(telemetry.ENV_VAR, raising=False)  # restored after the test
+    telemetry.disable()
+    telemetry.reset()
+    predict_properties(_baseline())
+    assert telemetry.snapshot()["spans"] == {}
+
+    telemetry.enable()
+    try:
+        for _ in range(3):
+            predict_properties(_baseline())
+        with telemetry.span("test.block"):
+            telemetry.count("test.events", 2)
+        shipped = telemetry.drain()
+        assert telemetry.snapshot()["spans"] == {}
+        telemetry.merge(shipped)
+        telemetry.merge(shipped)
+        data = telemetry.snapshot()
+        # Spawned workers re-import the module and must still see the flag.
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            assert pool.submit(telemetry.enabled).result() is True
+    finally:
+        telemetry.disable()
+        telemetry.reset()
+
+    spans = data["spans"]
+    assert spans["predict.properties"]["count"] == 6 and spans["test.block"]["count"] == 2
+    assert sum(spans["predict.properties"]["buckets"]) == 6
+    assert spans["predict.properties"]["min_s"] <= spans["predict.properties"]["p50_s"] <= spans["predict.properties"]["max_s"]
+    assert data["counters"] == {"test.events": 4}
+    text = telemetry.to_prometheus(data)
+    assert 'thanimampro_span_seconds_bucket{span="predict.properties",le="+Inf"} 6' in text
+    assert "thanimampro_test_events_total 4" in text
+
+
+def _synthetic_literature(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    temperature = rng.uniform(300.0, 1000.0, rows)
+    ph = rng.uniform(1.0, 13.0, rows)
+    material = np.array(["TiO2", "ZnO", "SrTiO3"])[rng.integers(0, 3, rows)]
+    band_gap = 3.0 - 0.001 * (temperature - 600.0) + 0.02 * (ph - 7.0) ** 2 + np.where(material == "ZnO", 0.2, 0.0)
+    surface_area = 80.0 - 0.05 * (temperature - 600.0) + rng.normal(0.0, 3.0, rows)
+    surface_area[::4] = np.nan
+    return pd.DataFrame(
+        {
+            "material_system": material,
+            "method": np.array(["sol-gel", "hydrothermal"])[rng.integers(0, 2, rows)],
+            "temperature_c": temperature,
+            "pH": ph,
+            "band_gap_ev": band_gap + rng.normal(0.0, 0.05, rows),
+            "surface_area_m2_g": surface_area,
+        }
+    )
+
+
+def test_surrogate_streams_fits_and_round_trips(tmp_path: Path, monkeypatch) -> None:
+    frame = _synthetic_literature(20_000)
+    model = fit_surrogate(frame)
+    trainer = SurrogateTrainer()
+    for start in range(0, len(frame), 3_000):
+        trainer.partial_fit(frame.iloc[start : start + 3_000])
+    streamed = trainer.fit()
+    assert streamed.categories == model.categories
+    np.testing.assert_allclose(streamed.weights, model.weights, atol=1e-6)
+    assert list(model.rows) == [20_000, 15_000]
+
+    zno = replace(_baseline(), material_system="ZnO", temperature_c=700.0, pH=9.0)
+    result, std = model.predict(zno, return_std=True)
+    assert abs(result.band_gap_ev - (3.0 - 0.1 + 0.08 + 0.2)) < 0.01
+    assert abs(std["band_gap_ev"] - 0.05) < 0.005 and abs(std["specific_surface_area_m2_g"] - 3.0) < 0.2
+    assert result.absorption_edge_nm == round(1240.0 / result.band_gap_ev, 2)
+    baseline_only = predict_properties(zno)
+    assert result.conductivity_s_cm == baseline_only.conductivity_s_cm
+
+    model.save(tmp_path / "surrogate")
+    loaded = SurrogateModel.load(tmp_path / "surrogate")
+    assert isinstance(loaded.weights, np.memmap)
+    # A save that fails half way leaves the previous model whole.
+    save = np.save
+
+    def fail_on_covariance(path, array) -> None:
+        if Path(path).name == "covariance.npy":
+            raise OSError("disk full")
+        save(path, array)
+
+    with monkeypatch.context() as patch, pytest.raises(OSError):
+        patch.setattr(np, "save", fail_on_covariance)
+        streamed.save(tmp_path / "surrogate")
+    np.testing.assert_array_equal(SurrogateModel.load(tmp_path / "surrogate").weights, model.weights)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["surrogate"]
+    temps = np.linspace(400.0, 900.0, 7)
+    batch, batch_std = loaded.predict_batch({"temperature_c": temps}, baseline=zno, return_std=True)
+    for i, temperature in enumerate(temps):
+        single, single_std = model.predict(replace(zno, temperature_c=float(temperature)), return_std=True)
+        record = batch.record(i)
+        for name in ("band_gap_ev", "absorption_edge_nm", "specific_surface_area_m2_g"):
+            assert getattr(record, name) == getattr(single, name)
+        assert np.isclose(batch_std["band_gap_ev"][i], single_std["band_gap_ev"])
+
+    unseen = model.predict(replace(zno, material_system="CdS"))
+    assert 1.1 <= unseen.band_gap_ev <= 4.5
+
+
+def _ishigami(columns, structure, baseline=None):
+    x1, x2, x3 = columns["temperature_c"], columns["pH"], columns["pressure_bar"]
+    return SimpleNamespace(band_gap_ev=np.sin(x1) + 7.0 * np.sin(x2) ** 2 + 0.1 * x3**4 * np.sin(x1))
+
+
+def test_sensitivity_recovers_known_indices_and_ranks_parameters() -> None:
+    points = halton(1024, 4, seed=None)
+    assert points[0].tolist() == [0.5, 1 / 3, 0.2, 1 / 7]
+    assert np.allclose(points.mean(axis=0), 0.5, atol=0.01)
+
+    def projection_spread(pair: np.ndarray) -> float:
+        # Chi-square per degree of freedom over a 16x16 grid; about 1 for random points.
+        counts, _, _ = np.histogram2d(pair[:, 0], pair[:, 1], bins=16, range=[[0, 1], [0, 1]])
+        return float(((counts - counts.mean()) ** 2).sum() / counts.mean() / 255)
+
+    # Plain Halton puts the first points of two large-base dimensions on a few lines.
+    assert projection_spread(halton(1024, 40, seed=None)[:, 38:]) > 5.0
+    assert projection_spread(halton(1024, 40, seed=0)[:, 38:]) < 1.5
+
+    ranges = {name: (-np.pi, np.pi) for name in ("temperature_c", "pH", "pressure_bar")}
+    sobol = sobol_indices(_baseline(), ranges=ranges, properties=["band_gap_ev"], samples=8192, model=_ishigami)
+    assert sobol.evaluations == 8192 * 5
+    np.testing.assert_allclose(sobol.first_order[0], [0.3139, 0.4424, 0.0], atol=0.03)
+    np.testing.assert_allclose(sobol.total_order[0], [0.5576, 0.4424, 0.2437], atol=0.03)
+
+    morris = morris_effects(_baseline(), trajectories=200)
+    assert morris.evaluations == 200 * (len(morris.parameters) + 1)
+    ranking = morris.ranking("capacitance_f_g")
+    assert ranking["parameter"].head(3).tolist() == ["temperature_c", "pH", "pressure_bar"]
+    assert (ranking["mu_star"].iloc[3:] == 0.0).all()
+
+    indices = sobol_indices(_baseline(), samples=512).ranking("band_gap_ev")
+    assert set(indices["parameter"].head(2)) == {"temperature_c", "pH"}
+    assert indices["ST"].iloc[0] > 0.3 and (indices["ST"].iloc[2:] == 0.0).all()
+
+
+def test_adaptive_map_refines_clamp_edges_only() -> None:
+    # Large crystallites push surface area onto its lower clamp over part of the plane.
+    structure = StructureFeatures("anatase", 3.78, 3.78, 9.51, 100.0, 0.1, 0.25, "test")
+    axes = {"temperature_c": (100.0, 1500.0), "pH": (0.0, 14.0)}
+    prop = "specific_surface_area_m2_g"
+    steps = list(iter_adaptive_property_map(_baseline(), structure, axes, prop, initial_points=17, max_points=513))
+    assert steps[0].map.shape == (17, 17) and not steps[0].done
+    assert [step.map.shape[0] for step in steps[:-1]] == [16 * 2**level + 1 for level in range(len(steps) - 1)]
+    final = steps[-1]
+    assert final.done and final.map.shape == (513, 513) and len(steps) > 2
+    assert final.evaluations < 0.01 * final.uniform_evaluations
+
+    uniform = build_property_map(_baseline(), structure, {k: np.linspace(*v, 513) for k, v in axes.items()}, [prop])
+    exact, approx = uniform.values[prop], final.map.values[prop]
+    assert np.array_equal(approx[final.sampled], exact[final.sampled])
+    assert np.abs(approx - exact).max() < 0.01 * np.ptp(exact)
+
+    linear = list(iter_adaptive_property_map(_baseline(), None, axes, "band_gap_ev"))
+    assert len(linear) == 1 and linear[0].evaluations == 17 * 17
+
+
+def test_cif_keywords_in_block_names_and_tags_match_text_scan() -> None:
+    # Expected values are what the original whole-text scan produced.
+    named = analyze_structure_file("x.cif", b"data_anatase_defect\n_cell_length_a 3.7842\n_cell_length_c 9.5146\n")
+    assert (named.phase, named.defect_index, named.microstrain_pct) == ("anatase", 0.26, 0.14)
+    tagged = analyze_structure_file(
+        "x.cif", b"data_x\n_cell_length_a 3.7842\n_some_tag_vacancy 1\n# oxygen-deficient sample\n"
+    )
+    assert (tagged.phase, tagged.defect_index, tagged.crystallite_size_nm) == ("mixed/unknown", 0.36, 59.1)
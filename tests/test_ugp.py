@@ -0,0 +1,524 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ugp.calculators.base import CalculatorEngine
+from ugp.calculators.subprocess_engine import EngineCrashed, EngineError, EngineTimeout, SubprocessEngine
+from ugp.config import UGPConfig
+from ugp.core.cache import ResultCache, dataset_hash
+from ugp.core.pipeline import engine_agreement, run_pipeline, run_pipeline_multi
+from ugp.core.registry import EngineRegistry, register_engine, registry
+from ugp.io.binary import read_result_columns, write_columnar
+from ugp.io.reader import iter_analyses, load_columnar, read_dataset, read_result
+from ugp.io.writer import open_result_writer, write_result
+from ugp.models import (
+    ColumnarDataset,
+    MineralAnalysis,
+    PTEnsemble,
+    PTPoint,
+    SampleMetadata,
+    ThermoDataset,
+    UncertaintyConfig,
+)
+from ugp.uncertainty.bootstrap import bootstrap_ensemble
+from ugp.uncertainty.stats import EnsembleAccumulator, QuantileSketch, RunningMoments
+
+
+class MeanOxideEngine(CalculatorEngine):
+    """Deterministic stand-in whose output depends on which analyses were resampled."""
+
+    def run(self, dataset: ThermoDataset) -> PTEnsemble:
+        silica = sum(a.oxides_wt_pct["SiO2"] for a in dataset.analyses) / len(dataset.analyses)
+        return PTEnsemble(results=[PTPoint(pressure_gpa=silica / 50.0, temperature_c=10.0 * silica, method="mean")])
+
+
+class CountingEngine(MeanOxideEngine):
+    calls = 0
+
+    def run(self, dataset: ThermoDataset) -> PTEnsemble:
+        CountingEngine.calls += 1
+        return super().run(dataset)
+
+
+class SleepyEngine(MeanOxideEngine):
+    delay = 0.3
+
+    def run(self, dataset: ThermoDataset) -> PTEnsemble:
+        time.sleep(self.delay)
+        return super().run(dataset)
+
+
+class StuckEngine(SleepyEngine):
+    delay = 2.0
+
+
+class InstanceCountingEngine(MeanOxideEngine):
+    instances = 0
+
+    def __init__(self, config) -> None:
+        super().__init__(config)
+        InstanceCountingEngine.instances += 1
+
+
+class CrashingEngine(MeanOxideEngine):
+    """Kills its worker process on five-analysis datasets, as a segfaulting engine would."""
+
+    def run(self, dataset: ThermoDataset) -> PTEnsemble:
+        if len(dataset.analyses) == 5:
+            os._exit(1)
+        return super().run(dataset)
+
+
+TEST_ENGINES = {
+    "test-mean": MeanOxideEngine,
+    "test-counting": CountingEngine,
+    "test-sleepy": SleepyEngine,
+    "test-stuck": StuckEngine,
+    "test-instances": InstanceCountingEngine,
+    "test-crashing": CrashingEngine,
+}
+
+
+@pytest.fixture(autouse=True, scope="module")
+def test_engines():
+    """Register the stand-in engines for this module only, leaving the global registry clean."""
+    for name, factory in TEST_ENGINES.items():
+        register_engine(name)(factory)
+    yield
+    for name in TEST_ENGINES:
+        registry.unregister(name)
+
+
+def _dataset(size: int = 12) -> ThermoDataset:
+    return ThermoDataset(
+        analyses=[
+            MineralAnalysis(
+                mineral="garnet",
+                oxides_wt_pct={"SiO2": 36.0 + i, "Al2O3": 20.0},
+                metadata=SampleMetadata(sample_id=f"S{i}"),
+            )
+            for i in range(size)
+        ]
+    )
+
+
+def test_bootstrap_is_identical_across_workers_and_executors() -> None:
+    engine = MeanOxideEngine(config=None)
+    dataset = _dataset()
+    serial = bootstrap_ensemble(engine, dataset, UncertaintyConfig(bootstrap_iterations=40, random_seed=7, keep_runs=True))
+    threaded = bootstrap_ensemble(
+        engine, dataset, UncertaintyConfig(bootstrap_iterations=40, random_seed=7, workers=3, executor="thread", chunk_size=3, keep_runs=True)
+    )
+    processes = bootstrap_ensemble(
+        engine, dataset, UncertaintyConfig(bootstrap_iterations=40, random_seed=7, workers=2, executor="process", keep_runs=True)
+    )
+
+    assert len(serial.results) == 40
+    assert len({p.pressure_gpa for p in serial.results}) > 1
+    assert serial.results == threaded.results == processes.results
+    assert serial.summary == threaded.summary == processes.summary
+
+    unseeded = bootstrap_ensemble(engine, dataset, UncertaintyConfig(bootstrap_iterations=10, keep_runs=True))
+    replay = bootstrap_ensemble(
+        engine, dataset, UncertaintyConfig(bootstrap_iterations=10, random_seed=unseeded.diagnostics["random_seed"], keep_runs=True)
+    )
+    assert replay.results == unseeded.results
+
+
+def test_streaming_statistics_match_batch_results() -> None:
+    rng = np.random.default_rng(3)
+    rows = rng.normal([1.0, 700.0], [0.2, 40.0], size=(20000, 2))
+    moments, sketch = RunningMoments(2), QuantileSketch()
+    for chunk in np.array_split(rows, 37):
+        moments.update(chunk)
+        sketch.update(chunk[:, 1])
+
+    np.testing.assert_allclose(moments.mean, rows.mean(axis=0))
+    np.testing.assert_allclose(moments.covariance(), np.cov(rows.T, ddof=0))
+    levels = [0.001, 0.025, 0.5, 0.975, 0.999]
+    np.testing.assert_allclose(sketch.quantile(levels), np.quantile(rows[:, 1], levels), rtol=2e-3)
+    assert sketch.centroids() < 400
+
+    halves = EnsembleAccumulator(base=[1.0, 700.0]), EnsembleAccumulator(base=[1.0, 700.0])
+    whole = EnsembleAccumulator(base=[1.0, 700.0])
+    halves[0].update(rows[:10000, 0], rows[:10000, 1])
+    halves[1].update(rows[10000:, 0], rows[10000:, 1])
+    whole.update(rows[:, 0], rows[:, 1])
+    halves[0].merge(halves[1])
+    np.testing.assert_allclose(halves[0].moments.mean, whole.moments.mean)
+    np.testing.assert_allclose(halves[0].intervals(0.95, "bca")["temperature_c"], whole.intervals(0.95, "bca")["temperature_c"], rtol=1e-3)
+
+
+def test_bootstrap_summary_reports_intervals_without_keeping_runs() -> None:
+    engine = MeanOxideEngine(config=None)
+    for interval in ("percentile", "bca"):
+        result = bootstrap_ensemble(
+            engine, _dataset(), UncertaintyConfig(bootstrap_iterations=200, random_seed=11, interval=interval)
+        )
+        low, high = result.summary["t_interval_c"]
+        assert low < result.summary["t_mean_c"] < high
+        assert result.summary["samples"] == 200
+        assert result.summary["pt_correlation"] > 0.99
+        assert len(result.results) == 1
+
+
+def test_multi_engine_pipeline_runs_concurrently_with_timeouts() -> None:
+    started = time.perf_counter()
+    result = run_pipeline_multi(
+        _dataset(),
+        ["test-mean", "test-sleepy", "thermocalc", "test-stuck"],
+        UGPConfig(uncertainty_enabled=True),
+        UncertaintyConfig(bootstrap_iterations=2, random_seed=1),
+        timeout=1.0,
+    )
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.6  # the two sleepy engines overlap instead of adding up
+    statuses = {name: entry["status"] for name, entry in result.diagnostics["engines"].items()}
+    assert statuses == {"test-mean": "ok", "test-sleepy": "ok", "thermocalc": "ok", "test-stuck": "timeout"}
+    assert {p.provenance["engine"] for p in result.results} == {"test-mean", "test-sleepy", "thermocalc"}
+
+    agreement = result.diagnostics["agreement"]
+    assert agreement["engines"] == 3
+    mean_vs_sleepy = next(pair for pair in agreement["pairwise"] if pair["engines"] == ["test-mean", "test-sleepy"])
+    assert mean_vs_sleepy["dp_gpa"] == 0.0 and mean_vs_sleepy["p_sigma"] == 0.0
+    assert agreement["consistent"] is False  # the placeholder THERMOCALC point sits far from the others
+
+    # Engines with no bootstrap spread that still disagree have no finite separation.
+    spreadless = {"p_mean_gpa": 1.0, "p_std_gpa": 0.0, "t_mean_c": 500.0, "t_std_c": 0.0}
+    split = engine_agreement(
+        {
+            "a": PTEnsemble(results=[], summary=spreadless),
+            "b": PTEnsemble(results=[], summary=dict(spreadless, t_mean_c=510.0)),
+        }
+    )
+    assert (split["pairwise"][0]["p_sigma"], split["pairwise"][0]["t_sigma"]) == (0.0, None)
+    assert split["consistent"] is False
+    json.dumps(split, allow_nan=False)
+
+
+def test_process_engines_that_time_out_are_terminated() -> None:
+    import multiprocessing
+
+    started = time.perf_counter()
+    result = run_pipeline_multi(_dataset(), ["test-mean", "test-stuck"], UGPConfig(), timeout=0.5, executor="process")
+
+    assert time.perf_counter() - started < StuckEngine.delay
+    statuses = {name: entry["status"] for name, entry in result.diagnostics["engines"].items()}
+    assert statuses == {"test-mean": "ok", "test-stuck": "timeout"}
+    assert multiprocessing.active_children() == []
+
+
+def test_result_cache_skips_recomputation_and_resumes_bootstrap(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache")
+    config = UGPConfig(uncertainty_enabled=True)
+    uncertainty = UncertaintyConfig(bootstrap_iterations=30, random_seed=5)
+
+    CountingEngine.calls = 0
+    first = run_pipeline(_dataset(), "test-counting", config, uncertainty, cache=cache)
+    assert CountingEngine.calls == 31
+    parallel = UncertaintyConfig(bootstrap_iterations=30, random_seed=5, workers=4, executor="thread")
+    again = run_pipeline(_dataset(), "test-counting", config, parallel, cache=cache)
+    assert CountingEngine.calls == 31
+    assert again.summary == first.summary
+
+    # Losing the final result (an interrupted run) only recomputes missing iterations.
+    cache.purge(namespace="results")
+    for path in sorted((tmp_path / "cache" / "bootstrap").glob("*/*.json"))[:4]:
+        path.unlink()
+    resumed = run_pipeline(_dataset(), "test-counting", config, uncertainty, cache=cache)
+    assert CountingEngine.calls == 36
+    assert resumed.summary == first.summary
+
+    stats = cache.stats()
+    assert stats.namespaces["bootstrap"]["entries"] == 30
+    assert cache.evict(max_bytes=stats.bytes // 2) > 0
+    assert cache.stats().bytes <= stats.bytes // 2
+
+    # Once sized, evict under the limit relies on the journal instead of walking the store.
+    cache._entries = lambda: pytest.fail("evict scanned a store that is under its limit")
+    assert cache.evict(max_bytes=stats.bytes) == 0
+    run_pipeline(_dataset(), "test-counting", config, replace(uncertainty, random_seed=6), cache=cache)
+    assert cache.evict(max_bytes=10 * stats.bytes) == 0
+    assert cache.estimated_bytes() > stats.bytes
+
+
+def test_unseeded_bootstrap_bypasses_the_cache(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "cache")
+    config = UGPConfig(uncertainty_enabled=True)
+    unseeded = UncertaintyConfig(bootstrap_iterations=20)
+    first = run_pipeline(_dataset(), "test-mean", config, unseeded, cache=cache)
+    second = run_pipeline(_dataset(), "test-mean", config, unseeded, cache=cache)
+    # Only the deterministic base run is stored, and each call draws new resamples.
+    assert cache.stats().namespaces == {"results": {"entries": 1, "bytes": cache.stats().bytes}}
+    assert first.diagnostics["random_seed"] != second.diagnostics["random_seed"]
+    assert first.summary != second.summary
+
+
+STAND_IN_WORKER = textwrap.dedent(
+    """
+    import json, os, sys, time
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        job = request.get("job")
+        if job is None:
+            with open(request["job_path"]) as handle:
+                job = json.load(handle)
+        analyses = job["analyses"]
+        mineral = analyses[0]["mineral"]
+        if mineral == "crash":
+            os._exit(3)
+        if mineral == "hang":
+            time.sleep(30)
+        if mineral == "bad":
+            reply = {"id": request["id"], "error": "unsupported mineral"}
+        else:
+            silica = sum(a["oxides_wt_pct"]["SiO2"] for a in analyses) / len(analyses)
+            point = {
+                "pressure_gpa": silica / 50.0,
+                "temperature_c": 10.0 * silica,
+                "method": "stand-in",
+                "provenance": {"pid": os.getpid()},
+            }
+            reply = {"id": request["id"], "result": {"results": [point]}}
+        sys.stdout.write(json.dumps(reply) + "\\n")
+        sys.stdout.flush()
+    """
+)
+
+
+def _single(mineral: str) -> ThermoDataset:
+    return ThermoDataset(
+        analyses=[MineralAnalysis(mineral=mineral, oxides_wt_pct={"SiO2": 40.0}, metadata=SampleMetadata("S"))]
+    )
+
+
+def test_subprocess_engine_reuses_workers_and_recovers(tmp_path: Path) -> None:
+    script = tmp_path / "stand_in.py"
+    script.write_text(STAND_IN_WORKER)
+    engine = SubprocessEngine(config=None, command=[sys.executable, str(script)], pool_size=2)
+    engine.job_timeout = 1.0
+    try:
+        first, second = engine.run(_dataset()), engine.run(_dataset())
+        assert first.results[0].provenance["pid"] == second.results[0].provenance["pid"]
+        assert first.results[0].pressure_gpa == MeanOxideEngine(None).run(_dataset()).results[0].pressure_gpa
+
+        batch = asyncio.run(engine.run_many([_dataset(size) for size in (2, 4, 6, 8)]))
+        assert [r.results[0].temperature_c for r in batch] == [365.0, 375.0, 385.0, 395.0]
+
+        with pytest.raises(EngineTimeout):
+            engine.run(_single("hang"))
+        with pytest.raises(EngineCrashed):
+            engine.run(_single("crash"))
+        with pytest.raises(EngineError, match="unsupported"):
+            engine.run(_single("bad"))
+        assert engine.pool.restarts == 3  # the timeout, the crash and its one retry
+        assert engine.run(_dataset()).results[0].temperature_c == first.results[0].temperature_c
+
+        serial = bootstrap_ensemble(
+            MeanOxideEngine(None), _dataset(), UncertaintyConfig(bootstrap_iterations=12, random_seed=2)
+        )
+        pooled = bootstrap_ensemble(
+            engine, _dataset(), UncertaintyConfig(bootstrap_iterations=12, random_seed=2, workers=2, executor="thread")
+        )
+        assert pooled.summary == serial.summary
+    finally:
+        engine.close()
+
+    file_engine = SubprocessEngine(config=None, command=[sys.executable, str(script)], pool_size=1)
+    file_engine.transport = "file"
+    try:
+        assert file_engine.run(_dataset()).results[0].temperature_c == first.results[0].temperature_c
+    finally:
+        file_engine.close()
+
+
+def test_columnar_dataset_round_trips_and_resamples_like_objects() -> None:
+    dataset = _dataset()
+    dataset.analyses[3].oxides_wt_pct["FeO"] = 8.5
+    columnar = ColumnarDataset.from_dataset(dataset)
+
+    assert columnar.oxides == ("SiO2", "Al2O3", "FeO")
+    assert columnar.values.shape == (12, 3)
+    assert np.isnan(columnar.column("FeO")).sum() == 11
+    assert len(columnar.sample_metadata) == 12 and columnar.mineral_names == ("garnet",)
+    assert columnar.to_dataset() == dataset
+    assert columnar.analyses[3] == dataset.analyses[3]
+    assert list(columnar.analyses[2:4]) == list(dataset.analyses[2:4])
+    assert dataset_hash(columnar) == dataset_hash(dataset)
+    assert columnar == ColumnarDataset.from_dataset(dataset)  # NaN cells compare equal
+    assert columnar != columnar.take([1, 0, *range(2, 12)])
+
+    picked = columnar.take([5, 5, 0])
+    assert picked.column("SiO2").tolist() == [41.0, 41.0, 36.0]
+    assert picked.sample_ids.tolist() == ["S5", "S5", "S0"]
+    assert picked.sample_metadata is columnar.sample_metadata
+
+    config = UncertaintyConfig(bootstrap_iterations=25, random_seed=9, keep_runs=True)
+    engine = MeanOxideEngine(config=None)
+    assert bootstrap_ensemble(engine, columnar, config).results == bootstrap_ensemble(engine, dataset, config).results
+
+
+def test_streaming_readers_agree_across_formats(tmp_path: Path) -> None:
+    dataset = _dataset(25)
+    dataset.analyses[7].oxides_wt_pct["FeO"] = 8.5
+    dataset.analyses[9].metadata.rock_name = "metapelite"
+    entries = [
+        {"mineral": a.mineral, "oxides_wt_pct": a.oxides_wt_pct, "metadata": a.metadata.__dict__}
+        for a in dataset.analyses
+    ]
+
+    json_path = tmp_path / "probe.json"
+    json_path.write_text(json.dumps({"analyses": entries}))
+    ndjson_path = tmp_path / "probe.ndjson"
+    ndjson_path.write_text(json.dumps({"reference": "wt%"}) + "\n" + "\n".join(json.dumps(e) for e in entries) + "\n")
+    csv_path = tmp_path / "probe.csv"
+    rows = ["mineral,sample_id,rock_name,SiO2,Al2O3,FeO"]
+    for a in dataset.analyses:
+        oxides = a.oxides_wt_pct
+        cells = [a.mineral, a.metadata.sample_id, a.metadata.rock_name or "", oxides["SiO2"], oxides["Al2O3"], oxides.get("FeO", "")]
+        rows.append(",".join(str(cell) for cell in cells))
+    csv_path.write_text("\n".join(rows) + "\n")
+    binary_path = tmp_path / "probe.ugpc"
+    write_columnar(ColumnarDataset.from_dataset(dataset), binary_path)
+
+    for path in (json_path, ndjson_path, csv_path, binary_path):
+        columnar = load_columnar(str(path))
+        assert columnar.to_dataset() == dataset, path.suffix
+        assert dataset_hash(columnar) == dataset_hash(dataset), path.suffix
+        chunks = list(iter_analyses(str(path), chunk_size=10))
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        assert [a for chunk in chunks for a in chunk] == list(dataset.analyses)
+
+    mapped = read_dataset(str(binary_path))
+    assert isinstance(mapped.values, np.memmap)
+    assert mapped.take([0, 0]).column("SiO2").tolist() == [36.0, 36.0]
+
+
+def test_result_writers_stream_bootstrap_points(tmp_path: Path, monkeypatch) -> None:
+    from ugp.io import writer as writer_module
+
+    monkeypatch.setattr(writer_module, "FLUSH_ROWS", 7)  # spill the .ugpr columns in several blocks
+    engine = MeanOxideEngine(config=None)
+    kept = bootstrap_ensemble(engine, _dataset(), UncertaintyConfig(bootstrap_iterations=40, random_seed=4, keep_runs=True))
+
+    for suffix in (".json", ".ndjson", ".ugpr"):
+        path = tmp_path / f"ensemble{suffix}"
+        with open_result_writer(path) as writer:
+            streamed = bootstrap_ensemble(
+                engine, _dataset(), UncertaintyConfig(bootstrap_iterations=40, random_seed=4), sink=writer
+            )
+            writer.close(streamed.summary, streamed.diagnostics)
+        assert len(streamed.results) == 1
+        loaded = read_result(str(path))
+        assert loaded.results == kept.results, suffix
+        assert loaded.summary == streamed.summary == kept.summary
+
+    columns = read_result_columns(tmp_path / "ensemble.ugpr")
+    assert isinstance(columns.pressure_gpa, np.memmap)
+    assert columns.method_names == ["mean"] and len(columns.provenance_table) == 1
+    np.testing.assert_array_equal(columns.temperature_c, [p.temperature_c for p in kept.results])
+
+    write_result(kept, tmp_path / "copy.ndjson")
+    assert read_result(str(tmp_path / "copy.ndjson")).results == kept.results
+
+    for suffix in (".json", ".ugpr"):
+        partial = tmp_path / f"failed{suffix}"
+        with pytest.raises(RuntimeError):
+            with open_result_writer(partial) as writer:
+                writer.write_points(kept.results)
+                raise RuntimeError("engine failed")
+    assert not any("failed" in path.name for path in tmp_path.iterdir())  # nor any spilled columns
+
+
+# Cold-start budget for `import ugp.cli`; the CLI imports only the standard
+# library until a command needs NumPy or an engine.
+CLI_IMPORT_BUDGET_S = 0.25
+
+
+def test_engine_registry_loads_declared_engines_on_demand() -> None:
+    registry = EngineRegistry(entry_point_group=None)
+    registry.declare("lazy-thermocalc", "ugp.calculators.thermocalc:build_thermocalc")
+    assert registry.available() == ["lazy-thermocalc"] and registry.loaded() == []
+
+    from ugp.calculators.thermocalc import build_thermocalc
+
+    assert registry.get("lazy-thermocalc") is build_thermocalc
+    assert registry.loaded() == ["lazy-thermocalc"]
+    with pytest.raises(ValueError):
+        registry.declare("lazy-thermocalc", "ugp.calculators.perplex:build_perplex")
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_cli_cold_start_does_not_import_engines_or_numpy() -> None:
+    probe = textwrap.dedent(
+        """
+        import contextlib, io, json, sys
+        from ugp.cli import main
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            main(["engines"])
+        heavy = sorted(m for m in sys.modules if m == "numpy" or m.startswith(("ugp.calculators", "ugp.core.pipeline")))
+        print(json.dumps({"engines": out.getvalue().split(), "heavy": heavy}))
+        """
+    )
+    root = Path(__file__).resolve().parents[1]
+    completed = subprocess.run([sys.executable, "-c", probe], cwd=root, capture_output=True, text=True, check=True)
+    report = json.loads(completed.stdout)
+    assert {"thermocalc", "perplex", "pywerami"} <= set(report["engines"])
+    assert report["heavy"] == []
+
+    timings = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ugp.cli"], cwd=root, capture_output=True, text=True, check=True
+    )
+    # Last line of -X importtime is the top-level module: "import time: self | cumulative | ugp.cli".
+    cumulative_us = int(timings.stderr.strip().splitlines()[-1].split("|")[1])
+    assert cumulative_us / 1e6 < CLI_IMPORT_BUDGET_S
+
+
+def test_batch_reuses_engines_and_reports_failures(tmp_path: Path, monkeypatch) -> None:
+    from ugp.core import batch
+    from ugp.core.batch import discover_inputs, run_batch
+
+    for i in range(6):
+        analyses = [
+            {"mineral": a.mineral, "oxides_wt_pct": a.oxides_wt_pct, "metadata": {"sample_id": a.metadata.sample_id}}
+            for a in _dataset(4 + i).analyses
+        ]
+        payload = {"analyses": analyses}
+        (tmp_path / f"sample{i}.json").write_text(json.dumps(payload))
+    (tmp_path / "broken.json").write_text("{not json")
+    paths = discover_inputs([str(tmp_path)])
+    assert len(paths) == 7
+
+    seen = []
+    InstanceCountingEngine.instances = 0
+    serial = run_batch(paths, "test-instances", UGPConfig(), executor="serial", use_cache=False, on_item=seen.append)
+    assert InstanceCountingEngine.instances == 1
+    assert (serial.succeeded, serial.failed) == (6, 1)
+    assert serial.errors[0]["input"].endswith("broken.json") and "JSONDecodeError" in serial.errors[0]["error"]
+
+    pooled = {}
+    report = run_batch(
+        paths, "test-mean", UGPConfig(), workers=3, use_cache=False, on_item=lambda item: pooled.update({item.index: item})
+    )
+    assert (report.succeeded, report.failed) == (6, 1) and sorted(pooled) == list(range(7))
+    assert all(pooled[item.index].summary == item.summary for item in seen)
+
+    # sample1 has five analyses and kills its worker; the rest of the batch still
+    # runs, including datasets submitted after the pool broke.
+    monkeypatch.setattr(batch, "QUEUE_DEPTH", 1)
+    crashed = run_batch(paths, "test-crashing", UGPConfig(), workers=2, use_cache=False)
+    assert (crashed.succeeded, crashed.failed) == (5, 2)
+    assert [error["input"] for error in crashed.errors][1].endswith("sample1.json")
+    assert "BrokenProcessPool" in crashed.errors[1]["error"]
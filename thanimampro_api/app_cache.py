@@ -0,0 +1,30 @@
+"""
+Memoized entry points for the Streamlit app.
+
+They live in an imported module rather than in the app script because Streamlit
+re-executes the script on every rerun; defining them there would rebuild empty
+caches on each interaction. Shared by every session in the server process, so
+results must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+from thanimampro_api.cache import memoize
+from thanimampro_api.inverse import (
+    optimize_synthesis_conditions,
+    pareto_synthesis_conditions,
+    suggest_synthesis_conditions,
+)
+from thanimampro_api.mapper import build_property_map
+from thanimampro_api.predict import predict_properties
+from thanimampro_api.sensitivity import morris_effects, sobol_indices
+from thanimampro_api.structure import analyze_structure_file
+
+cached_analyze_structure = memoize(maxsize=64, name="structure analysis")(analyze_structure_file)
+cached_predict = memoize(maxsize=1024, name="predictions")(predict_properties)
+cached_property_map = memoize(maxsize=32, name="property maps")(build_property_map)
+cached_suggest = memoize(maxsize=64, name="grid suggestions")(suggest_synthesis_conditions)
+cached_optimize = memoize(maxsize=64, name="optimizer runs")(optimize_synthesis_conditions)
+cached_pareto = memoize(maxsize=16, name="pareto fronts")(pareto_synthesis_conditions)
+cached_sobol = memoize(maxsize=16, name="sobol indices")(sobol_indices)
+cached_morris = memoize(maxsize=16, name="morris effects")(morris_effects)
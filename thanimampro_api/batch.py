@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from thanimampro_api.schemas import StructureFeatures
+from thanimampro_api.structure import PARSER_VERSION, analyze_structure_file
+
+STRUCTURE_SUFFIXES = (".cif", ".xrd", ".xy", ".txt")
+# Failures while reading sources; reported per source rather than raised.
+_READ_ERRORS = (OSError, EOFError, zlib.error, zipfile.BadZipFile, tarfile.TarError)
+
+
+@dataclass
+class StructureResult:
+    name: str
+    features: Optional[StructureFeatures]
+    cached: bool = False
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "features": self.features.to_dict() if self.features else None,
+            "cached": self.cached,
+            "error": self.error,
+        }
+
+
+def content_key(filename: str, content: bytes) -> str:
+    """Cache key: content hash, parser flavour (CIF vs pattern) and parser version."""
+    flavour = "cif" if filename.lower().endswith(".cif") else "text"
+    return f"{hashlib.sha256(content).hexdigest()}-{flavour}-v{PARSER_VERSION}"
+
+
+class StructureCache:
+    """On-disk JSON cache of StructureFeatures, sharded by the first two key characters."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[StructureFeatures]:
+        try:
+            payload = json.loads(self._path(key).read_text())
+        except (OSError, ValueError):
+            return None
+        return StructureFeatures(**payload)
+
+    def put(self, key: str, features: StructureFeatures) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial entry.
+        handle, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(handle, "w") as temp:
+            json.dump(features.to_dict(), temp)
+        os.replace(temp_name, path)
+
+
+def _is_structure_name(name: str) -> bool:
+    return name.lower().endswith(STRUCTURE_SUFFIXES)
+
+
+def _read_error(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+def iter_structure_sources(paths: Iterable[str | Path]) -> Iterator[Tuple[str, bytes, Optional[str]]]:
+    """
+    Yield ``(name, bytes, error)`` for structure files in files, directories, .zip
+    and .tar archives. A file, member or archive that cannot be read yields empty
+    content and the error message instead of ending the iteration.
+    """
+    for raw in paths:
+        path = Path(raw)
+        try:
+            if path.is_dir():
+                for child in sorted(path.rglob("*")):
+                    if child.is_file() and _is_structure_name(child.name):
+                        try:
+                            yield str(child), child.read_bytes(), None
+                        except _READ_ERRORS as exc:
+                            yield str(child), b"", _read_error(exc)
+            elif zipfile.is_zipfile(path):
+                with zipfile.ZipFile(path) as archive:
+                    for info in archive.infolist():
+                        if not info.is_dir() and _is_structure_name(info.filename):
+                            try:
+                                yield f"{path}!{info.filename}", archive.read(info), None
+                            except _READ_ERRORS as exc:
+                                yield f"{path}!{info.filename}", b"", _read_error(exc)
+            elif path.is_file() and tarfile.is_tarfile(path):
+                with tarfile.open(path) as archive:
+                    for member in archive:
+                        if member.isfile() and _is_structure_name(member.name):
+                            try:
+                                extracted = archive.extractfile(member)
+                                content = extracted.read() if extracted is not None else None
+                            except _READ_ERRORS as exc:
+                                yield f"{path}!{member.name}", b"", _read_error(exc)
+                                continue
+                            if content is not None:
+                                yield f"{path}!{member.name}", content, None
+            else:
+                yield str(path), path.read_bytes(), None
+        except _READ_ERRORS as exc:
+            # Unreadable path or archive (or one that breaks part way through).
+            yield str(path), b"", _read_error(exc)
+
+
+def _analyze(name: str, content: bytes) -> StructureFeatures:
+    return analyze_structure_file(name, content)
+
+
+def analyze_structure_files(
+    paths: Sequence[str | Path],
+    workers: Optional[int] = None,
+    cache_dir: str | Path | None = None,
+) -> Iterator[StructureResult]:
+    """
+    Analyze many structure files, yielding results as they finish (not in input order).
+
+    Cache hits are answered in the calling process without re-parsing; misses are
+    fanned out to a process pool (``workers=1`` runs inline) with a bounded number
+    of files in flight, then written back to the cache. Sources that cannot be read
+    are reported as results with an ``error``, like files that fail to parse.
+    """
+    cache = StructureCache(cache_dir) if cache_dir is not None else None
+    workers = workers or os.cpu_count() or 1
+
+    pending: Iterator[Tuple[str, str, bytes, Optional[str]]] = (
+        (name, content_key(name, content), content, error) for name, content, error in iter_structure_sources(paths)
+    )
+
+    def finish(name: str, key: str, features: Optional[StructureFeatures], error: Optional[str]) -> StructureResult:
+        if cache is not None and features is not None:
+            cache.put(key, features)
+        return StructureResult(name=name, features=features, error=error)
+
+    if workers == 1:
+        for name, key, content, error in pending:
+            if error is not None:
+                yield StructureResult(name=name, features=None, error=error)
+                continue
+            hit = cache.get(key) if cache is not None else None
+            if hit is not None:
+                yield StructureResult(name=name, features=hit, cached=True)
+                continue
+            try:
+                yield finish(name, key, _analyze(name, content), None)
+            except Exception as exc:  # noqa: BLE001 - report per-file failures, keep going
+                yield finish(name, key, None, f"{type(exc).__name__}: {exc}")
+        return
+
+    max_in_flight = 4 * workers
+    in_flight: Dict[Future, Tuple[str, str]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, key, content, error in pending:
+            if error is not None:
+                yield StructureResult(name=name, features=None, error=error)
+                continue
+            hit = cache.get(key) if cache is not None else None
+            if hit is not None:
+                yield StructureResult(name=name, features=hit, cached=True)
+                continue
+            in_flight[pool.submit(_analyze, name, content)] = (name, key)
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield _collect(future, in_flight.pop(future), finish)
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield _collect(future, in_flight.pop(future), finish)
+
+
+def _collect(future: Future, origin: Tuple[str, str], finish) -> StructureResult:
+    name, key = origin
+    try:
+        return finish(name, key, future.result(), None)
+    except Exception as exc:  # noqa: BLE001 - report per-file failures, keep going
+        return finish(name, key, None, f"{type(exc).__name__}: {exc}")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Batch CIF/XRD structure analysis")
+    parser.add_argument("paths", nargs="+", help="Files, directories, .zip or .tar archives")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", default=".thanimampro_cache/structures", help="Result cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the result cache")
+    parser.add_argument("-o", "--output", default=None, help="Write NDJSON results to this file")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    cache_dir = None if args.no_cache else args.cache_dir
+    out = open(args.output, "w") if args.output else sys.stdout
+    started = time.perf_counter()
+    total = hits = errors = 0
+    try:
+        for result in analyze_structure_files(args.paths, workers=args.workers, cache_dir=cache_dir):
+            total += 1
+            hits += result.cached
+            errors += result.error is not None
+            out.write(json.dumps(result.to_dict()) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{total} files in {elapsed:.2f}s ({hits} cached, {errors} errors)",
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
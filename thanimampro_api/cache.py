@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Callable, Dict, Hashable, List, TypeVar
+
+import numpy as np
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def make_key(value: Any) -> Hashable:
+    """
+    Hashable, value-based key for common argument types.
+
+    Dataclasses, mappings and sequences are converted recursively; arrays and byte
+    strings are reduced to a digest so large uploads are not kept alive as keys.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return ("bytes", hashlib.sha256(value).hexdigest())
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return ("ndarray", value.shape, value.dtype.str, digest)
+    if isinstance(value, np.generic):
+        return value.item()
+    if is_dataclass(value) and not isinstance(value, type):
+        return (type(value).__qualname__,) + tuple(make_key(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, dict):
+        return ("dict",) + tuple(sorted((str(k), make_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(make_key(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return ("set",) + tuple(sorted(make_key(item) for item in value))
+    return value
+
+
+@dataclass
+class CacheStats:
+    name: str
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize: int = 128, name: str = "") -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.name = name
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    _MISSING = object()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, self._MISSING)
+            if value is self._MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.name, self.hits, self.misses, self.evictions, len(self._data), self.maxsize)
+
+
+_REGISTRY: Dict[str, LRUCache] = {}
+
+
+def memoize(maxsize: int = 128, name: str | None = None) -> Callable[[F], F]:
+    """
+    Cache a function's results by argument value in a named, process-wide LRUCache.
+
+    Results are shared between callers (e.g. all Streamlit sessions), so they must
+    be treated as read-only. The cache is exposed as ``wrapper.cache``.
+    """
+
+    def decorator(func: F) -> F:
+        cache = LRUCache(maxsize, name or func.__qualname__)
+        _REGISTRY[cache.name] = cache
+        missing = object()
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (make_key(args), make_key(kwargs))
+            result = cache.get(key, missing)
+            if result is missing:
+                result = func(*args, **kwargs)
+                cache.put(key, result)
+            return result
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def cache_stats() -> List[CacheStats]:
+    return [cache.stats() for cache in _REGISTRY.values()]
+
+
+def clear_caches() -> None:
+    for cache in _REGISTRY.values():
+        cache.clear()
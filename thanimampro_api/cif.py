@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import mmap
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+CifSource = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# One alternation per CIF 1.1 token kind. Matching runs over the raw bytes, so a
+# memory-mapped file is tokenized in a single linear pass without decoding it.
+_TOKEN = re.compile(
+    rb"""
+    (?P<comment>\#[^\r\n]*)
+    | ^;(?P<text>.*?)^;
+    | '(?P<squote>[^\r\n]*?)'(?=[ \t\r\n]|$)
+    | "(?P<dquote>[^\r\n]*?)"(?=[ \t\r\n]|$)
+    | (?P<tag>_[^ \t\r\n]+)
+    | (?P<reserved>(?i:data_|save_)[^ \t\r\n]*|(?i:loop_|global_|stop_)(?=[ \t\r\n]|$))
+    | (?P<word>[^ \t\r\n]+)
+    """,
+    re.VERBOSE | re.MULTILINE | re.DOTALL,
+)
+_DECIMAL = re.compile(rb"\b[0-9]{1,2}\.[0-9]{2,}\b")
+_UNCERTAINTY = re.compile(r"\([0-9]+\)$")
+
+COMMENT = "comment"
+TAG = "tag"
+VALUE = "value"
+RESERVED = "reserved"
+_KINDS = {
+    "comment": COMMENT,
+    "text": VALUE,
+    "squote": VALUE,
+    "dquote": VALUE,
+    "tag": TAG,
+    "reserved": RESERVED,
+    "word": VALUE,
+}
+
+
+def iter_cif_tokens(data: CifSource) -> Iterator[Tuple[str, bytes]]:
+    """Yield ``(kind, raw_bytes)`` tokens; quoted and text-field values come without delimiters."""
+    for match in _TOKEN.finditer(data):
+        group = match.lastgroup
+        yield _KINDS[group], match.group(group)
+
+
+def _number(value: str) -> float:
+    if value in ("?", "."):
+        return float("nan")
+    try:
+        return float(_UNCERTAINTY.sub("", value))
+    except ValueError:
+        return float("nan")
+
+
+@dataclass
+class CellParameters:
+    a: float
+    b: float
+    c: float
+    alpha: float
+    beta: float
+    gamma: float
+    volume: float
+
+
+@dataclass
+class AtomSites:
+    """Columns of an ``_atom_site_`` loop; missing numeric entries are NaN."""
+
+    labels: List[str]
+    type_symbols: List[str]
+    fract_x: np.ndarray
+    fract_y: np.ndarray
+    fract_z: np.ndarray
+    occupancy: np.ndarray
+    u_iso: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+@dataclass
+class AnisotropicADPs:
+    labels: List[str]
+    u11: np.ndarray
+    u22: np.ndarray
+    u33: np.ndarray
+    u12: np.ndarray
+    u13: np.ndarray
+    u23: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+@dataclass
+class CifLoop:
+    tags: List[str]
+    columns: Dict[str, List[str]]
+
+    def __len__(self) -> int:
+        return len(self.columns[self.tags[0]]) if self.tags else 0
+
+    def numbers(self, tag: str) -> np.ndarray:
+        return np.array([_number(value) for value in self.columns[tag]], dtype=float)
+
+
+def _loop_numbers(loop: CifLoop, tag: str) -> np.ndarray:
+    if tag in loop.columns:
+        return loop.numbers(tag)
+    return np.full(len(loop), np.nan)
+
+
+@dataclass
+class CifBlock:
+    name: str
+    items: Dict[str, str] = field(default_factory=dict)
+    loops: List[CifLoop] = field(default_factory=list)
+
+    def value(self, *tags: str) -> Optional[str]:
+        for tag in tags:
+            if tag in self.items:
+                return self.items[tag]
+        return None
+
+    def loop(self, tag: str) -> Optional[CifLoop]:
+        for loop in self.loops:
+            if tag in loop.columns:
+                return loop
+        return None
+
+    def cell(self) -> Optional[CellParameters]:
+        if "_cell_length_a" not in self.items:
+            return None
+        a = _number(self.items["_cell_length_a"])
+        return CellParameters(
+            a=a,
+            b=_number(self.items.get("_cell_length_b", "?")),
+            c=_number(self.items.get("_cell_length_c", "?")),
+            alpha=_number(self.items.get("_cell_angle_alpha", "90")),
+            beta=_number(self.items.get("_cell_angle_beta", "90")),
+            gamma=_number(self.items.get("_cell_angle_gamma", "90")),
+            volume=_number(self.items.get("_cell_volume", "?")),
+        )
+
+    def space_group(self) -> Optional[str]:
+        return self.value(
+            "_space_group_name_h-m_alt",
+            "_symmetry_space_group_name_h-m",
+            "_space_group_name_hall",
+            "_symmetry_space_group_name_hall",
+        )
+
+    def symmetry_operations(self) -> List[str]:
+        for tag in ("_space_group_symop_operation_xyz", "_symmetry_equiv_pos_as_xyz"):
+            loop = self.loop(tag)
+            if loop is not None:
+                return list(loop.columns[tag])
+        return []
+
+    def atom_sites(self) -> Optional[AtomSites]:
+        loop = self.loop("_atom_site_label")
+        if loop is None:
+            return None
+        labels = loop.columns["_atom_site_label"]
+        return AtomSites(
+            labels=list(labels),
+            type_symbols=list(loop.columns.get("_atom_site_type_symbol", labels)),
+            fract_x=_loop_numbers(loop, "_atom_site_fract_x"),
+            fract_y=_loop_numbers(loop, "_atom_site_fract_y"),
+            fract_z=_loop_numbers(loop, "_atom_site_fract_z"),
+            occupancy=_loop_numbers(loop, "_atom_site_occupancy"),
+            u_iso=_loop_numbers(loop, "_atom_site_u_iso_or_equiv"),
+        )
+
+    def anisotropic_adps(self) -> Optional[AnisotropicADPs]:
+        loop = self.loop("_atom_site_aniso_label")
+        if loop is None:
+            return None
+        return AnisotropicADPs(
+            labels=list(loop.columns["_atom_site_aniso_label"]),
+            u11=_loop_numbers(loop, "_atom_site_aniso_u_11"),
+            u22=_loop_numbers(loop, "_atom_site_aniso_u_22"),
+            u33=_loop_numbers(loop, "_atom_site_aniso_u_33"),
+            u12=_loop_numbers(loop, "_atom_site_aniso_u_12"),
+            u13=_loop_numbers(loop, "_atom_site_aniso_u_13"),
+            u23=_loop_numbers(loop, "_atom_site_aniso_u_23"),
+        )
+
+
+@dataclass
+class CifDocument:
+    """Parsed data blocks plus text statistics gathered during the same pass."""
+
+    blocks: List[CifBlock]
+    keyword_counts: Dict[str, int]
+    decimal_count: int
+
+    def first_block_with_cell(self) -> Optional[CifBlock]:
+        for block in self.blocks:
+            if "_cell_length_a" in block.items:
+                return block
+        return self.blocks[0] if self.blocks else None
+
+
+def _close_loop(block: CifBlock, tags: List[str], values: List[str]) -> None:
+    if not tags:
+        return
+    width = len(tags)
+    rows = len(values) // width
+    block.loops.append(CifLoop(tags=tags, columns={tag: values[i : rows * width : width] for i, tag in enumerate(tags)}))
+
+
+def parse_cif(data: CifSource, keywords: Sequence[str] = ()) -> CifDocument:
+    """
+    Parse CIF content in one streaming pass over the bytes.
+
+    Tags are lower-cased; values are decoded individually. While tokenizing, the
+    parser also counts case-insensitive occurrences of ``keywords`` and of
+    peak-like decimals (``12.345``) anywhere in the content.
+    """
+    encoded_keywords = [(word, word.lower().encode()) for word in keywords]
+    keyword_counts = {word: 0 for word in keywords}
+    decimal_count = 0
+
+    blocks: List[CifBlock] = []
+    block = CifBlock(name="")
+    pending_tag: Optional[str] = None
+    loop_tags: Optional[List[str]] = None
+    loop_values: List[str] = []
+
+    for kind, raw in iter_cif_tokens(data):
+        # Every token is scanned, block names and tags included, so counts match a
+        # search over the whole text.
+        if encoded_keywords:
+            lowered = raw.lower()
+            for word, encoded in encoded_keywords:
+                keyword_counts[word] += lowered.count(encoded)
+        if b"." in raw:
+            decimal_count += len(_DECIMAL.findall(raw))
+        if kind == COMMENT or kind == VALUE:
+            if kind == COMMENT:
+                continue
+            value = raw.decode("utf-8", errors="ignore")
+            if loop_tags is not None:
+                loop_values.append(value)
+            elif pending_tag is not None:
+                block.items[pending_tag] = value
+                pending_tag = None
+        elif kind == TAG:
+            tag = raw.decode("utf-8", errors="ignore").lower()
+            if loop_tags is not None and not loop_values:
+                loop_tags.append(tag)
+                continue
+            if loop_tags is not None:
+                _close_loop(block, loop_tags, loop_values)
+                loop_tags, loop_values = None, []
+            pending_tag = tag
+        else:
+            lowered = raw.lower()
+            if loop_tags is not None:
+                _close_loop(block, loop_tags, loop_values)
+                loop_tags, loop_values = None, []
+            pending_tag = None
+            if lowered == b"loop_":
+                loop_tags = []
+            elif lowered.startswith(b"data_"):
+                if block.name or block.items or block.loops:
+                    blocks.append(block)
+                block = CifBlock(name=raw[5:].decode("utf-8", errors="ignore"))
+    if loop_tags is not None:
+        _close_loop(block, loop_tags, loop_values)
+    if block.name or block.items or block.loops:
+        blocks.append(block)
+    return CifDocument(blocks=blocks, keyword_counts=keyword_counts, decimal_count=decimal_count)
+
+
+def parse_cif_file(path: str | Path, keywords: Sequence[str] = ()) -> CifDocument:
+    """Memory-map ``path`` and parse it without reading it into a Python string."""
+    with open(path, "rb") as handle:
+        if Path(path).stat().st_size == 0:
+            return parse_cif(b"", keywords)
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_cif(mapped, keywords)
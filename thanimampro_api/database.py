@@ -1,42 +1,348 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
+from thanimampro_api.storage import staged_directory
+from thanimampro_api.textindex import NGramIndex, similarity
+from thanimampro_telemetry import timed
+
+LITERATURE_COLUMNS = [
+    "material_system",
+    "method",
+    "temperature_c",
+    "pH",
+    "band_gap_ev",
+    "surface_area_m2_g",
+    "doi",
+]
+NUMERIC_LITERATURE_COLUMNS = ("temperature_c", "pH", "band_gap_ev", "surface_area_m2_g")
+STORE_FORMAT_VERSION = 1
+
+
+def source_fingerprint(path: str | Path) -> Optional[Dict[str, object]]:
+    """Size and SHA-256 of a source file (None if it does not exist); mtimes are not trusted."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": path.stat().st_size, "sha256": digest.hexdigest()}
+
 
 def load_literature_data(csv_path: str | Path) -> pd.DataFrame:
     path = Path(csv_path)
     if not path.exists():
-        return pd.DataFrame(
-            columns=[
-                "material_system",
-                "method",
-                "temperature_c",
-                "pH",
-                "band_gap_ev",
-                "surface_area_m2_g",
-                "doi",
-            ]
-        )
+        return pd.DataFrame(columns=LITERATURE_COLUMNS)
     return pd.read_csv(path)
 
 
+class LiteratureView:
+    """Row positions selected from a LiteratureStore; columns are gathered only on access."""
+
+    def __init__(self, store: "LiteratureStore", positions: np.ndarray, scores: np.ndarray | None = None) -> None:
+        self.store = store
+        self.positions = positions
+        self.scores = scores
+
+    def __len__(self) -> int:
+        return int(self.positions.size)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.store.column(name, self.positions)
+
+    def to_frame(self, limit: Optional[int] = None) -> pd.DataFrame:
+        positions = self.positions if limit is None else self.positions[:limit]
+        frame = self.store.to_frame(positions)
+        if self.scores is not None:
+            frame["match_score"] = np.round(self.scores[: len(positions)], 3)
+        return frame
+
+
+class LiteratureStore:
+    """
+    Column store for literature records with query indexes.
+
+    Text columns are dictionary-encoded (integer codes plus a category table), so
+    substring filters run over the distinct values only. Numeric columns keep an
+    argsort index, so range filters are two binary searches. Queries return
+    LiteratureView position sets; rows are materialised only when asked for.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        codes: Dict[str, np.ndarray],
+        categories: Dict[str, np.ndarray],
+        numeric: Dict[str, np.ndarray],
+        order: Dict[str, np.ndarray],
+        sorted_values: Dict[str, np.ndarray] | None = None,
+    ) -> None:
+        self.columns = list(columns)
+        self._codes = codes
+        self._categories = categories
+        self._numeric = numeric
+        self._order = order
+        self._sorted = sorted_values or {name: values[order[name]] for name, values in numeric.items()}
+        self._indexes: Dict[str, NGramIndex] = {}
+        self._lookups: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        for values in (*self._numeric.values(), *self._codes.values()):
+            return int(values.size)
+        return 0
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "LiteratureStore":
+        codes: Dict[str, np.ndarray] = {}
+        categories: Dict[str, np.ndarray] = {}
+        numeric: Dict[str, np.ndarray] = {}
+        order: Dict[str, np.ndarray] = {}
+        for name in frame.columns:
+            series = frame[name]
+            numeric_dtype = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            if numeric_dtype or name in NUMERIC_LITERATURE_COLUMNS:
+                values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+                numeric[name] = values
+                order[name] = np.argsort(values, kind="stable")
+            else:
+                column_codes, uniques = pd.factorize(series)
+                codes[name] = column_codes.astype(np.int32)
+                categories[name] = np.asarray(uniques, dtype=object).astype(str)
+        return cls(list(frame.columns), codes, categories, numeric, order)
+
+    def column(self, name: str, positions: np.ndarray | None = None) -> np.ndarray:
+        if name in self._numeric:
+            values = self._numeric[name]
+            return values if positions is None else values[positions]
+        column_codes = self._codes[name] if positions is None else self._codes[name][positions]
+        # Code -1 marks a missing value; map it onto a trailing None category.
+        lookup = np.append(self._categories[name].astype(object), None)
+        return lookup[column_codes]
+
+    def to_frame(self, positions: np.ndarray | None = None) -> pd.DataFrame:
+        return pd.DataFrame({name: self.column(name, positions) for name in self.columns}, columns=self.columns)
+
+    def _text_mask(self, name: str, pattern: str) -> np.ndarray:
+        categories = pd.Series(self._categories[name], dtype=object)
+        matching = categories.str.contains(pattern, case=False, na=False).to_numpy(dtype=bool)
+        return np.append(matching, False)[self._codes[name]]
+
+    def _range_positions(self, name: str, low: float | None, high: float | None) -> np.ndarray:
+        # NaNs sort last, so they fall outside every range.
+        ordered = self._sorted[name]
+        start = 0 if low is None else int(np.searchsorted(ordered, low, side="left"))
+        if high is None:
+            stop = int(np.searchsorted(ordered, np.nan, side="left"))
+        else:
+            stop = int(np.searchsorted(ordered, high, side="right"))
+        return self._order[name][start:stop]
+
+    def _range_mask(self, ranges: Mapping[str, Tuple[float | None, float | None]] | None) -> Optional[np.ndarray]:
+        mask: Optional[np.ndarray] = None
+        for name, (low, high) in (ranges or {}).items():
+            if low is None and high is None:
+                continue
+            selected = np.zeros(len(self), dtype=bool)
+            selected[self._range_positions(name, low, high)] = True
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    def query(
+        self,
+        text: Mapping[str, str] | None = None,
+        ranges: Mapping[str, Tuple[float | None, float | None]] | None = None,
+    ) -> LiteratureView:
+        """Rows matching every case-insensitive substring in ``text`` and every inclusive range."""
+        mask = self._range_mask(ranges)
+        for name, pattern in (text or {}).items():
+            if not pattern:
+                continue
+            selected = self._text_mask(name, pattern)
+            mask = selected if mask is None else mask & selected
+        positions = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        return LiteratureView(self, positions)
+
+    def _text_index(self, name: str) -> NGramIndex:
+        # Indexes cover the category table, i.e. distinct values, and catch up on
+        # categories added by append() without re-indexing earlier ones.
+        index = self._indexes.setdefault(name, NGramIndex())
+        categories = self._categories[name]
+        if len(index) < len(categories):
+            index.extend(categories[len(index) :])
+        return index
+
+    def fuzzy_search(
+        self,
+        query: str,
+        columns: Sequence[str] | None = None,
+        ranges: Mapping[str, Tuple[float | None, float | None]] | None = None,
+        min_score: float = 0.3,
+        limit: Optional[int] = None,
+    ) -> LiteratureView:
+        """
+        Rank rows by n-gram similarity of ``query`` to the combined text of ``columns``
+        (all text columns by default), keeping rows within ``ranges``; best first.
+        """
+        # A row's text is the union of its columns, so a query like "titania sol gel"
+        # collects grams from material_system and method together.
+        row_overlap = np.zeros(len(self))
+        row_size = np.zeros(len(self))
+        query_size = 0
+        for name in columns or list(self._codes):
+            index = self._text_index(name)
+            overlap, query_size = index.overlaps(query)
+            codes = self._codes[name]
+            row_overlap += np.append(overlap, 0.0)[codes]
+            row_size += np.append(index.sizes, 0.0)[codes]
+        row_scores = similarity(row_overlap, query_size, row_size)
+        mask = row_scores >= min_score
+        range_mask = self._range_mask(ranges)
+        if range_mask is not None:
+            mask &= range_mask
+        positions = np.flatnonzero(mask)
+        positions = positions[np.argsort(-row_scores[positions], kind="stable")][:limit]
+        return LiteratureView(self, positions, scores=row_scores[positions])
+
+    def append(self, frame: pd.DataFrame) -> None:
+        """
+        Add rows in place. Sorted indexes are merged and new text values extend the
+        category tables, so existing codes, index entries and postings stay valid.
+        """
+        unknown = [name for name in frame.columns if name not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown literature columns {unknown}")
+        base = len(self)
+        for name in self._numeric:
+            source = frame[name] if name in frame.columns else pd.Series(np.nan, index=frame.index)
+            values = pd.to_numeric(source, errors="coerce").to_numpy(dtype=float)
+            new_order = np.argsort(values, kind="stable")
+            new_sorted = values[new_order]
+            insert_at = np.searchsorted(self._sorted[name], new_sorted, side="right")
+            self._sorted[name] = np.insert(self._sorted[name], insert_at, new_sorted)
+            self._order[name] = np.insert(self._order[name], insert_at, new_order + base)
+            self._numeric[name] = np.concatenate([self._numeric[name], values])
+        for name in self._codes:
+            lookup = self._lookups.get(name)
+            if lookup is None:
+                lookup = self._lookups[name] = {value: code for code, value in enumerate(self._categories[name])}
+            added: list[str] = []
+            codes = np.full(len(frame), -1, dtype=np.int32)
+            if name in frame.columns:
+                for row, value in enumerate(frame[name]):
+                    if pd.isna(value):
+                        continue
+                    key = str(value)
+                    code = lookup.get(key)
+                    if code is None:
+                        code = lookup[key] = len(lookup)
+                        added.append(key)
+                    codes[row] = code
+            if added:
+                self._categories[name] = np.concatenate([self._categories[name], np.asarray(added, dtype=str)])
+            self._codes[name] = np.concatenate([self._codes[name], codes])
+
+    def search(
+        self,
+        material_system: str = "",
+        method: str = "",
+        min_band_gap: float | None = None,
+        max_band_gap: float | None = None,
+    ) -> LiteratureView:
+        return self.query(
+            text={"material_system": material_system, "method": method},
+            ranges={"band_gap_ev": (min_band_gap, max_band_gap)},
+        )
+
+    def save(self, directory: str | Path, source: Mapping[str, object] | None = None) -> None:
+        """
+        Persist as one .npy file per array (memory-mappable) plus a JSON manifest.
+
+        The store is written to a temporary directory beside ``directory`` and then
+        swapped in, so a failed save leaves the previous store intact. ``source`` is
+        recorded for staleness checks (see ``source_fingerprint``).
+        """
+        with staged_directory(directory) as target:
+            self._write(target, source)
+
+    def _write(self, target: Path, source: Mapping[str, object] | None) -> None:
+        for name, values in self._numeric.items():
+            np.save(target / f"{name}.values.npy", values)
+            np.save(target / f"{name}.order.npy", self._order[name])
+            np.save(target / f"{name}.sorted.npy", self._sorted[name])
+        for name, column_codes in self._codes.items():
+            np.save(target / f"{name}.codes.npy", column_codes)
+        manifest = {
+            "format": STORE_FORMAT_VERSION,
+            "columns": self.columns,
+            "numeric": list(self._numeric),
+            "categories": {name: values.tolist() for name, values in self._categories.items()},
+            "source": dict(source) if source is not None else None,
+        }
+        (target / "manifest.json").write_text(json.dumps(manifest))
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = True) -> "LiteratureStore":
+        source = Path(directory)
+        manifest = json.loads((source / "manifest.json").read_text())
+        if manifest.get("format") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported literature store format {manifest.get('format')}")
+        mode = "r" if mmap else None
+        numeric = {name: np.load(source / f"{name}.values.npy", mmap_mode=mode) for name in manifest["numeric"]}
+        order = {name: np.load(source / f"{name}.order.npy", mmap_mode=mode) for name in manifest["numeric"]}
+        sorted_values = {name: np.load(source / f"{name}.sorted.npy", mmap_mode=mode) for name in manifest["numeric"]}
+        categories = {name: np.asarray(values, dtype=str) for name, values in manifest["categories"].items()}
+        codes = {name: np.load(source / f"{name}.codes.npy", mmap_mode=mode) for name in categories}
+        return cls(manifest["columns"], codes, categories, numeric, order, sorted_values)
+
+
+@timed("literature.load_store")
+def load_literature_store(csv_path: str | Path, store_dir: str | Path | None = None) -> LiteratureStore:
+    """
+    Literature store for ``csv_path``. With ``store_dir``, a persisted store is reused
+    while the CSV content is unchanged (by size and hash, not mtime) and rebuilt
+    (and re-saved) when it changes.
+    """
+    path = Path(csv_path)
+    source = source_fingerprint(path)
+    if store_dir is not None:
+        try:
+            manifest = json.loads((Path(store_dir) / "manifest.json").read_text())
+            if manifest.get("format") == STORE_FORMAT_VERSION and manifest.get("source") == source:
+                return LiteratureStore.load(store_dir)
+        except (OSError, ValueError):
+            pass  # missing, unreadable or swapped out mid-read: rebuild
+    store = LiteratureStore.from_frame(load_literature_data(path))
+    if store_dir is not None:
+        store.save(store_dir, source=source)
+    return store
+
+
+@timed("literature.search")
 def search_literature(
-    frame: pd.DataFrame,
+    frame: pd.DataFrame | LiteratureStore,
     material_system: str = "",
     method: str = "",
     min_band_gap: float | None = None,
     max_band_gap: float | None = None,
 ) -> pd.DataFrame:
-    filtered = frame.copy()
+    if isinstance(frame, LiteratureStore):
+        return frame.search(material_system, method, min_band_gap, max_band_gap).to_frame()
+
+    mask = pd.Series(True, index=frame.index)
     if material_system:
-        filtered = filtered[filtered["material_system"].str.contains(material_system, case=False, na=False)]
+        mask &= frame["material_system"].str.contains(material_system, case=False, na=False)
     if method:
-        filtered = filtered[filtered["method"].str.contains(method, case=False, na=False)]
+        mask &= frame["method"].str.contains(method, case=False, na=False)
     if min_band_gap is not None:
-        filtered = filtered[filtered["band_gap_ev"] >= min_band_gap]
+        mask &= frame["band_gap_ev"] >= min_band_gap
     if max_band_gap is not None:
-        filtered = filtered[filtered["band_gap_ev"] <= max_band_gap]
-    return filtered.reset_index(drop=True)
-
+        mask &= frame["band_gap_ev"] <= max_band_gap
+    return frame.loc[mask].reset_index(drop=True)
@@ -1,11 +1,49 @@
 from __future__ import annotations
 
-from dataclasses import replace
+import heapq
+from dataclasses import dataclass, field, replace
 from itertools import product
-from typing import Dict, List
+from typing import Dict, List, Mapping, Tuple
 
-from thanimampro_api.predict import predict_properties
-from thanimampro_api.schemas import DesiredPropertyTargets, StructureFeatures, SynthesisInput
+import numpy as np
+
+from thanimampro_api.predict import predict_properties, predict_properties_batch
+from thanimampro_api.schemas import (
+    NUMERIC_SYNTHESIS_FIELDS,
+    PROPERTY_NAMES,
+    DesiredPropertyTargets,
+    PredictedPropertiesBatch,
+    StructureFeatures,
+    SynthesisInput,
+)
+from thanimampro_telemetry import timed
+
+
+class TopK:
+    """
+    Bounded max-heap keeping the ``k`` lowest-scored items seen so far.
+
+    Ties keep the earlier item, so ``items()`` matches a stable sort of everything
+    pushed, truncated to ``k``, while memory stays O(k).
+    """
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        self._heap: List[Tuple[float, int, object]] = []
+        self._pushed = 0
+
+    def push(self, score: float, item: object) -> None:
+        if self.k <= 0:
+            return
+        entry = (-score, -self._pushed, item)
+        self._pushed += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List:
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: (-entry[0], -entry[1]))]
 
 
 def _score_candidate(pred: Dict[str, float], desired: DesiredPropertyTargets, particle_size_nm: float) -> float:
@@ -15,6 +53,7 @@ def _score_candidate(pred: Dict[str, float], desired: DesiredPropertyTargets, pa
     return band_gap_error + surface_area_penalty + size_penalty
 
 
+@timed("inverse.suggest")
 def suggest_synthesis_conditions(
     baseline: SynthesisInput,
     desired: DesiredPropertyTargets,
@@ -26,7 +65,7 @@ def suggest_synthesis_conditions(
     anneal_grid = [1.0, 2.0, 4.0, 6.0]
     calcination_grid = [1.0, 2.0, 3.0, 5.0]
 
-    candidates: List[Dict[str, float | str]] = []
+    ranked = TopK(top_k)
     for temp, ph, anneal, calc_time in product(temp_grid, ph_grid, anneal_grid, calcination_grid):
         trial = replace(
             baseline,
@@ -37,10 +76,11 @@ def suggest_synthesis_conditions(
         )
         pred = predict_properties(trial, structure).to_dict()
         particle_size_nm = max(5.0, 80.0 - 0.07 * temp + 1.2 * calc_time - 1.8 * ph)
-        score = _score_candidate(pred, desired, particle_size_nm)
-        candidates.append(
+        score = round(_score_candidate(pred, desired, particle_size_nm), 4)
+        ranked.push(
+            score,
             {
-                "score": round(score, 4),
+                "score": score,
                 "temperature_c": temp,
                 "pH": ph,
                 "annealing_time_h": anneal,
@@ -48,8 +88,468 @@ def suggest_synthesis_conditions(
                 "estimated_particle_size_nm": round(particle_size_nm, 2),
                 "pred_band_gap_ev": pred["band_gap_ev"],
                 "pred_surface_area_m2_g": pred["specific_surface_area_m2_g"],
-            }
+            },
         )
+    return ranked.items()
+
+
+# Continuous ranges searched by optimize_synthesis_conditions when no bounds are given;
+# they span the values of the exhaustive grid above.
+DEFAULT_SEARCH_BOUNDS: Dict[str, Tuple[float, float]] = {
+    "temperature_c": (450.0, 850.0),
+    "pH": (3.0, 11.0),
+    "annealing_time_h": (1.0, 6.0),
+    "calcination_time_h": (1.0, 5.0),
+}
+
+
+@dataclass
+class OptimizationResult:
+    candidates: List[Dict[str, float | str]]
+    method: str
+    evaluations: int
+    iterations: int
+    converged: bool
+    best_score_history: List[float] = field(default_factory=list)
+    diagnostics: Dict[str, float] = field(default_factory=dict)
+
+
+def _particle_size_batch(temperature: np.ndarray, calcination_time: np.ndarray, ph: np.ndarray) -> np.ndarray:
+    return np.maximum(5.0, 80.0 - 0.07 * temperature + 1.2 * calcination_time - 1.8 * ph)
+
+
+def _score_batch(
+    band_gap: np.ndarray,
+    surface_area: np.ndarray,
+    particle_size_nm: np.ndarray,
+    desired: DesiredPropertyTargets,
+) -> np.ndarray:
+    band_gap_error = np.abs(band_gap - desired.target_band_gap_ev)
+    surface_area_penalty = np.maximum(0.0, desired.min_surface_area_m2_g - surface_area) / 25.0
+    size_penalty = np.maximum(0.0, particle_size_nm - desired.max_particle_size_nm) / 10.0
+    return band_gap_error + surface_area_penalty + size_penalty
+
+
+class _Objective:
+    """Scores points of the unit hypercube mapped onto the search bounds, counting evaluations."""
+
+    def __init__(
+        self,
+        baseline: SynthesisInput,
+        desired: DesiredPropertyTargets,
+        structure: StructureFeatures | None,
+        bounds: Mapping[str, Tuple[float, float]],
+    ) -> None:
+        unknown = [name for name in bounds if name not in NUMERIC_SYNTHESIS_FIELDS]
+        if unknown:
+            raise ValueError(f"Search bounds must name numeric synthesis fields, got {unknown}")
+        self.baseline = baseline
+        self.desired = desired
+        self.structure = structure
+        self.names = list(bounds)
+        self.low = np.array([bounds[name][0] for name in self.names], dtype=float)
+        self.span = np.array([bounds[name][1] for name in self.names], dtype=float) - self.low
+        if np.any(self.span < 0.0):
+            raise ValueError("Search bounds must be (low, high) with low <= high")
+        self.evaluations = 0
+
+    def columns(self, unit: np.ndarray) -> Dict[str, np.ndarray]:
+        real = self.low + np.clip(unit, 0.0, 1.0) * self.span
+        return {name: real[:, j] for j, name in enumerate(self.names)}
+
+    def evaluate(self, unit: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        columns = self.columns(unit)
+        batch = predict_properties_batch(columns, self.structure, baseline=self.baseline)
+        particle = _particle_size_batch(
+            columns.get("temperature_c", self.baseline.temperature_c),
+            columns.get("calcination_time_h", self.baseline.calcination_time_h),
+            columns.get("pH", self.baseline.pH),
+        )
+        particle = np.broadcast_to(particle, batch.band_gap_ev.shape)
+        in_box = _score_batch(batch.band_gap_ev, batch.specific_surface_area_m2_g, particle, self.desired)
+        # Points outside the box are scored at their clipped image plus a distance penalty.
+        scores = in_box + np.sum((unit - np.clip(unit, 0.0, 1.0)) ** 2, axis=1)
+        self.evaluations += unit.shape[0]
+        extras = {
+            "score": in_box,
+            "estimated_particle_size_nm": particle,
+            "pred_band_gap_ev": batch.band_gap_ev,
+            "pred_surface_area_m2_g": batch.specific_surface_area_m2_g,
+        }
+        return scores, extras
+
+
+class _Elite:
+    """
+    Best distinct points seen so far; duplicates are detected on rounded real
+    coordinates. The predictions made while scoring are kept with each point, so
+    reporting candidates costs no further evaluations.
+    """
+
+    def __init__(self, objective: _Objective, top_k: int) -> None:
+        self.objective = objective
+        self.top_k = top_k
+        self.points = np.empty((0, len(objective.names)))
+        self.scores = np.empty(0)
+        self.extras: Dict[str, np.ndarray] = {}
+
+    @property
+    def best(self) -> float:
+        return float(self.scores[0]) if self.scores.size else float("inf")
+
+    def update(self, unit: np.ndarray, scores: np.ndarray, extras: Mapping[str, np.ndarray]) -> None:
+        points = np.vstack([self.points, np.clip(unit, 0.0, 1.0)])
+        merged = np.concatenate([self.scores, scores])
+        order = np.argsort(merged, kind="stable")
+        keys = np.round(self.objective.low + points[order] * self.objective.span, 4)
+        _, first = np.unique(keys, axis=0, return_index=True)
+        keep = order[np.sort(first)][: self.top_k]
+        self.points = points[keep]
+        self.scores = merged[keep]
+        self.extras = {
+            name: np.concatenate([self.extras.get(name, np.empty(0)), np.broadcast_to(values, scores.shape)])[keep]
+            for name, values in extras.items()
+        }
+
+    def candidates(self) -> List[Dict[str, float | str]]:
+        if not self.scores.size:
+            return []
+        # Reported at the clipped point, i.e. without the out-of-box penalty.
+        extras = self.extras
+        columns = self.objective.columns(self.points)
+        rows: List[Dict[str, float | str]] = []
+        for i in range(self.scores.size):
+            row: Dict[str, float | str] = {"score": round(float(extras["score"][i]), 4)}
+            row.update({name: round(float(values[i]), 4) for name, values in columns.items()})
+            row["estimated_particle_size_nm"] = round(float(extras["estimated_particle_size_nm"][i]), 2)
+            row["pred_band_gap_ev"] = float(extras["pred_band_gap_ev"][i])
+            row["pred_surface_area_m2_g"] = float(extras["pred_surface_area_m2_g"][i])
+            rows.append(row)
+        return rows
+
+
+def _run_cmaes(
+    objective: _Objective,
+    elite: _Elite,
+    budget: int,
+    tol: float,
+    rng: np.random.Generator,
+    start: np.ndarray,
+) -> Tuple[int, bool, List[float], Dict[str, float]]:
+    """
+    (mu/mu_w, lambda)-CMA-ES in the unit box with IPOP restarts until the budget is
+    spent. A budget smaller than one population samples a single, smaller one.
+    """
+    n = start.size
+    base_popsize = 4 + int(3 * np.log(n))
+    history: List[float] = []
+    iterations = 0
+    restarts = 0
+    converged = False
+    sigma = 0.3
+    mean = start.copy()
+    popsize = base_popsize
+    while True:
+        mu = popsize // 2
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        weights /= weights.sum()
+        mueff = 1.0 / np.sum(weights**2)
+        cc = (4 + mueff / n) / (n + 4 + 2 * mueff / n)
+        cs = (mueff + 2) / (n + mueff + 5)
+        c1 = 2 / ((n + 1.3) ** 2 + mueff)
+        cmu = min(1 - c1, 2 * (mueff - 2 + 1 / mueff) / ((n + 2) ** 2 + mueff))
+        damps = 1 + 2 * max(0.0, np.sqrt((mueff - 1) / (n + 1)) - 1) + cs
+        chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n**2))
+        cov = np.eye(n)
+        basis = np.eye(n)
+        scale = np.ones(n)
+        pc = np.zeros(n)
+        ps = np.zeros(n)
+        generation = 0
+        run_converged = False
+        while objective.evaluations < budget:
+            # A budget below one population still buys a truncated first generation.
+            count = min(popsize, budget - objective.evaluations)
+            if count < popsize and iterations:
+                break
+            generation += 1
+            iterations += 1
+            steps = rng.standard_normal((count, n)) @ (basis * scale).T
+            population = mean + sigma * steps
+            scores, extras = objective.evaluate(population)
+            elite.update(population, scores, extras)
+            history.append(elite.best)
+            if count < popsize:
+                break
+
+            selected = steps[np.argsort(scores, kind="stable")[:mu]]
+            step_w = weights @ selected
+            mean = mean + sigma * step_w
+            inv_sqrt = basis @ np.diag(1.0 / scale) @ basis.T
+            ps = (1 - cs) * ps + np.sqrt(cs * (2 - cs) * mueff) * (inv_sqrt @ step_w)
+            hsig = np.linalg.norm(ps) / np.sqrt(1 - (1 - cs) ** (2 * generation)) / chi_n < 1.4 + 2 / (n + 1)
+            pc = (1 - cc) * pc + hsig * np.sqrt(cc * (2 - cc) * mueff) * step_w
+            cov = (
+                (1 - c1 - cmu) * cov
+                + c1 * (np.outer(pc, pc) + (1 - hsig) * cc * (2 - cc) * cov)
+                + cmu * (selected.T * weights) @ selected
+            )
+            sigma *= np.exp((cs / damps) * (np.linalg.norm(ps) / chi_n - 1))
+            eigvals, basis = np.linalg.eigh((cov + cov.T) / 2)
+            scale = np.sqrt(np.maximum(eigvals, 1e-20))
+            if sigma * scale.max() < tol:
+                run_converged = True
+                break
+        converged = converged or run_converged
+        if not run_converged or objective.evaluations + 2 * popsize > budget:
+            break
+        restarts += 1
+        popsize *= 2
+        sigma = 0.3
+        mean = rng.uniform(0.0, 1.0, n)
+    return iterations, converged, history, {"restarts": float(restarts), "final_sigma": float(sigma)}
+
+
+def _run_multistart(
+    objective: _Objective,
+    elite: _Elite,
+    budget: int,
+    tol: float,
+    rng: np.random.Generator,
+    start: np.ndarray,
+    starts: int = 8,
+) -> Tuple[int, bool, List[float], Dict[str, float]]:
+    """
+    Compass pattern search from several starts, all starts advanced in one batch
+    per step. Small budgets use fewer starts, and once a full step no longer fits
+    only the best starts that do are advanced.
+    """
+    n = start.size
+    starts = min(starts, budget - objective.evaluations)
+    if starts <= 0:
+        return 0, False, [], {"starts": 0.0, "max_step": 0.0}
+    current = np.vstack([start, rng.uniform(0.0, 1.0, (starts - 1, n))])
+    current_scores, extras = objective.evaluate(current)
+    elite.update(current, current_scores, extras)
+    step = np.full(starts, 0.25)
+    directions = np.vstack([np.eye(n), -np.eye(n)])
+    history = [elite.best]
+    iterations = 0
+    while True:
+        active = np.flatnonzero(step >= tol)
+        affordable = (budget - objective.evaluations) // directions.shape[0]
+        if active.size == 0 or affordable == 0:
+            break
+        if active.size > affordable:
+            active = np.sort(active[np.argsort(current_scores[active], kind="stable")[:affordable]])
+        iterations += 1
+        trial = current[active, None, :] + step[active, None, None] * directions[None, :, :]
+        trial = np.clip(trial, 0.0, 1.0).reshape(-1, n)
+        scores, extras = objective.evaluate(trial)
+        elite.update(trial, scores, extras)
+        history.append(elite.best)
+
+        scores = scores.reshape(active.size, directions.shape[0])
+        best = np.argmin(scores, axis=1)
+        best_scores = scores[np.arange(active.size), best]
+        improved = best_scores < current_scores[active]
+        moved = active[improved]
+        current[moved] = trial.reshape(active.size, -1, n)[improved, best[improved]]
+        current_scores[moved] = best_scores[improved]
+        step[active[~improved]] *= 0.5
+    converged = bool(np.all(step < tol))
+    return iterations, converged, history, {"starts": float(starts), "max_step": float(step.max())}
+
+
+_OPTIMIZERS = {
+    "cmaes": _run_cmaes,
+    "multistart": _run_multistart,
+}
+
+
+@timed("inverse.optimize")
+def optimize_synthesis_conditions(
+    baseline: SynthesisInput,
+    desired: DesiredPropertyTargets,
+    structure: StructureFeatures | None = None,
+    bounds: Mapping[str, Tuple[float, float]] | None = None,
+    method: str = "cmaes",
+    budget: int = 2000,
+    top_k: int = 5,
+    tol: float = 1e-4,
+    seed: int | None = None,
+) -> OptimizationResult:
+    """
+    Search continuous ranges of synthesis fields for conditions that minimise the
+    inverse-design score, spending at most ``budget`` surrogate evaluations.
+
+    ``method`` is ``"cmaes"`` (covariance-matrix adaptation with restarts) or
+    ``"multistart"`` (batched compass search from random starts). Both work in the
+    unit box scaled onto ``bounds`` and start from the baseline conditions.
+    """
+    if method not in _OPTIMIZERS:
+        raise ValueError(f"Unknown optimization method '{method}'. Choose from {sorted(_OPTIMIZERS)}")
+    objective = _Objective(baseline, desired, structure, bounds or DEFAULT_SEARCH_BOUNDS)
+    rng = np.random.default_rng(seed)
+    baseline_values = np.array([float(getattr(baseline, name)) for name in objective.names])
+    start = np.clip((baseline_values - objective.low) / np.where(objective.span > 0, objective.span, 1.0), 0.0, 1.0)
+
+    elite = _Elite(objective, top_k)
+    iterations, converged, history, diagnostics = _OPTIMIZERS[method](objective, elite, budget, tol, rng, start)
+    evaluations = objective.evaluations
+    return OptimizationResult(
+        candidates=elite.candidates(),
+        method=method,
+        evaluations=evaluations,
+        iterations=iterations,
+        converged=converged,
+        best_score_history=history,
+        diagnostics=diagnostics,
+    )
+
+
+def _dominance(candidates: np.ndarray, others: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairwise (dominates[i, j], no_worse[i, j]) for minimisation objective rows."""
+    no_worse = np.all(candidates[:, None, :] <= others[None, :, :], axis=2)
+    better = np.any(candidates[:, None, :] < others[None, :, :], axis=2)
+    return no_worse & better, no_worse
+
+
+class ParetoArchive:
+    """
+    Incrementally maintained non-dominated set (all objectives minimised).
+
+    Each ``add`` first discards incoming rows the archive already covers, then
+    filters the survivors against each other and prunes archive rows they dominate,
+    so memory follows the size of the front rather than the number of candidates.
+    Of several identical objective vectors only the first one seen is kept.
+    """
+
+    def __init__(self, n_objectives: int, n_payload: int) -> None:
+        self.objectives = np.empty((0, n_objectives))
+        self.payload = np.empty((0, n_payload))
+
+    def __len__(self) -> int:
+        return self.objectives.shape[0]
+
+    def add(self, objectives: np.ndarray, payload: np.ndarray) -> None:
+        if len(self):
+            # "No worse everywhere" covers both domination and exact duplicates.
+            _, covered = _dominance(self.objectives, objectives)
+            fresh = ~covered.any(axis=0)
+            objectives, payload = objectives[fresh], payload[fresh]
+        if not objectives.shape[0]:
+            return
+        dominates, no_worse = _dominance(objectives, objectives)
+        duplicate = np.triu(no_worse & no_worse.T, 1).any(axis=0)
+        keep = ~dominates.any(axis=0) & ~duplicate
+        objectives, payload = objectives[keep], payload[keep]
+        if len(self):
+            dominated, _ = _dominance(objectives, self.objectives)
+            survivors = ~dominated.any(axis=0)
+            objectives = np.vstack([self.objectives[survivors], objectives])
+            payload = np.vstack([self.payload[survivors], payload])
+        self.objectives, self.payload = objectives, payload
+
+
+# Extra objective names available besides the PredictedProperties fields.
+_DERIVED_OBJECTIVES = ("estimated_particle_size_nm",)
+
+
+@dataclass
+class ParetoResult:
+    front: List[Dict[str, float]]
+    top: List[Dict[str, float]]
+    evaluated: int
+
+
+def _objective_columns(
+    objectives: Mapping[str, str | float],
+    batch: PredictedPropertiesBatch,
+    particle_size_nm: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Raw objective values and their minimisation form ("min", "max" or a target value)."""
+    raw = []
+    minimised = []
+    for name, goal in objectives.items():
+        values = particle_size_nm if name == "estimated_particle_size_nm" else getattr(batch, name)
+        raw.append(values)
+        if goal == "min":
+            minimised.append(values)
+        elif goal == "max":
+            minimised.append(-values)
+        else:
+            minimised.append(np.abs(values - float(goal)))
+    return np.column_stack(raw), np.column_stack(minimised)
+
+
+@timed("inverse.pareto")
+def pareto_synthesis_conditions(
+    baseline: SynthesisInput,
+    objectives: Mapping[str, str | float],
+    structure: StructureFeatures | None = None,
+    bounds: Mapping[str, Tuple[float, float]] | None = None,
+    samples: int = 20000,
+    chunk_size: int = 1024,
+    weights: Mapping[str, float] | None = None,
+    top_k: int = 5,
+    seed: int | None = None,
+) -> ParetoResult:
+    """
+    Stream random candidates from ``bounds`` and return the Pareto front over ``objectives``.
+
+    ``objectives`` maps PredictedProperties fields (or ``estimated_particle_size_nm``)
+    to ``"min"``, ``"max"`` or a numeric target whose absolute error is minimised.
+    ``top`` additionally ranks candidates by the ``weights``-weighted sum of those
+    minimised objectives (equal weights by default) using a bounded heap.
+    """
+    if not objectives:
+        raise ValueError("At least one objective is required")
+    unknown = [name for name in objectives if name not in PROPERTY_NAMES and name not in _DERIVED_OBJECTIVES]
+    if unknown:
+        raise ValueError(f"Unknown objectives {unknown}")
+    for name, goal in objectives.items():
+        if isinstance(goal, str) and goal not in ("min", "max"):
+            raise ValueError(f"Objective '{name}' must be 'min', 'max' or a numeric target, got '{goal}'")
+    search = dict(bounds or DEFAULT_SEARCH_BOUNDS)
+    unknown = [name for name in search if name not in NUMERIC_SYNTHESIS_FIELDS]
+    if unknown:
+        raise ValueError(f"Search bounds must name numeric synthesis fields, got {unknown}")
+
+    names = list(search)
+    low = np.array([search[name][0] for name in names], dtype=float)
+    high = np.array([search[name][1] for name in names], dtype=float)
+    weight_vector = np.array([(weights or {}).get(name, 1.0) for name in objectives], dtype=float)
+    rng = np.random.default_rng(seed)
+
+    archive = ParetoArchive(len(objectives), len(names) + len(objectives))
+    ranked = TopK(top_k)
+    evaluated = 0
+    while evaluated < samples:
+        count = min(chunk_size, samples - evaluated)
+        points = rng.uniform(low, high, (count, len(names)))
+        columns = {name: points[:, j] for j, name in enumerate(names)}
+        batch = predict_properties_batch(columns, structure, baseline=baseline)
+        particle = np.broadcast_to(
+            _particle_size_batch(
+                columns.get("temperature_c", baseline.temperature_c),
+                columns.get("calcination_time_h", baseline.calcination_time_h),
+                columns.get("pH", baseline.pH),
+            ),
+            (count,),
+        )
+        raw, minimised = _objective_columns(objectives, batch, particle)
+        rows = np.hstack([points, raw])
+        archive.add(minimised, rows)
+
+        scalarized = minimised @ weight_vector
+        best = np.argsort(scalarized, kind="stable")[:top_k]
+        for index in best:
+            ranked.push(float(scalarized[index]), (float(scalarized[index]), rows[index]))
+        evaluated += count
 
-    ranked = sorted(candidates, key=lambda item: item["score"])
-    return ranked[:top_k]
+    labels = names + list(objectives)
+    front = [dict(zip(labels, map(float, row))) for row in archive.payload]
+    front.sort(key=lambda row: tuple(row[name] for name in objectives))
+    top = [{"score": round(score, 4), **dict(zip(labels, map(float, row)))} for score, row in ranked.items()]
+    return ParetoResult(front=front, top=top, evaluated=evaluated)
@@ -1,11 +1,70 @@
 from __future__ import annotations
 
-from dataclasses import replace
+from dataclasses import dataclass
+from typing import Dict, Iterator, Mapping, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
+from numpy.typing import ArrayLike
 
-from thanimampro_api.predict import predict_properties
-from thanimampro_api.schemas import StructureFeatures, SynthesisInput
+from thanimampro_api.predict import predict_properties_batch
+from thanimampro_api.schemas import (
+    NUMERIC_SYNTHESIS_FIELDS,
+    PROPERTY_NAMES,
+    StructureFeatures,
+    SynthesisInput,
+)
+from thanimampro_telemetry import timed
+
+
+@dataclass
+class PropertyMap:
+    """Dense property grids over named synthesis axes (axis order = array dimension order)."""
+
+    axes: Dict[str, np.ndarray]
+    values: Dict[str, np.ndarray]
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(axis.size for axis in self.axes.values())
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long-form table with one row per grid cell, axis columns first."""
+        coords = np.meshgrid(*self.axes.values(), indexing="ij")
+        columns = {name: coord.ravel() for name, coord in zip(self.axes, coords)}
+        columns.update({name: grid.ravel() for name, grid in self.values.items()})
+        return pd.DataFrame(columns)
+
+
+@timed("mapper.property_map")
+def build_property_map(
+    baseline: SynthesisInput,
+    structure: StructureFeatures | None,
+    axes: Mapping[str, ArrayLike],
+    properties: Sequence[str] | None = None,
+) -> PropertyMap:
+    """
+    Evaluate the surrogate on the Cartesian product of ``axes`` in one vectorized call.
+
+    ``axes`` maps numeric SynthesisInput fields to 1-D coordinate arrays; all other
+    inputs are held at ``baseline``. ``properties`` defaults to every predicted property.
+    """
+    if not axes:
+        raise ValueError("At least one axis is required")
+    unknown_axes = [name for name in axes if name not in NUMERIC_SYNTHESIS_FIELDS]
+    if unknown_axes:
+        raise ValueError(f"Axes must be numeric synthesis fields, got {unknown_axes}")
+    selected = list(properties) if properties is not None else list(PROPERTY_NAMES)
+    unknown_props = [name for name in selected if name not in PROPERTY_NAMES]
+    if unknown_props:
+        raise ValueError(f"Unknown properties {unknown_props}")
+
+    coords = {name: np.asarray(values, dtype=float).ravel() for name, values in axes.items()}
+    mesh = np.meshgrid(*coords.values(), indexing="ij", sparse=True)
+    batch = predict_properties_batch(dict(zip(coords, mesh)), structure, baseline=baseline)
+    shape = tuple(axis.size for axis in coords.values())
+    values = {name: np.broadcast_to(getattr(batch, name), shape) for name in selected}
+    return PropertyMap(axes=coords, values=values)
 
 
 def build_bandgap_map(
@@ -17,19 +76,193 @@ def build_bandgap_map(
     ph_max: float,
     points: int = 25,
 ) -> pd.DataFrame:
-    temps = [temp_min + i * (temp_max - temp_min) / max(points - 1, 1) for i in range(points)]
-    phs = [ph_min + j * (ph_max - ph_min) / max(points - 1, 1) for j in range(points)]
-
-    rows = []
-    for temp in temps:
-        for ph in phs:
-            trial = replace(baseline, temperature_c=temp, pH=ph)
-            pred = predict_properties(trial, structure)
-            rows.append(
-                {
-                    "temperature_c": round(temp, 3),
-                    "pH": round(ph, 3),
-                    "band_gap_ev": pred.band_gap_ev,
-                }
-            )
-    return pd.DataFrame(rows)
+    grid = build_property_map(
+        baseline,
+        structure,
+        {
+            "temperature_c": np.linspace(temp_min, temp_max, points),
+            "pH": np.linspace(ph_min, ph_max, points),
+        },
+        ["band_gap_ev"],
+    )
+    frame = grid.to_frame()
+    frame[["temperature_c", "pH"]] = frame[["temperature_c", "pH"]].round(3)
+    return frame
+
+
+@dataclass
+class AdaptiveMapProgress:
+    """
+    One refinement pass of iter_adaptive_property_map.
+
+    ``map`` covers the lattice refined so far; cells not yet sampled at this
+    resolution are bilinear interpolations of their enclosing sampled cell, and
+    ``sampled`` marks the grid nodes where the model was actually evaluated.
+    """
+
+    map: PropertyMap
+    sampled: np.ndarray
+    level: int
+    refined_cells: int
+    evaluations: int
+    # Evaluations a uniform grid at the resolution cap would need.
+    uniform_evaluations: int
+    done: bool
+
+
+def _fill_bilinear(values: np.ndarray, known: np.ndarray, rows: np.ndarray, cols: np.ndarray, stride: int) -> None:
+    """Interpolate the unsampled nodes of the cells with corners (rows, cols) + {0, stride}."""
+    t = np.arange(stride + 1) / stride
+    u, v = t[:, None], t[None, :]
+    f00, f10 = values[rows, cols], values[rows + stride, cols]
+    f01, f11 = values[rows, cols + stride], values[rows + stride, cols + stride]
+    block = (
+        f00[:, None, None] * (1 - u) * (1 - v)
+        + f10[:, None, None] * u * (1 - v)
+        + f01[:, None, None] * (1 - u) * v
+        + f11[:, None, None] * u * v
+    )
+    block_rows = rows[:, None, None] + np.arange(stride + 1)[None, :, None]
+    block_cols = cols[:, None, None] + np.arange(stride + 1)[None, None, :]
+    block_rows, block_cols = np.broadcast_arrays(block_rows, block_cols)
+    missing = ~known[block_rows, block_cols]
+    values[block_rows[missing], block_cols[missing]] = block[missing]
+
+
+def _second_difference(block: np.ndarray) -> np.ndarray:
+    """Largest midpoint deviation from linear along the rows and columns of (cells, 3, 3) blocks."""
+    along_rows = np.abs(block[:, 0] - 2.0 * block[:, 1] + block[:, 2]).max(axis=1)
+    along_cols = np.abs(block[:, :, 0] - 2.0 * block[:, :, 1] + block[:, :, 2]).max(axis=1)
+    return 0.5 * np.maximum(along_rows, along_cols)
+
+
+def iter_adaptive_property_map(
+    baseline: SynthesisInput,
+    structure: StructureFeatures | None,
+    axes: Mapping[str, Tuple[float, float]],
+    prop: str = "band_gap_ev",
+    initial_points: int = 17,
+    max_points: int = 513,
+    tolerance: float = 0.005,
+    gradient_tolerance: float = 0.25,
+) -> Iterator[AdaptiveMapProgress]:
+    """
+    Map ``prop`` over two numeric synthesis axes, refining coarse-to-fine.
+
+    Starts from an ``initial_points`` x ``initial_points`` grid and halves the cell
+    size of every cell whose bilinear interpolation error (midpoint second
+    difference) exceeds ``tolerance``, or whose corner spread exceeds
+    ``gradient_tolerance``, both as fractions of the value range. Refinement stops
+    at ``max_points`` per axis (rounded down to ``(initial_points - 1) * 2**k + 1``)
+    or when no cell is flagged. A progress snapshot is yielded after every pass so
+    callers can render while refining; the last one has ``done`` set and is on the
+    full-resolution grid.
+    """
+    if len(axes) != 2:
+        raise ValueError("Adaptive maps need exactly two axes")
+    unknown_axes = [name for name in axes if name not in NUMERIC_SYNTHESIS_FIELDS]
+    if unknown_axes:
+        raise ValueError(f"Axes must be numeric synthesis fields, got {unknown_axes}")
+    if prop not in PROPERTY_NAMES:
+        raise ValueError(f"Unknown property '{prop}'")
+    if initial_points < 2 or max_points < initial_points:
+        raise ValueError("Need 2 <= initial_points <= max_points")
+
+    levels = int(np.floor(np.log2((max_points - 1) / (initial_points - 1))))
+    size = (initial_points - 1) * 2**levels + 1
+    names = list(axes)
+    coords = [np.linspace(float(low), float(high), size) for low, high in axes.values()]
+    values = np.zeros((size, size))
+    known = np.zeros((size, size), dtype=bool)
+    evaluations = 0
+
+    def evaluate(rows: np.ndarray, cols: np.ndarray) -> None:
+        nonlocal evaluations
+        batch = predict_properties_batch(
+            {names[0]: coords[0][rows], names[1]: coords[1][cols]}, structure, baseline=baseline
+        )
+        values[rows, cols] = np.broadcast_to(getattr(batch, prop), rows.shape)
+        known[rows, cols] = True
+        evaluations += rows.size
+
+    def snapshot(level: int, stride: int, refined: int, done: bool) -> AdaptiveMapProgress:
+        step = 1 if done else stride
+        grid = PropertyMap(
+            axes={name: axis[::step] for name, axis in zip(names, coords)},
+            values={prop: values[::step, ::step].copy()},
+        )
+        return AdaptiveMapProgress(
+            grid, known[::step, ::step].copy(), level, refined, evaluations, size * size, done
+        )
+
+    stride = 2**levels
+    rows, cols = np.meshgrid(np.arange(0, size, stride), np.arange(0, size, stride), indexing="ij")
+    evaluate(rows.ravel(), cols.ravel())
+    origins = np.arange(0, size - 1, stride)
+    cell_rows, cell_cols = (grid.ravel() for grid in np.meshgrid(origins, origins, indexing="ij"))
+    if stride > 1:
+        _fill_bilinear(values, known, cell_rows, cell_cols, stride)
+
+    # Flag coarse cells from the second differences at their corners (zero on the border).
+    coarse = values[::stride, ::stride]
+    span = float(np.ptp(coarse))
+    curvature = np.zeros_like(coarse)
+    curvature[1:-1, :] = 0.5 * np.abs(coarse[:-2] - 2.0 * coarse[1:-1] + coarse[2:])
+    across = 0.5 * np.abs(coarse[:, :-2] - 2.0 * coarse[:, 1:-1] + coarse[:, 2:])
+    curvature[:, 1:-1] = np.maximum(curvature[:, 1:-1], across)
+    corners = np.stack([coarse[:-1, :-1], coarse[1:, :-1], coarse[:-1, 1:], coarse[1:, 1:]])
+    corner_curvature = np.stack([curvature[:-1, :-1], curvature[1:, :-1], curvature[:-1, 1:], curvature[1:, 1:]])
+    active = (corner_curvature.max(axis=0) > tolerance * span) | (np.ptp(corners, axis=0) > gradient_tolerance * span)
+
+    level = 0
+    while True:
+        done = stride == 1 or not active.any()
+        yield snapshot(level, stride, int(active.sum()) if not done else 0, done)
+        if done:
+            return
+        half = stride // 2
+        cell_i, cell_j = np.nonzero(active)
+        offsets = np.array([0, half, stride])
+        block_rows = (cell_i * stride)[:, None, None] + offsets[None, :, None]
+        block_cols = (cell_j * stride)[:, None, None] + offsets[None, None, :]
+        block_rows, block_cols = np.broadcast_arrays(block_rows, block_cols)
+        # Neighbouring cells share edge nodes; evaluate each new node once.
+        flat = np.unique((block_rows * size + block_cols)[~known[block_rows, block_cols]])
+        evaluate(flat // size, flat % size)
+
+        child_rows = ((cell_i * stride)[:, None] + np.array([0, half, 0, half])[None, :]).ravel()
+        child_cols = ((cell_j * stride)[:, None] + np.array([0, 0, half, half])[None, :]).ravel()
+        if half > 1:
+            _fill_bilinear(values, known, child_rows, child_cols, half)
+
+        span = float(np.ptp(values))
+        block = values[block_rows, block_cols]
+        error = _second_difference(block)
+        children = np.zeros((active.shape[0] * 2, active.shape[1] * 2), dtype=bool)
+        for a in (0, 1):
+            for b in (0, 1):
+                spread = np.ptp(block[:, a : a + 2, b : b + 2].reshape(len(block), -1), axis=1)
+                flagged = (error > tolerance * span) | (spread > gradient_tolerance * span)
+                children[2 * cell_i + a, 2 * cell_j + b] = flagged
+        active = children
+        stride = half
+        level += 1
+
+
+@timed("mapper.adaptive_map")
+def build_adaptive_property_map(
+    baseline: SynthesisInput,
+    structure: StructureFeatures | None,
+    axes: Mapping[str, Tuple[float, float]],
+    prop: str = "band_gap_ev",
+    initial_points: int = 17,
+    max_points: int = 513,
+    tolerance: float = 0.005,
+    gradient_tolerance: float = 0.25,
+) -> AdaptiveMapProgress:
+    """Run iter_adaptive_property_map to completion and return its final snapshot."""
+    for progress in iter_adaptive_property_map(
+        baseline, structure, axes, prop, initial_points, max_points, tolerance, gradient_tolerance
+    ):
+        pass
+    return progress
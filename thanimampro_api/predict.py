@@ -1,14 +1,29 @@
 from __future__ import annotations
 
 from math import exp
+from typing import Mapping, Union
 
-from thanimampro_api.schemas import PredictedProperties, StructureFeatures, SynthesisInput
+import numpy as np
+from numpy.typing import ArrayLike
+
+from thanimampro_api.schemas import (
+    PredictedProperties,
+    PredictedPropertiesBatch,
+    StructureFeatures,
+    SynthesisInput,
+)
+from thanimampro_telemetry import timed
+
+# Columnar synthesis input: a DataFrame or any mapping of field name -> scalar/array.
+SynthesisColumns = Mapping[str, ArrayLike]
+StructureColumns = Mapping[str, ArrayLike]
 
 
 def _clamp(value: float, low: float, high: float) -> float:
     return max(low, min(high, value))
 
 
+@timed("predict.properties")
 def predict_properties(
     synthesis: SynthesisInput,
     structure: StructureFeatures | None = None,
@@ -75,3 +90,119 @@ def predict_properties(
         curie_temperature_k=round(curie_temperature, 2),
         saturation_magnetization_emu_g=round(sat_mag, 2),
     )
+
+
+def _column(
+    source: SynthesisColumns | StructureColumns,
+    name: str,
+    fallback: float | None,
+) -> np.ndarray:
+    if name in source:
+        return np.asarray(source[name], dtype=float)
+    if fallback is None:
+        raise KeyError(f"Missing column '{name}' and no baseline value to fall back on")
+    return np.asarray(fallback, dtype=float)
+
+
+def _round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    # np.round scales, rounds and rescales, which can land on the other side of a
+    # decimal tie than the builtin round(). Redo the few near-tie entries with the
+    # builtin so batch results match predict_properties exactly.
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0**ndigits
+    near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if near_tie.size:
+        flat = rounded.reshape(-1)
+        source = values.reshape(-1)
+        flat[near_tie] = [round(float(source[i]), ndigits) for i in near_tie]
+        rounded = flat.reshape(values.shape)
+    return rounded
+
+
+@timed("predict.batch")
+def predict_properties_batch(
+    synthesis: SynthesisColumns,
+    structure: Union[StructureFeatures, StructureColumns, None] = None,
+    baseline: SynthesisInput | None = None,
+) -> PredictedPropertiesBatch:
+    """
+    Vectorized form of predict_properties over a columnar batch of synthesis inputs.
+
+    ``synthesis`` maps SynthesisInput field names to arrays (a DataFrame works);
+    fields that are absent are taken from ``baseline``. ``structure`` is either a
+    single StructureFeatures shared by every row or a mapping with per-row
+    ``defect_index`` / ``crystallite_size_nm`` arrays. All inputs broadcast
+    against each other, so a 2-D meshgrid yields 2-D property arrays.
+    """
+    temperature = _column(synthesis, "temperature_c", baseline.temperature_c if baseline else None)
+    ph = _column(synthesis, "pH", baseline.pH if baseline else None)
+    pressure = _column(synthesis, "pressure_bar", baseline.pressure_bar if baseline else None)
+
+    if structure is None:
+        defect_factor = np.asarray(0.25)
+        crystallite_size = np.asarray(28.0)
+    elif isinstance(structure, StructureFeatures):
+        defect_factor = np.asarray(structure.defect_index, dtype=float)
+        crystallite_size = np.asarray(structure.crystallite_size_nm, dtype=float)
+    else:
+        defect_factor = _column(structure, "defect_index", 0.25)
+        crystallite_size = _column(structure, "crystallite_size_nm", 28.0)
+
+    temperature, ph, pressure, defect_factor, crystallite_size = np.broadcast_arrays(
+        temperature, ph, pressure, defect_factor, crystallite_size
+    )
+
+    band_gap = (
+        3.2
+        - 0.0012 * (temperature - 600.0)
+        - 0.055 * (ph - 7.0)
+        + 0.03 * defect_factor
+    )
+    band_gap = np.clip(band_gap, 1.1, 4.5)
+
+    conductivity = 10 ** (
+        -6.0
+        + 0.0024 * (temperature - 550.0)
+        - 0.045 * np.abs(ph - 7.0)
+        + 0.15 * defect_factor
+    )
+    conductivity = np.clip(conductivity, 1e-8, 5.0)
+
+    absorption_edge = 1240.0 / band_gap
+    pl_intensity = np.clip(400.0 * np.exp(-0.8 * defect_factor) + 2.0 * crystallite_size, 20.0, 1200.0)
+
+    surface_area = (
+        90.0
+        - 0.06 * (temperature - 500.0)
+        - 0.55 * crystallite_size
+        + 1.8 * ph
+    )
+    surface_area = np.clip(surface_area, 2.0, 220.0)
+    active_site_density = np.clip(0.35 * surface_area * (1.0 + 0.6 * defect_factor), 5.0, 300.0)
+
+    capacitance = np.clip(
+        0.8 * surface_area + 15.0 * defect_factor + 0.05 * pressure,
+        5.0,
+        900.0,
+    )
+    ion_diff = np.clip(
+        1e-12 * np.exp(0.09 * ph + 0.0009 * temperature + 0.7 * defect_factor),
+        1e-13,
+        1e-6,
+    )
+
+    curie_temperature = np.clip(250.0 + 0.35 * temperature + 30.0 * defect_factor, 10.0, 1500.0)
+    sat_mag = np.clip(8.0 + 0.03 * temperature + 10.0 * defect_factor - 0.2 * crystallite_size, 0.1, 180.0)
+
+    return PredictedPropertiesBatch(
+        band_gap_ev=_round(band_gap, 4),
+        conductivity_s_cm=_round(conductivity, 8),
+        absorption_edge_nm=_round(absorption_edge, 2),
+        photoluminescence_intensity_au=_round(pl_intensity, 2),
+        specific_surface_area_m2_g=_round(surface_area, 2),
+        active_site_density_mm2_g=_round(active_site_density, 2),
+        capacitance_f_g=_round(capacitance, 2),
+        ion_diffusivity_cm2_s=ion_diff,
+        curie_temperature_k=_round(curie_temperature, 2),
+        saturation_magnetization_emu_g=_round(sat_mag, 2),
+    )
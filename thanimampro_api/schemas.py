@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, fields
 from typing import Dict, Literal
 
+import numpy as np
+
 SynthesisMethod = Literal[
     "sol-gel",
     "hydrothermal",
@@ -65,6 +67,35 @@ class PredictedProperties:
         return asdict(self)
 
 
+@dataclass
+class PredictedPropertiesBatch:
+    """Column-wise counterpart of PredictedProperties: one array per property."""
+
+    band_gap_ev: np.ndarray
+    conductivity_s_cm: np.ndarray
+    absorption_edge_nm: np.ndarray
+    photoluminescence_intensity_au: np.ndarray
+    specific_surface_area_m2_g: np.ndarray
+    active_site_density_mm2_g: np.ndarray
+    capacitance_f_g: np.ndarray
+    ion_diffusivity_cm2_s: np.ndarray
+    curie_temperature_k: np.ndarray
+    saturation_magnetization_emu_g: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.band_gap_ev.size)
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def record(self, index: int) -> PredictedProperties:
+        return PredictedProperties(**{name: float(values.flat[index]) for name, values in self.to_dict().items()})
+
+
+PROPERTY_NAMES = tuple(f.name for f in fields(PredictedProperties))
+NUMERIC_SYNTHESIS_FIELDS = tuple(f.name for f in fields(SynthesisInput) if f.type == "float")
+
+
 @dataclass
 class DesiredPropertyTargets:
     target_band_gap_ev: float
@@ -0,0 +1,323 @@
+"""
+Global sensitivity of every predicted property to every synthesis parameter.
+
+``morris_effects`` screens parameters with Morris elementary effects and
+``sobol_indices`` estimates Sobol first- and total-order indices with the
+Saltelli/Jansen estimators on a digit-scrambled Halton sequence. Both evaluate
+the model on whole blocks of points, so 10^5-10^6 evaluations of the vectorized
+surrogate take seconds.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple, get_args
+
+import numpy as np
+import pandas as pd
+
+from thanimampro_api.predict import SynthesisColumns, predict_properties_batch
+from thanimampro_api.schemas import (
+    NUMERIC_SYNTHESIS_FIELDS,
+    PROPERTY_NAMES,
+    StructureFeatures,
+    SynthesisInput,
+    SynthesisMethod,
+)
+from thanimampro_telemetry import timed
+
+# A vectorized model with the predict_properties_batch signature, e.g.
+# SurrogateModel.predict_batch; it must return one array attribute per property.
+BatchModel = Callable[..., object]
+
+# Numeric fields are (low, high); categorical fields are a sequence of levels.
+DEFAULT_RANGES: Dict[str, Tuple[float, float] | Tuple[str, ...]] = {
+    "temperature_c": (450.0, 900.0),
+    "heating_rate_c_min": (1.0, 20.0),
+    "annealing_time_h": (1.0, 12.0),
+    "precursor_ratio": (0.5, 2.0),
+    "pH": (2.0, 12.0),
+    "concentration_m": (0.1, 2.0),
+    "pressure_bar": (1.0, 100.0),
+    "milling_time_h": (0.0, 12.0),
+    "calcination_time_h": (1.0, 12.0),
+    "method": get_args(SynthesisMethod),
+}
+CATEGORICAL_SYNTHESIS_FIELDS = ("atmosphere", "solvent_type", "method", "material_system")
+# Rows per model call; bounds the temporaries of a single batch evaluation.
+EVAL_CHUNK_ROWS = 262_144
+
+
+def _primes(count: int) -> List[int]:
+    primes: List[int] = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def halton(n: int, dims: int, seed: int | None = 0, skip: int = 1) -> np.ndarray:
+    """
+    ``n`` points of the ``dims``-dimensional Halton sequence in [0, 1).
+
+    With a ``seed`` every digit goes through a random permutation of ``0..base-1``,
+    drawn independently per dimension and digit position (random digit
+    scrambling). Plain Halton coordinates in the large prime bases of later
+    dimensions stay strongly correlated for the first thousands of points, and a
+    random shift does not change that; scrambling does, while keeping each
+    coordinate's stratification. ``seed=None`` gives the plain sequence.
+    """
+    rng = np.random.default_rng(seed) if seed is not None else None
+    indices = np.arange(skip, skip + n, dtype=np.int64)
+    points = np.empty((n, dims))
+    for dim, base in enumerate(_primes(dims)):
+        remaining = indices.copy()
+        column = np.zeros(n)
+        scale = 1.0 / base
+        if rng is None:
+            while remaining.any():
+                column += scale * (remaining % base)
+                remaining //= base
+                scale /= base
+        else:
+            # Permuted zeros are not zero, so scrambling runs to float64 resolution.
+            for _ in range(int(52 * np.log(2) / np.log(base))):
+                column += scale * rng.permutation(base)[remaining % base]
+                remaining //= base
+                scale /= base
+        points[:, dim] = column
+    return np.minimum(points, np.nextafter(1.0, 0.0))
+
+
+class _ParameterSpace:
+    """Maps points of the unit hypercube onto synthesis columns and evaluates the model."""
+
+    def __init__(
+        self,
+        baseline: SynthesisInput,
+        structure: StructureFeatures | None,
+        ranges: Mapping[str, Sequence],
+        properties: Sequence[str] | None,
+        model: BatchModel | None,
+    ) -> None:
+        if not ranges:
+            raise ValueError("At least one parameter range is required")
+        unknown = [name for name in ranges if name not in NUMERIC_SYNTHESIS_FIELDS + CATEGORICAL_SYNTHESIS_FIELDS]
+        if unknown:
+            raise ValueError(f"Ranges must name synthesis fields, got {unknown}")
+        self.properties = list(properties) if properties is not None else list(PROPERTY_NAMES)
+        unknown_props = [name for name in self.properties if name not in PROPERTY_NAMES]
+        if unknown_props:
+            raise ValueError(f"Unknown properties {unknown_props}")
+        self.names = list(ranges)
+        self.numeric: Dict[str, Tuple[float, float]] = {}
+        self.levels: Dict[str, np.ndarray] = {}
+        for name, bounds in ranges.items():
+            if name in NUMERIC_SYNTHESIS_FIELDS:
+                low, high = (float(value) for value in bounds)
+                if high < low:
+                    raise ValueError(f"Range for '{name}' must be (low, high) with low <= high")
+                self.numeric[name] = (low, high - low)
+            else:
+                if not len(bounds):
+                    raise ValueError(f"Categorical parameter '{name}' needs at least one level")
+                self.levels[name] = np.asarray(list(bounds), dtype=object)
+        self.baseline = baseline
+        self.structure = structure
+        self.model = model or predict_properties_batch
+        self.evaluations = 0
+
+    def columns(self, unit: np.ndarray) -> SynthesisColumns:
+        columns: Dict[str, np.ndarray] = {}
+        for j, name in enumerate(self.names):
+            if name in self.numeric:
+                low, span = self.numeric[name]
+                columns[name] = low + unit[:, j] * span
+            else:
+                levels = self.levels[name]
+                columns[name] = levels[np.minimum((unit[:, j] * levels.size).astype(int), levels.size - 1)]
+        return columns
+
+    def evaluate(self, unit: np.ndarray) -> np.ndarray:
+        """Model outputs for each row of ``unit``, shape (rows, properties)."""
+        rows = unit.shape[0]
+        out = np.empty((rows, len(self.properties)))
+        for start in range(0, rows, EVAL_CHUNK_ROWS):
+            block = unit[start : start + EVAL_CHUNK_ROWS]
+            batch = self.model(self.columns(block), self.structure, baseline=self.baseline)
+            for k, name in enumerate(self.properties):
+                out[start : start + block.shape[0], k] = np.broadcast_to(getattr(batch, name), (block.shape[0],))
+        self.evaluations += rows
+        return out
+
+
+def _long_frame(properties: Sequence[str], parameters: Sequence[str], columns: Mapping[str, np.ndarray]) -> pd.DataFrame:
+    frame = pd.DataFrame(
+        {
+            "property": np.repeat(properties, len(parameters)),
+            "parameter": np.tile(parameters, len(properties)),
+        }
+    )
+    for name, values in columns.items():
+        frame[name] = values.ravel()
+    return frame
+
+
+@dataclass
+class SobolIndices:
+    """Sobol indices with 95% confidence half-widths; arrays are (properties, parameters)."""
+
+    parameters: List[str]
+    properties: List[str]
+    first_order: np.ndarray
+    total_order: np.ndarray
+    first_order_conf: np.ndarray
+    total_order_conf: np.ndarray
+    evaluations: int
+
+    def to_frame(self) -> pd.DataFrame:
+        return _long_frame(
+            self.properties,
+            self.parameters,
+            {
+                "S1": self.first_order,
+                "S1_conf": self.first_order_conf,
+                "ST": self.total_order,
+                "ST_conf": self.total_order_conf,
+            },
+        )
+
+    def ranking(self, prop: str) -> pd.DataFrame:
+        """Parameters for one property, most influential (largest total-order index) first."""
+        frame = self.to_frame()
+        frame = frame[frame["property"] == prop].drop(columns="property")
+        return frame.sort_values("ST", ascending=False, kind="stable").reset_index(drop=True)
+
+
+@dataclass
+class MorrisEffects:
+    """
+    Morris statistics per (property, parameter). Effects are per full parameter
+    range (unit-hypercube steps), so they compare across parameters with different units.
+    """
+
+    parameters: List[str]
+    properties: List[str]
+    mu: np.ndarray
+    mu_star: np.ndarray
+    sigma: np.ndarray
+    evaluations: int
+
+    def to_frame(self) -> pd.DataFrame:
+        return _long_frame(
+            self.properties,
+            self.parameters,
+            {"mu": self.mu, "mu_star": self.mu_star, "sigma": self.sigma},
+        )
+
+    def ranking(self, prop: str) -> pd.DataFrame:
+        """Parameters for one property, largest mean absolute effect first."""
+        frame = self.to_frame()
+        frame = frame[frame["property"] == prop].drop(columns="property")
+        return frame.sort_values("mu_star", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def _ratio(numerator: np.ndarray, variance: np.ndarray) -> np.ndarray:
+    # Properties that do not vary at all (e.g. clamped) have every index at zero.
+    return np.divide(numerator, variance, out=np.zeros_like(numerator), where=variance > 0.0)
+
+
+@timed("sensitivity.sobol")
+def sobol_indices(
+    baseline: SynthesisInput,
+    structure: StructureFeatures | None = None,
+    ranges: Mapping[str, Sequence] | None = None,
+    properties: Sequence[str] | None = None,
+    samples: int = 4096,
+    seed: int = 0,
+    model: BatchModel | None = None,
+) -> SobolIndices:
+    """
+    First- and total-order Sobol indices of each property for each parameter in
+    ``ranges`` (default DEFAULT_RANGES); fields not listed stay at ``baseline``.
+
+    Costs ``samples * (parameters + 2)`` model evaluations.
+    """
+    space = _ParameterSpace(baseline, structure, ranges or DEFAULT_RANGES, properties, model)
+    d = len(space.names)
+    points = halton(samples, 2 * d, seed=seed)
+    a, b = points[:, :d], points[:, d:]
+    f_a = space.evaluate(a)
+    f_b = space.evaluate(b)
+    # Centering does not change the indices but keeps the products well conditioned.
+    offset = np.concatenate([f_a, f_b]).mean(axis=0)
+    f_a -= offset
+    f_b -= offset
+    variance = np.concatenate([f_a, f_b]).var(axis=0)
+
+    shape = (len(space.properties), d)
+    first, total = np.empty(shape), np.empty(shape)
+    first_conf, total_conf = np.empty(shape), np.empty(shape)
+    scale = 1.96 / np.sqrt(samples)
+    for i in range(d):
+        mixed = a.copy()
+        mixed[:, i] = b[:, i]
+        f_ab = space.evaluate(mixed) - offset
+        first_terms = f_b * (f_ab - f_a)
+        total_terms = 0.5 * (f_a - f_ab) ** 2
+        first[:, i] = _ratio(first_terms.mean(axis=0), variance)
+        total[:, i] = _ratio(total_terms.mean(axis=0), variance)
+        first_conf[:, i] = _ratio(scale * first_terms.std(axis=0), variance)
+        total_conf[:, i] = _ratio(scale * total_terms.std(axis=0), variance)
+    return SobolIndices(space.names, space.properties, first, total, first_conf, total_conf, space.evaluations)
+
+
+@timed("sensitivity.morris")
+def morris_effects(
+    baseline: SynthesisInput,
+    structure: StructureFeatures | None = None,
+    ranges: Mapping[str, Sequence] | None = None,
+    properties: Sequence[str] | None = None,
+    trajectories: int = 1000,
+    levels: int = 4,
+    seed: int = 0,
+    model: BatchModel | None = None,
+) -> MorrisEffects:
+    """
+    Morris elementary effects on ``levels``-level grids (Campolongo's mu* included).
+
+    Costs ``trajectories * (parameters + 1)`` model evaluations, all issued as one batch.
+    """
+    if levels < 2 or levels % 2:
+        raise ValueError("levels must be an even number >= 2")
+    space = _ParameterSpace(baseline, structure, ranges or DEFAULT_RANGES, properties, model)
+    d = len(space.names)
+    rng = np.random.default_rng(seed)
+    delta = levels / (2.0 * (levels - 1))
+
+    # Start on the lower half of the grid so every +/-delta step stays inside [0, 1].
+    start = rng.integers(0, levels // 2, (trajectories, d)) / (levels - 1)
+    direction = rng.choice([-1.0, 1.0], (trajectories, d))
+    start += delta * (direction < 0)
+    order = np.argsort(rng.random((trajectories, d)), axis=1)
+    rows = np.arange(trajectories)[:, None]
+    steps = np.zeros((trajectories, d, d))
+    steps[rows, np.arange(d), order] = direction[rows, order] * delta
+    path = start[:, None, :] + np.concatenate([np.zeros((trajectories, 1, d)), np.cumsum(steps, axis=1)], axis=1)
+
+    outputs = space.evaluate(path.reshape(-1, d)).reshape(trajectories, d + 1, -1)
+    step_effects = np.diff(outputs, axis=1) / (direction[rows, order] * delta)[..., None]
+    effects = np.empty_like(step_effects)
+    effects[rows, order] = step_effects
+
+    ddof = 1 if trajectories > 1 else 0
+    return MorrisEffects(
+        space.names,
+        space.properties,
+        mu=effects.mean(axis=0).T,
+        mu_star=np.abs(effects).mean(axis=0).T,
+        sigma=effects.std(axis=0, ddof=ddof).T,
+        evaluations=space.evaluations,
+    )
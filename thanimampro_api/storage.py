@@ -0,0 +1,53 @@
+"""
+Atomic saves of artifact directories (a JSON manifest plus memory-mapped .npy arrays).
+
+A save fills a staging directory beside the target and then swaps it in. An
+interrupted save therefore never leaves old and new arrays mixed, and readers
+that already mapped the old arrays keep them.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+
+def replace_directory(staging: Path, target: Path) -> None:
+    """Move ``staging`` to ``target``, replacing any existing directory there."""
+    # os.replace cannot overwrite a non-empty directory, so the old one is moved
+    # aside first and deleted once the new one is in place.
+    retired = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{target.name}.", suffix=".old"))
+    retired.rmdir()
+    try:
+        os.replace(target, retired)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(staging, target)
+    except OSError:
+        if (target / "manifest.json").exists():
+            shutil.rmtree(staging, ignore_errors=True)  # a concurrent save got there first
+        elif retired.exists():
+            os.replace(retired, target)
+            raise
+        else:
+            raise
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def staged_directory(directory: str | Path) -> Iterator[Path]:
+    """Yield an empty directory that replaces ``directory`` if the block completes."""
+    final = Path(directory)
+    final.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=final.parent, prefix=f".{final.name}.", suffix=".tmp"))
+    try:
+        yield staging
+        replace_directory(staging, final)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
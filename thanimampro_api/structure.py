@@ -2,7 +2,19 @@ from __future__ import annotations
 
 import re
 
+from thanimampro_api.cif import parse_cif
 from thanimampro_api.schemas import StructureFeatures
+from thanimampro_api.xrd import analyze_pattern, load_pattern
+from thanimampro_telemetry import timed
+
+# Bump whenever analyze_structure_file output can change, to invalidate cached results.
+PARSER_VERSION = "2"
+
+DEFECT_WORDS = ("vacancy", "defect", "oxygen-deficient", "disorder")
+PHASE_WORDS = ("anatase", "rutile", "perovskite", "spinel")
+# Below this many 2theta points a pattern cannot resolve peak shapes, so the
+# peak-count heuristic is used instead of Scherrer / Williamson-Hall.
+MIN_PATTERN_POINTS = 50
 
 
 def _first_float(pattern: str, text: str, default: float) -> float:
@@ -17,40 +29,32 @@ def _first_float(pattern: str, text: str, default: float) -> float:
 
 def _infer_phase(text: str) -> str:
     lowered = text.lower()
-    if "anatase" in lowered:
-        return "anatase"
-    if "rutile" in lowered:
-        return "rutile"
-    if "perovskite" in lowered:
-        return "perovskite"
-    if "spinel" in lowered:
-        return "spinel"
+    for phase in PHASE_WORDS:
+        if phase in lowered:
+            return phase
     return "mixed/unknown"
 
 
-def analyze_structure_file(filename: str, content: bytes) -> StructureFeatures:
-    """
-    Lightweight parser for CIF/XRD text content.
-    """
-    decoded = content.decode("utf-8", errors="ignore")
-    source = "CIF" if filename.lower().endswith(".cif") else "XRD/text"
-
-    lattice_a = _first_float(r"_cell_length_a\s+([0-9.]+)", decoded, 3.78)
-    lattice_b = _first_float(r"_cell_length_b\s+([0-9.]+)", decoded, lattice_a)
-    lattice_c = _first_float(r"_cell_length_c\s+([0-9.]+)", decoded, 9.45)
-
+def _build_features(
+    phase: str,
+    lattice_a: float,
+    lattice_b: float,
+    lattice_c: float,
+    peak_count: int,
+    defect_hits: int,
+    source: str,
+    crystallite_size: float | None = None,
+    microstrain: float | None = None,
+) -> StructureFeatures:
     # Fallbacks driven by rough peak count to keep this useful for quick demos.
-    peak_like_values = re.findall(r"\b[0-9]{1,2}\.[0-9]{2,}\b", decoded)
-    peak_count = len(peak_like_values)
-    crystallite_size = max(6.0, 60.0 - 0.9 * peak_count)
-    microstrain = min(2.5, 0.1 + 0.02 * peak_count)
-
-    defect_words = ["vacancy", "defect", "oxygen-deficient", "disorder"]
-    defect_hits = sum(decoded.lower().count(word) for word in defect_words)
+    if crystallite_size is None:
+        crystallite_size = max(6.0, 60.0 - 0.9 * peak_count)
+    if microstrain is None:
+        microstrain = min(2.5, 0.1 + 0.02 * peak_count)
     defect_index = min(1.0, 0.1 + 0.12 * defect_hits + 0.02 * peak_count)
 
     return StructureFeatures(
-        phase=_infer_phase(decoded),
+        phase=phase,
         lattice_a=round(lattice_a, 4),
         lattice_b=round(lattice_b, 4),
         lattice_c=round(lattice_c, 4),
@@ -59,3 +63,66 @@ def analyze_structure_file(filename: str, content: bytes) -> StructureFeatures:
         defect_index=round(defect_index, 3),
         source=source,
     )
+
+
+def _analyze_cif(content: bytes) -> StructureFeatures:
+    document = parse_cif(content, keywords=DEFECT_WORDS + PHASE_WORDS)
+    block = document.first_block_with_cell()
+    cell = block.cell() if block is not None else None
+
+    lattice_a = cell.a if cell is not None and cell.a == cell.a else 3.78
+    lattice_b = cell.b if cell is not None and cell.b == cell.b else lattice_a
+    lattice_c = cell.c if cell is not None and cell.c == cell.c else 9.45
+    phase = next((word for word in PHASE_WORDS if document.keyword_counts[word]), "mixed/unknown")
+    return _build_features(
+        phase=phase,
+        lattice_a=lattice_a,
+        lattice_b=lattice_b,
+        lattice_c=lattice_c,
+        peak_count=document.decimal_count,
+        defect_hits=sum(document.keyword_counts[word] for word in DEFECT_WORDS),
+        source="CIF",
+    )
+
+
+@timed("structure.analyze")
+def analyze_structure_file(filename: str, content: bytes) -> StructureFeatures:
+    """
+    Lightweight parser for CIF/XRD text content.
+    """
+    if filename.lower().endswith(".cif"):
+        return _analyze_cif(content)
+
+    decoded = content.decode("utf-8", errors="ignore")
+    lattice_a = _first_float(r"_cell_length_a\s+([0-9.]+)", decoded, 3.78)
+    lattice_b = _first_float(r"_cell_length_b\s+([0-9.]+)", decoded, lattice_a)
+    lattice_c = _first_float(r"_cell_length_c\s+([0-9.]+)", decoded, 9.45)
+    lowered = decoded.lower()
+    defect_hits = sum(lowered.count(word) for word in DEFECT_WORDS)
+
+    two_theta, intensity = load_pattern(content)
+    if two_theta.size >= MIN_PATTERN_POINTS:
+        pattern = analyze_pattern(two_theta, intensity)
+        if pattern.resolved:
+            return _build_features(
+                phase=_infer_phase(decoded),
+                lattice_a=lattice_a,
+                lattice_b=lattice_b,
+                lattice_c=lattice_c,
+                peak_count=int(pattern.peak_two_theta.size),
+                defect_hits=defect_hits,
+                source="XRD/text",
+                crystallite_size=pattern.crystallite_size_nm,
+                microstrain=pattern.microstrain_pct,
+            )
+
+    peak_like_values = re.findall(r"\b[0-9]{1,2}\.[0-9]{2,}\b", decoded)
+    return _build_features(
+        phase=_infer_phase(decoded),
+        lattice_a=lattice_a,
+        lattice_b=lattice_b,
+        lattice_c=lattice_c,
+        peak_count=len(peak_like_values),
+        defect_hits=defect_hits,
+        source="XRD/text",
+    )
@@ -0,0 +1,347 @@
+"""
+Trainable surrogate for the properties reported in the literature dataset.
+
+A Bayesian ridge regression on polynomial terms of the numeric synthesis
+conditions plus one-hot synthesis method and material system. Training only
+accumulates the normal equations (X'X, X'y, y'y per target), so frames of any
+size stream through ``SurrogateTrainer.partial_fit`` in fixed memory and chunked
+fits equal a single fit exactly. Properties the literature does not report fall
+back to the baseline ``predict_properties`` surrogate.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from itertools import combinations_with_replacement
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from thanimampro_api.predict import SynthesisColumns, predict_properties, predict_properties_batch
+from thanimampro_api.schemas import PredictedProperties, PredictedPropertiesBatch, StructureFeatures, SynthesisInput
+from thanimampro_api.storage import staged_directory
+from thanimampro_telemetry import timed
+
+SURROGATE_FORMAT_VERSION = 1
+# Numeric inputs with the (center, scale) used to standardise them before the
+# polynomial expansion; fixed so streamed chunks share one feature space.
+NUMERIC_FEATURES: Dict[str, Tuple[float, float]] = {"temperature_c": (600.0, 200.0), "pH": (7.0, 3.0)}
+CATEGORICAL_FEATURES = ("method", "material_system")
+# Literature column -> PredictedProperties field.
+LITERATURE_TARGETS: Dict[str, str] = {"band_gap_ev": "band_gap_ev", "surface_area_m2_g": "specific_surface_area_m2_g"}
+# Same physical limits and rounding as the baseline surrogate.
+TARGET_LIMITS: Dict[str, Tuple[float, float, int]] = {
+    "band_gap_ev": (1.1, 4.5, 4),
+    "specific_surface_area_m2_g": (2.0, 220.0, 2),
+}
+CHUNK_ROWS = 65_536
+
+
+def polynomial_terms(features: int, degree: int) -> List[Tuple[int, ...]]:
+    """Index tuples of every monomial of total degree 1..``degree``."""
+    return [term for d in range(1, degree + 1) for term in combinations_with_replacement(range(features), d)]
+
+
+def _normalise(values: Iterable[object]) -> np.ndarray:
+    return np.asarray([str(value).strip().lower() for value in values], dtype=object)
+
+
+class _FeatureMap:
+    """Bias, standardised polynomial terms, then one column per (feature, category) in discovery order."""
+
+    def __init__(self, degree: int, categories: Sequence[Tuple[str, str]] = ()) -> None:
+        self.degree = degree
+        self.terms = polynomial_terms(len(NUMERIC_FEATURES), degree)
+        self.categories: List[Tuple[str, str]] = [tuple(item) for item in categories]
+        self._columns: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORICAL_FEATURES}
+        for offset, (feature, value) in enumerate(self.categories):
+            self._columns[feature][value] = 1 + len(self.terms) + offset
+
+    @property
+    def width(self) -> int:
+        return 1 + len(self.terms) + len(self.categories)
+
+    def learn(self, feature: str, values: np.ndarray) -> None:
+        for value in pd.unique(values):
+            if value not in self._columns[feature] and value != "nan":
+                self._columns[feature][value] = self.width
+                self.categories.append((feature, value))
+
+    def transform(self, numeric: Mapping[str, np.ndarray], categorical: Mapping[str, np.ndarray]) -> np.ndarray:
+        rows = next(iter(numeric.values())).shape[0]
+        design = np.zeros((rows, self.width))
+        design[:, 0] = 1.0
+        scaled = np.column_stack(
+            [
+                (np.asarray(numeric[name], dtype=float) - center) / scale
+                for name, (center, scale) in NUMERIC_FEATURES.items()
+            ]
+        )
+        for column, term in enumerate(self.terms, start=1):
+            design[:, column] = np.prod(scaled[:, term], axis=1)
+        for feature, values in categorical.items():
+            lookup = self._columns[feature]
+            if not lookup:
+                continue
+            # Unseen categories get no indicator, i.e. the pooled intercept.
+            index = pd.Index(list(lookup)).get_indexer(values)
+            known = index >= 0
+            columns = np.fromiter(lookup.values(), dtype=np.intp)[index[known]]
+            design[np.flatnonzero(known), columns] = 1.0
+        return design
+
+
+@dataclass
+class SurrogateModel:
+    """
+    Fitted surrogate. ``weights`` is (features, targets); ``covariance`` holds each
+    target's posterior weight covariance and ``noise_var`` its residual variance,
+    giving predictive variance ``noise_var + phi' covariance phi``.
+    """
+
+    degree: int
+    alpha: float
+    categories: List[Tuple[str, str]]
+    targets: List[str]
+    weights: np.ndarray
+    covariance: np.ndarray
+    noise_var: np.ndarray
+    rows: np.ndarray
+
+    def __post_init__(self) -> None:
+        self._features = _FeatureMap(self.degree, self.categories)
+
+    def _predict(
+        self, synthesis: SynthesisColumns, baseline: SynthesisInput | None
+    ) -> Tuple[np.ndarray, np.ndarray, Tuple[int, ...]]:
+        """Mean and predictive std, each (rows, targets), and the broadcast input shape."""
+        columns = {}
+        for name in (*NUMERIC_FEATURES, *CATEGORICAL_FEATURES):
+            dtype = object if name in CATEGORICAL_FEATURES else float
+            if name in synthesis:
+                columns[name] = np.asarray(synthesis[name], dtype=dtype)
+            elif baseline is not None:
+                columns[name] = np.asarray(getattr(baseline, name), dtype=dtype)
+            else:
+                raise KeyError(f"Missing column '{name}' and no baseline value to fall back on")
+        broadcast = np.broadcast_arrays(*columns.values())
+        shape = broadcast[0].shape
+        flat = {name: values.reshape(-1) for name, values in zip(columns, broadcast)}
+        numeric = {name: flat[name].astype(float) for name in NUMERIC_FEATURES}
+        categorical = {name: _normalise(flat[name]) for name in CATEGORICAL_FEATURES}
+        mean = np.empty((flat["pH"].size, len(self.targets)))
+        std = np.empty_like(mean)
+        # Chunked so the design matrix stays small however many rows are predicted.
+        for start in range(0, mean.shape[0], CHUNK_ROWS):
+            rows = slice(start, start + CHUNK_ROWS)
+            design = self._features.transform(
+                {name: values[rows] for name, values in numeric.items()},
+                {name: values[rows] for name, values in categorical.items()},
+            )
+            mean[rows] = design @ self.weights
+            for target in range(len(self.targets)):
+                spread = np.einsum("ij,jk,ik->i", design, self.covariance[target], design, optimize=True)
+                std[rows, target] = np.sqrt(self.noise_var[target] + spread)
+        return mean, std, shape
+
+    @timed("surrogate.predict_batch")
+    def predict_batch(
+        self,
+        synthesis: SynthesisColumns,
+        structure: StructureFeatures | None = None,
+        baseline: SynthesisInput | None = None,
+        return_std: bool = False,
+    ) -> PredictedPropertiesBatch | Tuple[PredictedPropertiesBatch, Dict[str, np.ndarray]]:
+        """
+        Batched counterpart of ``predict``, with ``predict_properties_batch`` semantics.
+        With ``return_std``, also return the predictive standard deviation of each
+        trained property.
+        """
+        batch = predict_properties_batch(synthesis, structure, baseline=baseline)
+        mean, std, design_shape = self._predict(synthesis, baseline)
+        stds: Dict[str, np.ndarray] = {}
+        shape = np.broadcast_shapes(design_shape, batch.band_gap_ev.shape)
+        if shape != batch.band_gap_ev.shape:
+            batch = PredictedPropertiesBatch(
+                **{name: np.array(np.broadcast_to(values, shape)) for name, values in batch.to_dict().items()}
+            )
+        for index, name in enumerate(self.targets):
+            low, high, ndigits = TARGET_LIMITS[name]
+            values = np.round(np.clip(mean[:, index], low, high), ndigits).reshape(design_shape)
+            setattr(batch, name, np.array(np.broadcast_to(values, shape)))
+            stds[name] = np.array(np.broadcast_to(std[:, index].reshape(design_shape), shape))
+        if "band_gap_ev" in self.targets:
+            batch.absorption_edge_nm = np.round(1240.0 / batch.band_gap_ev, 2)
+        return (batch, stds) if return_std else batch
+
+    @timed("surrogate.predict")
+    def predict(
+        self, synthesis: SynthesisInput, structure: StructureFeatures | None = None, return_std: bool = False
+    ) -> PredictedProperties | Tuple[PredictedProperties, Dict[str, float]]:
+        """Drop-in for ``predict_properties`` with trained values for the literature-reported properties."""
+        result = predict_properties(synthesis, structure)
+        mean, std, _ = self._predict({}, synthesis)
+        for index, name in enumerate(self.targets):
+            low, high, ndigits = TARGET_LIMITS[name]
+            setattr(result, name, round(min(high, max(low, float(mean[0, index]))), ndigits))
+        if "band_gap_ev" in self.targets:
+            result.absorption_edge_nm = round(1240.0 / result.band_gap_ev, 2)
+        if return_std:
+            return result, {name: float(std[0, index]) for index, name in enumerate(self.targets)}
+        return result
+
+    def save(self, directory: str | Path) -> None:
+        """
+        Persist as a JSON manifest plus memory-mappable .npy arrays, staged beside
+        ``directory`` and swapped in so a failed save leaves the previous model intact.
+        """
+        manifest = {
+            "format": SURROGATE_FORMAT_VERSION,
+            "degree": self.degree,
+            "alpha": self.alpha,
+            "categories": [list(item) for item in self.categories],
+            "targets": self.targets,
+            "noise_var": np.asarray(self.noise_var).tolist(),
+            "rows": np.asarray(self.rows).tolist(),
+            "numeric_features": {name: list(scaling) for name, scaling in NUMERIC_FEATURES.items()},
+        }
+        with staged_directory(directory) as target:
+            np.save(target / "weights.npy", np.ascontiguousarray(self.weights))
+            np.save(target / "covariance.npy", np.ascontiguousarray(self.covariance))
+            (target / "manifest.json").write_text(json.dumps(manifest))
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = True) -> "SurrogateModel":
+        source = Path(directory)
+        manifest = json.loads((source / "manifest.json").read_text())
+        if manifest.get("format") != SURROGATE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported surrogate format {manifest.get('format')}")
+        if manifest["numeric_features"] != {name: list(scaling) for name, scaling in NUMERIC_FEATURES.items()}:
+            raise ValueError("Surrogate was trained with different numeric feature scaling")
+        mode = "r" if mmap else None
+        return cls(
+            degree=manifest["degree"],
+            alpha=manifest["alpha"],
+            categories=[tuple(item) for item in manifest["categories"]],
+            targets=manifest["targets"],
+            weights=np.load(source / "weights.npy", mmap_mode=mode),
+            covariance=np.load(source / "covariance.npy", mmap_mode=mode),
+            noise_var=np.asarray(manifest["noise_var"]),
+            rows=np.asarray(manifest["rows"]),
+        )
+
+
+class SurrogateTrainer:
+    """
+    Streaming fit: call ``partial_fit`` with literature frames (any number, any
+    size), then ``fit``. Rows missing a target are skipped for that target only.
+    """
+
+    def __init__(self, degree: int = 2, alpha: float = 1.0, targets: Mapping[str, str] | None = None) -> None:
+        self.degree = degree
+        self.alpha = alpha
+        self.targets = dict(targets or LITERATURE_TARGETS)
+        self._features = _FeatureMap(degree)
+        width = self._features.width
+        count = len(self.targets)
+        self._gram = np.zeros((count, width, width))
+        self._moment = np.zeros((count, width))
+        self._sum_sq = np.zeros(count)
+        self._rows = np.zeros(count, dtype=np.int64)
+
+    def _grow(self) -> None:
+        # New one-hot columns were zero for every earlier row, so zero-padding the
+        # accumulated sums keeps them exact.
+        extra = self._features.width - self._moment.shape[1]
+        if extra:
+            self._gram = np.pad(self._gram, ((0, 0), (0, extra), (0, extra)))
+            self._moment = np.pad(self._moment, ((0, 0), (0, extra)))
+
+    def partial_fit(self, frame: pd.DataFrame) -> "SurrogateTrainer":
+        for start in range(0, len(frame), CHUNK_ROWS):
+            self._accumulate(frame.iloc[start : start + CHUNK_ROWS])
+        return self
+
+    def _accumulate(self, chunk: pd.DataFrame) -> None:
+        numeric = {name: pd.to_numeric(chunk[name], errors="coerce").to_numpy(dtype=float) for name in NUMERIC_FEATURES}
+        usable = np.logical_and.reduce([np.isfinite(values) for values in numeric.values()])
+        categorical = {}
+        for name in CATEGORICAL_FEATURES:
+            values = _normalise(chunk[name]) if name in chunk else np.full(len(chunk), "nan", dtype=object)
+            categorical[name] = values
+            self._features.learn(name, values[usable])
+        self._grow()
+        design = self._features.transform(
+            {name: values[usable] for name, values in numeric.items()},
+            {name: values[usable] for name, values in categorical.items()},
+        )
+        for index, column in enumerate(self.targets):
+            if column not in chunk:
+                continue
+            y = pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype=float)[usable]
+            present = np.isfinite(y)
+            rows, y = design[present], y[present]
+            self._gram[index] += rows.T @ rows
+            self._moment[index] += rows.T @ y
+            self._sum_sq[index] += y @ y
+            self._rows[index] += y.size
+
+    @timed("surrogate.fit")
+    def fit(self) -> SurrogateModel:
+        width = self._features.width
+        penalty = np.full(width, self.alpha)
+        penalty[0] = 0.0  # leave the intercept unregularised
+        weights = np.zeros((width, len(self.targets)))
+        covariance = np.zeros((len(self.targets), width, width))
+        noise_var = np.zeros(len(self.targets))
+        for index, name in enumerate(self.targets):
+            if not self._rows[index]:
+                raise ValueError(f"No rows with a value for '{name}'")
+            precision = self._gram[index] + np.diag(penalty)
+            # With alpha=0, categories never seen alongside this target would make
+            # the system singular; pin their weights at zero instead.
+            precision[np.diag_indices(width)] += (np.diag(precision) == 0) * 1.0
+            inverse = np.linalg.inv(precision)
+            w = inverse @ self._moment[index]
+            residual = self._sum_sq[index] - 2.0 * w @ self._moment[index] + w @ self._gram[index] @ w
+            dof = max(int(self._rows[index]) - width, 1)
+            noise_var[index] = max(residual, 0.0) / dof
+            weights[:, index] = w
+            covariance[index] = noise_var[index] * inverse
+        return SurrogateModel(
+            degree=self.degree,
+            alpha=self.alpha,
+            categories=list(self._features.categories),
+            targets=list(self.targets.values()),
+            weights=weights,
+            covariance=covariance,
+            noise_var=noise_var,
+            rows=self._rows.copy(),
+        )
+
+
+def fit_surrogate(
+    source: pd.DataFrame | str | Path | Iterable[pd.DataFrame],
+    degree: int = 2,
+    alpha: float = 1.0,
+    chunksize: int = 100_000,
+) -> SurrogateModel:
+    """
+    Fit on a literature frame (as from ``load_literature_data``), an iterable of
+    frames, or a CSV path, which is read in ``chunksize``-row pieces.
+    """
+    trainer = SurrogateTrainer(degree=degree, alpha=alpha)
+    if isinstance(source, (str, Path)):
+        source = pd.read_csv(source, chunksize=chunksize)
+    elif isinstance(source, pd.DataFrame):
+        source = [source]
+    for frame in source:
+        trainer.partial_fit(frame)
+    return trainer.fit()
+
+
+def load_surrogate(directory: str | Path) -> SurrogateModel:
+    return SurrogateModel.load(directory)
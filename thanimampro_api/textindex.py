@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Common names mapped onto the formula used in the literature tables.
+ALIASES: Dict[str, str] = {
+    "titania": "tio2",
+    "titanium dioxide": "tio2",
+    "zinc oxide": "zno",
+    "zirconia": "zro2",
+    "ceria": "ceo2",
+    "hematite": "fe2o3",
+    "magnetite": "fe3o4",
+    "alumina": "al2o3",
+    "silica": "sio2",
+    "strontium titanate": "srtio3",
+    "nickel ferrite": "nife2o4",
+    "bismuth vanadate": "bivo4",
+    "tungsten oxide": "wo3",
+}
+_ALIAS_PATTERN = re.compile(r"\b(" + "|".join(re.escape(name) for name in sorted(ALIASES, key=len, reverse=True)) + r")\b")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Lower-case, map aliases to formulas and fold punctuation ("sol-gel" == "sol gel")."""
+    lowered = _NON_WORD.sub(" ", str(text).lower()).strip()
+    return _ALIAS_PATTERN.sub(lambda match: ALIASES[match.group(1)], lowered)
+
+
+def ngrams(text: str, n: int = 3) -> set[str]:
+    """Distinct character n-grams of each normalized token, padded with one space per side."""
+    grams: set[str] = set()
+    for token in normalize(text).split():
+        padded = f" {token} "
+        grams.update(padded[i : i + n] for i in range(max(1, len(padded) - n + 1)))
+    return grams
+
+
+def similarity(overlap: np.ndarray, query_size: int, document_sizes: np.ndarray) -> np.ndarray:
+    """
+    Score in [0, 1] from shared-gram counts: the mean of containment (share of query
+    grams found, so short queries match long entries) and the Dice coefficient
+    (which favours entries of similar length to the query).
+    """
+    if not query_size:
+        return np.zeros_like(overlap)
+    containment = np.minimum(overlap / query_size, 1.0)
+    dice = 2.0 * overlap / (query_size + document_sizes)
+    return 0.5 * (containment + dice)
+
+
+class NGramIndex:
+    """
+    Append-only inverted index from character n-grams to document ids.
+
+    Postings are compact ``array('i')`` lists that only ever grow, so adding
+    documents never rebuilds existing entries. Queries score every document
+    sharing a gram with the query in one ``bincount`` over the touched postings.
+    """
+
+    def __init__(self, n: int = 3) -> None:
+        self.n = n
+        self._postings: Dict[str, array] = {}
+        self._sizes = array("i")
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def add(self, text: str) -> int:
+        doc_id = len(self._sizes)
+        grams = ngrams(text, self.n)
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("i")
+            postings.append(doc_id)
+        self._sizes.append(len(grams))
+        return doc_id
+
+    def extend(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.add(text)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """Number of distinct grams in each document."""
+        return np.array(self._sizes, dtype=float)
+
+    def overlaps(self, query: str) -> Tuple[np.ndarray, int]:
+        """Per-document count of shared grams, and the number of query grams."""
+        grams = ngrams(query, self.n)
+        total = len(self._sizes)
+        hits = [np.frombuffer(self._postings[gram], dtype=np.int32) for gram in grams if gram in self._postings]
+        if not hits:
+            return np.zeros(total), len(grams)
+        return np.bincount(np.concatenate(hits), minlength=total).astype(float), len(grams)
+
+    def scores(self, query: str) -> np.ndarray:
+        overlap, query_size = self.overlaps(query)
+        return similarity(overlap, query_size, self.sizes)
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> List[Tuple[int, float]]:
+        scores = self.scores(query)
+        candidates = np.flatnonzero(scores >= min_score)
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")][:limit]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in ranked]
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+CU_K_ALPHA_ANGSTROM = 1.5406
+SCHERRER_K = 0.9
+
+_NUMBER = rb"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+# A data row starts with two numbers; header, metadata and comment lines never do.
+_ROW = re.compile(rb"^[ \t]*(" + _NUMBER + rb")[ \t,;]+(" + _NUMBER + rb")", re.MULTILINE)
+
+
+@dataclass
+class PatternAnalysis:
+    peak_two_theta: np.ndarray
+    peak_height: np.ndarray
+    fwhm_deg: np.ndarray
+    scherrer_size_nm: np.ndarray
+    crystallite_size_nm: float | None
+    microstrain_pct: float | None
+    points: int
+
+    @property
+    def resolved(self) -> bool:
+        return self.crystallite_size_nm is not None
+
+
+def load_pattern(content: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Bulk-load 2theta/intensity columns from .xy/.xrd/.txt bytes, sorted by 2theta."""
+    rows = np.array(_ROW.findall(content), dtype=float).reshape(-1, 2)
+    order = np.argsort(rows[:, 0], kind="stable")
+    return rows[order, 0], rows[order, 1]
+
+
+def _odd_window(points: int, fraction: float, minimum: int) -> int:
+    window = max(minimum, int(points * fraction))
+    return window if window % 2 else window + 1
+
+
+def smooth(intensity: np.ndarray, window: int, polyorder: int = 2) -> np.ndarray:
+    """Savitzky-Golay smoothing with edge-replicated padding."""
+    if intensity.size < window:
+        return intensity.astype(float)
+    half = window // 2
+    offsets = np.arange(-half, half + 1, dtype=float)
+    design = np.vander(offsets, polyorder + 1, increasing=True)
+    coefficients = np.linalg.pinv(design)[0]
+    padded = np.pad(intensity.astype(float), half, mode="edge")
+    return np.convolve(padded, coefficients[::-1], mode="valid")
+
+
+def _rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Minimum of every length-``window`` slice in O(n) (van Herk / Gil-Werman blocks)."""
+    count = values.size - window + 1
+    blocks = -(-values.size // window)
+    padded = np.pad(values, (0, blocks * window - values.size), mode="edge").reshape(blocks, window)
+    prefix = np.minimum.accumulate(padded, axis=1).ravel()
+    suffix = np.minimum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.minimum(suffix[:count], prefix[window - 1 : window - 1 + count])
+
+
+def _moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    totals = np.cumsum(np.concatenate([[0.0], values]))
+    return (totals[window:] - totals[:-window]) / window
+
+
+def estimate_background(intensity: np.ndarray, window: int, presmooth: int = 1) -> np.ndarray:
+    """
+    Rolling-minimum envelope followed by a moving average (a cheap rolling-ball).
+
+    ``presmooth`` averages the pattern first so the minimum tracks the baseline
+    rather than the bottom of the noise band.
+    """
+    if intensity.size < window:
+        return np.full(intensity.shape, float(intensity.min()) if intensity.size else 0.0)
+    values = intensity.astype(float)
+    if presmooth > 1:
+        values = _moving_average(np.pad(values, presmooth // 2, mode="edge"), presmooth)
+    half = window // 2
+    envelope = _rolling_min(np.pad(values, half, mode="edge"), window)
+    return _moving_average(np.pad(envelope, half, mode="edge"), window)
+
+
+def find_peaks(signal: np.ndarray, min_height: float) -> np.ndarray:
+    """
+    One peak per contiguous run of ``signal >= min_height / 2`` whose maximum reaches
+    ``min_height``, placed at that maximum.
+
+    The hysteresis keeps noise wiggles on a peak's flanks from splitting it into
+    several reported maxima.
+    """
+    above = np.concatenate([[False], signal >= min_height / 2.0, [False]])
+    edges = np.flatnonzero(np.diff(above.astype(np.int8)))
+    peaks = []
+    for start, stop in zip(edges[0::2], edges[1::2]):
+        top = start + int(np.argmax(signal[start:stop]))
+        if signal[top] >= min_height and stop - start >= 3:
+            peaks.append(top)
+    return np.array(peaks, dtype=int)
+
+
+def _noise_sigma(values: np.ndarray) -> float:
+    """Robust noise level from the median absolute point-to-point difference."""
+    if values.size < 2:
+        return 0.0
+    return float(np.median(np.abs(np.diff(values)))) / (0.6745 * np.sqrt(2.0))
+
+
+def peak_fwhm(two_theta: np.ndarray, signal: np.ndarray, peaks: np.ndarray) -> np.ndarray:
+    """
+    Full width at half maximum of each peak, interpolating the half-height crossings.
+
+    Each peak is searched only up to its neighbours, so the total work is linear in
+    the pattern length. Peaks whose half height is not crossed on both sides get NaN.
+    """
+    widths = np.full(peaks.size, np.nan)
+    bounds = np.concatenate([[0], peaks, [signal.size - 1]])
+    for i, peak in enumerate(peaks):
+        half = signal[peak] / 2.0
+        left = signal[bounds[i] : peak + 1]
+        right = signal[peak : bounds[i + 2] + 1]
+        below_left = np.flatnonzero(left < half)
+        below_right = np.flatnonzero(right < half)
+        if not below_left.size or not below_right.size:
+            continue
+        lo = bounds[i] + below_left[-1]
+        hi = peak + below_right[0]
+        left_x = np.interp(half, signal[lo : lo + 2], two_theta[lo : lo + 2])
+        right_x = np.interp(half, signal[hi - 1 : hi + 1][::-1], two_theta[hi - 1 : hi + 1][::-1])
+        widths[i] = right_x - left_x
+    return widths
+
+
+def scherrer_size_nm(
+    two_theta_deg: np.ndarray,
+    fwhm_deg: np.ndarray,
+    wavelength_angstrom: float = CU_K_ALPHA_ANGSTROM,
+    k: float = SCHERRER_K,
+) -> np.ndarray:
+    theta = np.radians(two_theta_deg) / 2.0
+    beta = np.radians(fwhm_deg)
+    return k * wavelength_angstrom / (beta * np.cos(theta)) / 10.0
+
+
+def williamson_hall(
+    two_theta_deg: np.ndarray,
+    fwhm_deg: np.ndarray,
+    wavelength_angstrom: float = CU_K_ALPHA_ANGSTROM,
+    k: float = SCHERRER_K,
+) -> Tuple[float | None, float]:
+    """
+    Fit beta*cos(theta) = K*lambda/D + 4*strain*sin(theta).
+
+    Returns (crystallite size in nm or None when the intercept is not positive,
+    microstrain in percent).
+    """
+    theta = np.radians(two_theta_deg) / 2.0
+    beta = np.radians(fwhm_deg)
+    slope, intercept = np.polyfit(4.0 * np.sin(theta), beta * np.cos(theta), 1)
+    size = k * wavelength_angstrom / intercept / 10.0 if intercept > 0 else None
+    return size, max(0.0, float(slope) * 100.0)
+
+
+def analyze_pattern(
+    two_theta: np.ndarray,
+    intensity: np.ndarray,
+    wavelength_angstrom: float = CU_K_ALPHA_ANGSTROM,
+    instrument_fwhm_deg: float = 0.0,
+    min_relative_height: float = 0.05,
+    smooth_window: int = 7,
+) -> PatternAnalysis:
+    """
+    Background-subtract, smooth, pick peaks and derive Scherrer / Williamson-Hall values.
+
+    Peaks narrower than three sampling steps cannot be sized; if no peak can, the
+    size and strain are None and callers should fall back to coarser heuristics.
+    """
+    points = int(two_theta.size)
+    empty = np.empty(0)
+    if points < 5:
+        return PatternAnalysis(empty, empty, empty, empty, None, None, points)
+
+    background = estimate_background(
+        intensity,
+        _odd_window(points, 0.05, minimum=7),
+        presmooth=_odd_window(points, 0.005, minimum=smooth_window),
+    )
+    signal = smooth(np.clip(intensity - background, 0.0, None), smooth_window)
+    threshold = max(min_relative_height * float(signal.max()), 5.0 * _noise_sigma(intensity - background))
+    peaks = find_peaks(signal, threshold)
+    fwhm = peak_fwhm(two_theta, signal, peaks)
+    fwhm = np.sqrt(np.clip(fwhm**2 - instrument_fwhm_deg**2, 0.0, None))
+
+    step = float(np.median(np.diff(two_theta)))
+    usable = np.isfinite(fwhm) & (fwhm >= 3.0 * step)
+    sizes = np.full(peaks.size, np.nan)
+    sizes[usable] = scherrer_size_nm(two_theta[peaks][usable], fwhm[usable], wavelength_angstrom)
+
+    crystallite: float | None = None
+    strain: float | None = None
+    if usable.sum() >= 3:
+        crystallite, strain = williamson_hall(two_theta[peaks][usable], fwhm[usable], wavelength_angstrom)
+    if crystallite is None and usable.any():
+        crystallite = float(np.mean(sizes[usable]))
+        strain = strain if strain is not None else 0.0
+    return PatternAnalysis(
+        peak_two_theta=two_theta[peaks],
+        peak_height=signal[peaks],
+        fwhm_deg=fwhm,
+        scherrer_size_nm=sizes,
+        crystallite_size_nm=crystallite,
+        microstrain_pct=strain,
+        points=points,
+    )
@@ -0,0 +1,265 @@
+"""
+Lightweight in-process timing instrumentation.
+
+``span("name")`` (a context manager) and ``@timed("name")`` record wall-clock
+durations into per-name histograms; ``count("name")`` bumps a counter. Recording
+is off unless ``THANIMAMPRO_TELEMETRY`` is set to a true value or ``enable()`` is
+called; while off, ``span`` returns a shared no-op object and ``timed`` wrappers
+make one flag check, so instrumented hot paths pay essentially nothing.
+
+Aggregates can be read with ``snapshot()``, merged across processes with
+``drain()``/``merge()``, and exported as JSON or Prometheus text.
+
+Shared by ``thanimampro_api`` and ``ugp``, and standard-library only, so neither
+package depends on the other for instrumentation.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Tuple, TypeVar
+
+ENV_VAR = "THANIMAMPRO_TELEMETRY"
+# Upper bounds in seconds, Prometheus-style; the last bucket is +Inf.
+BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf,
+)  # fmt: skip
+PROMETHEUS_PREFIX = "thanimampro"
+
+logger = logging.getLogger("thanimampro.telemetry")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    """Count, sum, extremes and fixed bucket counts of observed durations (seconds)."""
+
+    __slots__ = ("count", "total", "minimum", "maximum", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+
+    def merge(self, other: Mapping[str, Any]) -> None:
+        if not other["count"]:
+            return
+        self.count += other["count"]
+        self.total += other["total_s"]
+        self.minimum = min(self.minimum, other["min_s"])
+        self.maximum = max(self.maximum, other["max_s"])
+        for index, value in enumerate(other["buckets"]):
+            self.buckets[index] += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the ``q``-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, hits in zip(BUCKETS, self.buckets):
+            if hits and seen + hits >= rank:
+                upper = min(bound, self.maximum)
+                low = max(lower, self.minimum)
+                return low + (upper - low) * max(0.0, rank - seen) / hits
+            seen += hits
+            lower = bound
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "min_s": self.minimum if self.count else 0.0,
+            "max_s": self.maximum,
+            "p50_s": self.quantile(0.5),
+            "p95_s": self.quantile(0.95),
+            "p99_s": self.quantile(0.99),
+            "buckets": list(self.buckets),
+        }
+
+
+class _Telemetry:
+    def __init__(self) -> None:
+        self.enabled = os.environ.get(ENV_VAR, "").strip().lower() in {"1", "true", "yes", "on"}
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+        logger.debug("%s took %.3f ms", name, seconds * 1e3)
+
+
+_STATE = _Telemetry()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _STATE.observe(self.name, time.perf_counter() - self.start)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable() -> None:
+    # Mirrored into the environment so worker processes started with spawn or
+    # forkserver, which re-import this module, record too.
+    _STATE.enabled = True
+    os.environ[ENV_VAR] = "1"
+
+
+def disable() -> None:
+    _STATE.enabled = False
+    os.environ[ENV_VAR] = "0"
+
+
+def enabled() -> bool:
+    return _STATE.enabled
+
+
+def span(name: str) -> _Span | _NullSpan:
+    """Time the enclosed block under ``name`` (a no-op while telemetry is disabled)."""
+    return _Span(name) if _STATE.enabled else _NULL_SPAN
+
+
+def timed(name: str | None = None) -> Callable[[F], F]:
+    """Decorator form of ``span``; ``name`` defaults to ``module.qualname``."""
+
+    def decorator(func: F) -> F:
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _STATE.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _STATE.observe(label, time.perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def count(name: str, value: float = 1) -> None:
+    if _STATE.enabled:
+        with _STATE.lock:
+            _STATE.counters[name] = _STATE.counters.get(name, 0) + value
+
+
+def snapshot() -> Dict[str, Any]:
+    with _STATE.lock:
+        return {
+            "spans": {name: h.to_dict() for name, h in sorted(_STATE.histograms.items())},
+            "counters": dict(sorted(_STATE.counters.items())),
+        }
+
+
+def reset() -> None:
+    with _STATE.lock:
+        _STATE.histograms.clear()
+        _STATE.counters.clear()
+
+
+def drain() -> Dict[str, Any]:
+    """Snapshot and reset, e.g. to ship a worker process's measurements to its parent."""
+    with _STATE.lock:
+        data = {
+            "spans": {name: h.to_dict() for name, h in _STATE.histograms.items()},
+            "counters": dict(_STATE.counters),
+        }
+        _STATE.histograms.clear()
+        _STATE.counters.clear()
+    return data
+
+
+def merge(data: Mapping[str, Any] | None) -> None:
+    """Fold a ``snapshot()``/``drain()`` payload (possibly from another process) into this one."""
+    if not data:
+        return
+    with _STATE.lock:
+        for name, summary in data.get("spans", {}).items():
+            _STATE.histograms.setdefault(name, Histogram()).merge(summary)
+        for name, value in data.get("counters", {}).items():
+            _STATE.counters[name] = _STATE.counters.get(name, 0) + value
+
+
+def _metric_name(name: str) -> str:
+    return "".join(ch if ch.isalnum() else "_" for ch in name)
+
+
+def to_prometheus(data: Mapping[str, Any] | None = None) -> str:
+    data = data or snapshot()
+    prefix = PROMETHEUS_PREFIX
+    lines: List[str] = []
+    if data["spans"]:
+        lines.append(f"# HELP {prefix}_span_seconds Wall time of instrumented spans.")
+        lines.append(f"# TYPE {prefix}_span_seconds histogram")
+    for name, summary in data["spans"].items():
+        cumulative = 0
+        for bound, hits in zip(BUCKETS, summary["buckets"]):
+            cumulative += hits
+            le = "+Inf" if math.isinf(bound) else repr(bound)
+            lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {summary["total_s"]!r}')
+        lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {summary["count"]}')
+    for name, value in data["counters"].items():
+        metric = f"{prefix}_{_metric_name(name)}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def export(path: str | Path) -> Path:
+    """Write the current aggregates to ``path``: Prometheus text for ``.prom``/``.txt``, JSON otherwise."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.suffix.lower() in {".prom", ".txt"}:
+        target.write_text(to_prometheus())
+    else:
+        target.write_text(json.dumps(snapshot(), indent=2))
+    return target
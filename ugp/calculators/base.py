@@ -7,6 +7,9 @@ from ugp.models import PTEnsemble, ThermoDataset
 class CalculatorEngine(ABC):
     """Abstract interface for P-T calculators."""
 
+    # Part of every result-cache key; bump whenever an engine's output changes.
+    version = "0"
+
     def __init__(self, config: Any) -> None:
         self.config = config
 
@@ -0,0 +1,285 @@
+import asyncio
+import itertools
+import json
+import os
+import queue
+import selectors
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from ugp.calculators.base import CalculatorEngine
+from ugp.io.reader import ensemble_from_dict
+from ugp.models import PTEnsemble, ThermoDataset
+
+TRANSPORTS = ("pipe", "file")
+
+
+class EngineError(RuntimeError):
+    """A worker reported a failure for a job."""
+
+
+class EngineTimeout(EngineError):
+    """A job exceeded its timeout; the worker was killed and replaced."""
+
+
+class EngineCrashed(EngineError):
+    """A worker exited while handling a job."""
+
+
+def scratch_root() -> Path:
+    """RAM-backed temp dir when the platform has one (``/dev/shm``), else the system temp dir."""
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm
+    return Path(tempfile.gettempdir())
+
+
+class _Worker:
+    """
+    One long-lived worker process speaking JSON lines over stdin/stdout.
+
+    Each request is ``{"id": ..., "workdir": ..., "job": ...}`` (or ``"job_path"``
+    for file transport) and each reply ``{"id": ..., "result": ...}`` or
+    ``{"id": ..., "error": "..."}``.
+    """
+
+    def __init__(self, command: Sequence[str], workdir: Path, env: Optional[Dict[str, str]]) -> None:
+        self.workdir = workdir
+        self.workdir.mkdir(parents=True, exist_ok=True)
+        self.process = subprocess.Popen(
+            list(command),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=str(workdir),
+            env=env,
+            bufsize=0,
+        )
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.process.stdout, selectors.EVENT_READ)
+        self._pending = b""
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, message: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        try:
+            self.process.stdin.write(json.dumps(message).encode() + b"\n")
+        except (BrokenPipeError, OSError) as exc:
+            raise EngineCrashed(f"worker exited with code {self.process.poll()}") from exc
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while b"\n" not in self._pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise EngineTimeout(f"job exceeded {timeout:.3g}s")
+            if not self._selector.select(remaining):
+                continue
+            chunk = os.read(self.process.stdout.fileno(), 65536)
+            if not chunk:
+                raise EngineCrashed(f"worker exited with code {self.process.wait()}")
+            self._pending += chunk
+        line, self._pending = self._pending.split(b"\n", 1)
+        return json.loads(line)
+
+    def close(self, kill: bool = False) -> None:
+        self._selector.close()
+        if self.alive:
+            if kill:
+                self.process.kill()
+            else:
+                self.process.stdin.close()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            if stream and not stream.closed:
+                stream.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class WorkerPool:
+    """
+    Fixed-size pool of warm worker processes with per-job timeouts.
+
+    Workers start lazily and are reused across jobs, so process startup is paid once
+    per worker instead of once per job. A worker that times out is killed; one that
+    crashes (or is killed) is replaced by a fresh process before the next job.
+    Thread-safe: up to ``size`` jobs run concurrently.
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        size: int = 2,
+        timeout: Optional[float] = None,
+        transport: str = "pipe",
+        env: Optional[Dict[str, str]] = None,
+        scratch_dir: Optional[Path] = None,
+    ) -> None:
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport '{transport}', expected one of {TRANSPORTS}")
+        self.command = list(command)
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.transport = transport
+        self.env = env
+        self.scratch = Path(tempfile.mkdtemp(prefix="ugp-", dir=scratch_dir or scratch_root()))
+        self.restarts = 0
+        self._idle: "queue.LifoQueue[Optional[_Worker]]" = queue.LifoQueue()
+        for _ in range(self.size):
+            self._idle.put(None)  # a slot whose worker has not been started yet
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self) -> _Worker:
+        with self._lock:
+            workdir = self.scratch / f"worker-{next(self._ids)}"
+        return _Worker(self.command, workdir, self.env)
+
+    def submit(self, job: Any, timeout: Optional[float] = None) -> Any:
+        """Run one job on an idle worker and return its ``result`` payload."""
+        if self._closed:
+            raise RuntimeError("worker pool is closed")
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.alive:
+                if worker is not None:
+                    worker.close(kill=True)
+                    with self._lock:
+                        self.restarts += 1
+                worker = self._spawn()
+            with self._lock:
+                job_id = next(self._ids)
+            message: Dict[str, Any] = {"id": job_id, "workdir": str(worker.workdir)}
+            if self.transport == "file":
+                job_path = worker.workdir / f"job-{job_id}.json"
+                job_path.write_text(json.dumps(job))
+                message["job_path"] = str(job_path)
+            else:
+                message["job"] = job
+            try:
+                reply = worker.request(message, self.timeout if timeout is None else timeout)
+            except EngineError:
+                worker.close(kill=True)
+                worker = None
+                with self._lock:
+                    self.restarts += 1
+                raise
+            finally:
+                if self.transport == "file" and worker is not None:
+                    (worker.workdir / f"job-{job_id}.json").unlink(missing_ok=True)
+            if reply.get("id") != job_id:
+                raise EngineError(f"worker answered job {reply.get('id')} instead of {job_id}")
+            if "error" in reply:
+                raise EngineError(str(reply["error"]))
+            return reply.get("result")
+        finally:
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.close()
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SubprocessEngine(CalculatorEngine):
+    """
+    Base for engines backed by an external program wrapped as a JSON-lines worker.
+
+    Subclasses set ``command`` (the worker to launch) and may override
+    ``encode_job``/``decode_result`` to translate between datasets and whatever the
+    wrapper expects. The pool starts on first use and is shared by concurrent
+    ``run`` calls, so a threaded bootstrap with ``workers=pool_size`` keeps every
+    warm worker busy. Engines pickle without their pool, so process-pool bootstraps
+    start one pool per worker process.
+    """
+
+    command: Sequence[str] = ()
+    pool_size = 2
+    job_timeout: Optional[float] = 600.0
+    transport = "pipe"
+    max_retries = 1
+
+    def __init__(self, config: Any, command: Optional[Sequence[str]] = None, pool_size: Optional[int] = None) -> None:
+        super().__init__(config)
+        if command is not None:
+            self.command = list(command)
+        if pool_size is not None:
+            self.pool_size = pool_size
+        self._pool: Optional[WorkerPool] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def pool(self) -> WorkerPool:
+        with self._pool_lock:
+            if self._pool is None:
+                if not self.command:
+                    raise ValueError(f"{type(self).__name__} has no worker command configured")
+                self._pool = WorkerPool(self.command, self.pool_size, self.job_timeout, self.transport)
+            return self._pool
+
+    def encode_job(self, dataset: ThermoDataset) -> Any:
+        return {"analyses": [asdict(a) for a in dataset.analyses], "reference": dataset.reference_frame}
+
+    def decode_result(self, payload: Any) -> PTEnsemble:
+        return ensemble_from_dict(payload)
+
+    def run(self, dataset: ThermoDataset) -> PTEnsemble:
+        job = self.encode_job(dataset)
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.decode_result(self.pool.submit(job))
+            except EngineCrashed:
+                # A crash may be transient (e.g. a licence hiccup); timeouts and
+                # reported errors are deterministic and are not retried.
+                if attempt == self.max_retries:
+                    raise
+        raise AssertionError("unreachable")
+
+    async def run_many(self, datasets: Sequence[ThermoDataset]) -> List[PTEnsemble]:
+        """Run a batch concurrently on the pool, returning results in input order."""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.pool_size)
+
+        async def run_one(dataset: ThermoDataset) -> PTEnsemble:
+            async with semaphore:
+                return await loop.run_in_executor(None, self.run, dataset)
+
+        return list(await asyncio.gather(*(run_one(dataset) for dataset in datasets)))
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state.pop("_pool_lock", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
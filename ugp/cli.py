@@ -1,62 +1,249 @@
 import argparse
+import contextlib
 import json
+import os
+import sys
+from dataclasses import asdict, replace
 from pathlib import Path
 
-from ugp.config import UGPConfig
-from ugp.core.pipeline import run_pipeline
+import thanimampro_telemetry as telemetry
+from ugp.config import UGPConfig, configure_logging
 from ugp.core.registry import registry
-from ugp.io.reader import read_dataset
-from ugp.io.writer import write_json
-from ugp.models import UncertaintyConfig
-import ugp.engines  # noqa: F401 ensures engines are registered
+
+# Keep module import cheap: NumPy, the pipeline and the engine modules are
+# imported by the commands that need them, so `ugp --help` and `ugp engines`
+# start without loading any calculator.
+
+
+def _add_bootstrap_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--bootstrap", action="store_true", help="Enable bootstrap uncertainty")
+    parser.add_argument("--iterations", type=int, default=200, help="Bootstrap iterations")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level")
+    parser.add_argument(
+        "--interval", choices=["percentile", "bca"], default="percentile", help="Bootstrap confidence interval method"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Bootstrap random seed")
+
+
+def _add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the result cache")
+    parser.add_argument("--cache-dir", default=None, help="Result cache directory (default: ./.ugp_cache)")
 
 
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Unified Geothermobarometry Platform (UGP)")
+    parser.add_argument(
+        "--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default=None, help="Logging level (default: INFO)"
+    )
+    parser.add_argument(
+        "--telemetry",
+        default=None,
+        metavar="PATH",
+        help="Record timing spans and write them to PATH (.json, or .prom for Prometheus text)",
+    )
     sub = parser.add_subparsers(dest="command", required=True)
 
     run_cmd = sub.add_parser("run", help="Run geothermobarometry on a dataset")
     run_cmd.add_argument("input", help="Path to dataset (e.g. JSON)")
-    run_cmd.add_argument("-e", "--engine", help="Engine to use", default=None)
-    run_cmd.add_argument("-o", "--output", help="Write results to JSON file", default=None)
-    run_cmd.add_argument("--bootstrap", action="store_true", help="Enable bootstrap uncertainty")
-    run_cmd.add_argument("--iterations", type=int, default=200, help="Bootstrap iterations")
-    run_cmd.add_argument("--confidence", type=float, default=0.95, help="Confidence level")
+    run_cmd.add_argument(
+        "-e",
+        "--engine",
+        action="append",
+        default=None,
+        help="Engine to use; repeat to run several engines concurrently and compare them",
+    )
+    run_cmd.add_argument("--timeout", type=float, default=None, help="Per-engine timeout in seconds (multi-engine runs)")
+    run_cmd.add_argument(
+        "-o", "--output", help="Write results to a .json, .ndjson or .ugpr (columnar binary) file", default=None
+    )
+    _add_bootstrap_arguments(run_cmd)
+    run_cmd.add_argument("--keep-runs", action="store_true", help="Keep every bootstrap point in the output")
+    run_cmd.add_argument("--workers", type=int, default=1, help="Parallel bootstrap workers")
+    run_cmd.add_argument(
+        "--executor",
+        choices=["serial", "thread", "process"],
+        default="process",
+        help="Bootstrap executor (threads suit engines that release the GIL or call subprocesses)",
+    )
+
+    _add_cache_arguments(run_cmd)
+
+    batch_cmd = sub.add_parser("batch", help="Run one engine over many datasets on a worker pool")
+    batch_cmd.add_argument("inputs", nargs="+", help="Dataset files, directories or glob patterns")
+    batch_cmd.add_argument("-e", "--engine", default=None, help="Engine to use")
+    batch_cmd.add_argument(
+        "-o", "--output", default=None, help="Write one NDJSON summary line per dataset here (default: stdout)"
+    )
+    batch_cmd.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    batch_cmd.add_argument("--executor", choices=["serial", "process"], default="process", help="Batch executor")
+    batch_cmd.add_argument("--errors", default=None, help="Also write the error report to this JSON file")
+    batch_cmd.add_argument("--quiet", action="store_true", help="Do not report progress on stderr")
+    _add_bootstrap_arguments(batch_cmd)
+    _add_cache_arguments(batch_cmd)
 
     sub.add_parser("engines", help="List available engines")
+
+    cache_cmd = sub.add_parser("cache", help="Inspect or purge the result cache")
+    cache_cmd.add_argument("action", choices=["stats", "purge"])
+    cache_cmd.add_argument("--cache-dir", default=None, help="Result cache directory (default: ./.ugp_cache)")
+    cache_cmd.add_argument("--older-than", type=float, default=None, help="Purge only entries unused for N days")
     return parser
 
 
-def main(argv=None):
-    parser = _build_parser()
-    args = parser.parse_args(argv)
+def _cache_command(args, config: UGPConfig) -> None:
+    from ugp.core.cache import ResultCache
+
+    cache = ResultCache.from_config(config)
+    if args.action == "purge":
+        older_than = None if args.older_than is None else args.older_than * 86400.0
+        print(f"Removed {cache.purge(older_than_s=older_than)} entries from {cache.directory}")
+        return
+    stats = cache.stats()
+    print(json.dumps(asdict(stats), indent=2))
+
+
+def _configs_from_args(args):
+    from ugp.models import UncertaintyConfig
+
+    config = UGPConfig(
+        uncertainty_enabled=args.bootstrap,
+        uncertainty_iterations=args.iterations,
+        uncertainty_confidence=args.confidence,
+        random_seed=args.seed,
+    )
+    if args.cache_dir:
+        config.cache_dir = Path(args.cache_dir)
+    uncertainty = None
+    if args.bootstrap:
+        uncertainty = UncertaintyConfig(
+            bootstrap_iterations=args.iterations,
+            confidence=args.confidence,
+            random_seed=args.seed,
+            interval=args.interval,
+        )
+    return config, uncertainty
+
+
+def _batch_command(args) -> int:
+    from ugp.core.batch import BatchProgress, discover_inputs, run_batch
+
+    paths = discover_inputs(args.inputs)
+    config, uncertainty = _configs_from_args(args)
+    progress = None if args.quiet else BatchProgress(len(paths))
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    def on_item(item) -> None:
+        record = {"index": item.index, "input": item.input, "status": item.status, "elapsed_s": round(item.elapsed_s, 6)}
+        record.update({"points": item.points, "summary": item.summary} if item.ok else {"error": item.error})
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+        if progress is not None:
+            progress.update(item)
 
+    try:
+        report = run_batch(
+            paths,
+            args.engine,
+            config,
+            uncertainty,
+            workers=args.workers,
+            executor=args.executor,
+            use_cache=not args.no_cache,
+            on_item=on_item,
+        )
+    finally:
+        if progress is not None:
+            progress.close()
+        if output is not sys.stdout:
+            output.close()
+    if not args.no_cache:
+        from ugp.core.cache import ResultCache
+
+        ResultCache.from_config(config).evict()
+
+    print(
+        f"Processed {report.total} datasets in {report.wall_time_s:.1f}s ({report.throughput:.1f}/s): "
+        f"{report.succeeded} succeeded, {report.failed} failed",
+        file=sys.stderr,
+    )
+    for error in report.errors:
+        print(f"  {error['input']}: {error['error']}", file=sys.stderr)
+    if args.errors:
+        Path(args.errors).write_text(json.dumps(dict(asdict(report), throughput=report.throughput), indent=2))
+    return 1 if report.failed else 0
+
+
+def _run_command(args) -> None:
+    from ugp.core.cache import ResultCache
+    from ugp.core.pipeline import run_pipeline, run_pipeline_multi
+    from ugp.io.reader import read_dataset
+    from ugp.io.writer import open_result_writer
+
+    dataset = read_dataset(args.input)
+    config, uncertainty = _configs_from_args(args)
+    if uncertainty is not None:
+        uncertainty = replace(uncertainty, workers=args.workers, executor=args.executor, keep_runs=args.keep_runs)
+    cache = None if args.no_cache else ResultCache.from_config(config)
+    engines = args.engine or [None]
+    writer = open_result_writer(args.output) if args.output else None
+    # The writer deletes its partial file if the run fails or is interrupted.
+    with writer or contextlib.nullcontext():
+        # For a single engine, kept bootstrap points stream straight into the output file.
+        sink = None
+        if writer is not None and uncertainty is not None and uncertainty.keep_runs and len(engines) == 1:
+            sink, uncertainty.keep_runs = writer, False
+        if len(engines) > 1:
+            result = run_pipeline_multi(dataset, engines, config, uncertainty, timeout=args.timeout, cache=cache)
+        else:
+            result = run_pipeline(dataset, engines[0], config, uncertainty, cache=cache, sink=sink)
+        if writer is not None:
+            if sink is None:
+                writer.write_points(result.results)
+            writer.close(result.summary, result.diagnostics)
+    if cache is not None:
+        cache.evict()
+
+    if writer is not None:
+        print(f"Wrote {writer.count} points to {writer.path.resolve()}")
+    else:
+        print(json.dumps(result.summary, indent=2))
+        if "agreement" in result.diagnostics:
+            print(json.dumps({"engines": result.diagnostics["engines"], "agreement": result.diagnostics["agreement"]}, indent=2))
+
+
+def _dispatch(args):
     if args.command == "engines":
         for name in registry.available():
             print(name)
         return
 
+    if args.command == "cache":
+        config = UGPConfig()
+        if args.cache_dir:
+            config.cache_dir = Path(args.cache_dir)
+        _cache_command(args, config)
+        return
+
     if args.command == "run":
-        dataset = read_dataset(args.input)
-        config = UGPConfig(
-            uncertainty_enabled=args.bootstrap,
-            uncertainty_iterations=args.iterations,
-            uncertainty_confidence=args.confidence,
-        )
-        uncertainty = None
-        if args.bootstrap:
-            uncertainty = UncertaintyConfig(
-                bootstrap_iterations=args.iterations,
-                confidence=args.confidence,
-            )
-        result = run_pipeline(dataset, args.engine, config, uncertainty)
-
-        if args.output:
-            write_json(result, args.output)
-            print(f"Wrote results to {Path(args.output).resolve()}")
-        else:
-            print(json.dumps(result.summary, indent=2))
+        _run_command(args)
+        return
+
+    if args.command == "batch":
+        return _batch_command(args)
+
+
+def main(argv=None):
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    configure_logging(UGPConfig(log_level=args.log_level) if args.log_level else UGPConfig())
+    if not args.telemetry:
+        return _dispatch(args)
+    telemetry.enable()
+    try:
+        return _dispatch(args)
+    finally:
+        print(f"Wrote telemetry to {telemetry.export(args.telemetry).resolve()}", file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
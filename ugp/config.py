@@ -1,3 +1,4 @@
+import logging
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
@@ -7,6 +8,7 @@ from typing import Optional
 class UGPConfig:
     data_dir: Path = Path("./data")
     cache_dir: Path = Path("./.ugp_cache")
+    cache_max_mb: float = 512.0
     default_engine: str = "thermocalc"
     log_level: str = "INFO"
     uncertainty_enabled: bool = True
@@ -14,3 +16,9 @@ class UGPConfig:
     uncertainty_confidence: float = 0.95
     random_seed: Optional[int] = None
 
+
+def configure_logging(config: UGPConfig) -> None:
+    """Send ``ugp`` and ``thanimampro`` log records at ``config.log_level`` and above to stderr."""
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    for name in ("ugp", "thanimampro"):
+        logging.getLogger(name).setLevel(config.log_level.upper())
@@ -0,0 +1,263 @@
+"""
+Batch runs: one engine over many datasets on a pool of long-lived workers.
+
+Each worker builds the engine (and opens the result cache) once in its
+initializer and reuses it for every dataset it is handed, so per-dataset cost is
+reading the file and running the engine. Failures are recorded per dataset and
+never stop the batch.
+"""
+
+import glob
+import logging
+import sys
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+import thanimampro_telemetry as telemetry
+from ugp.config import UGPConfig
+from ugp.core.cache import ResultCache
+from ugp.core.pipeline import run_pipeline
+from ugp.core.registry import resolve_engine
+from ugp.io.reader import DATASET_SUFFIXES, read_dataset
+from ugp.models import UncertaintyConfig
+
+BATCH_EXECUTORS = ("serial", "process")
+# Datasets queued per worker; enough to keep workers busy without submitting
+# thousands of futures up front.
+QUEUE_DEPTH = 4
+
+_WORKER_STATE: Dict[str, Any] = {}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchItem:
+    """Outcome for one dataset; ``summary`` is set on success, ``error`` on failure."""
+
+    index: int
+    input: str
+    status: str
+    elapsed_s: float
+    points: int = 0
+    summary: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    # Spans recorded in the worker process while handling this dataset.
+    telemetry: Optional[Dict[str, Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+@dataclass
+class BatchReport:
+    total: int
+    succeeded: int = 0
+    failed: int = 0
+    wall_time_s: float = 0.0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Datasets per second of wall time."""
+        return (self.succeeded + self.failed) / self.wall_time_s if self.wall_time_s else 0.0
+
+
+def discover_inputs(patterns: Iterable[str]) -> List[Path]:
+    """
+    Expand files, directories (searched recursively for readable datasets) and
+    glob patterns into a sorted, de-duplicated list of dataset paths.
+    """
+    found: Dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = [p for p in path.rglob("*") if p.suffix.lower() in DATASET_SUFFIXES and p.is_file()]
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = [Path(p) for p in glob.glob(pattern, recursive=True) if Path(p).is_file()]
+            if not matches:
+                raise FileNotFoundError(f"No datasets match '{pattern}'")
+        for match in sorted(matches):
+            found.setdefault(match, None)
+    return list(found)
+
+
+def _init_worker(
+    engine_name: Optional[str],
+    config: UGPConfig,
+    uncertainty: Optional[UncertaintyConfig],
+    use_cache: bool,
+) -> None:
+    _WORKER_STATE["engine_name"] = engine_name
+    _WORKER_STATE["engine"] = resolve_engine(engine_name)(config)
+    _WORKER_STATE["config"] = config
+    _WORKER_STATE["uncertainty"] = uncertainty
+    _WORKER_STATE["cache"] = ResultCache.from_config(config) if use_cache else None
+
+
+def _init_pool_worker(*initargs) -> None:
+    _init_worker(*initargs)
+    telemetry.reset()  # drop measurements inherited from a forked parent
+
+
+def _run_item(index: int, path: str) -> BatchItem:
+    start = time.perf_counter()
+    try:
+        result = run_pipeline(
+            read_dataset(path),
+            _WORKER_STATE["engine_name"],
+            _WORKER_STATE["config"],
+            _WORKER_STATE["uncertainty"],
+            cache=_WORKER_STATE["cache"],
+            engine=_WORKER_STATE["engine"],
+        )
+    except Exception as exc:  # one bad dataset must not stop the batch
+        message = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        return BatchItem(index, path, "error", time.perf_counter() - start, error=message)
+    return BatchItem(index, path, "ok", time.perf_counter() - start, len(result.results), result.summary)
+
+
+def _run_item_in_worker(index: int, path: str) -> BatchItem:
+    item = _run_item(index, path)
+    if telemetry.enabled():
+        item.telemetry = telemetry.drain()
+    return item
+
+
+def _run_pooled(paths: List[str], workers: int, initargs: tuple, record: Callable[[BatchItem], None]) -> None:
+    queued: Deque[Tuple[int, str]] = deque(enumerate(paths))
+    # Datasets in flight when a worker died. Any of them may have killed it, so
+    # each is rerun alone and only one that crashes on its own is reported.
+    suspects: Deque[Tuple[int, str]] = deque()
+    while queued or suspects:
+        # A worker that dies (segfault, OOM kill, os._exit) breaks the whole pool;
+        # the rest of the batch then continues on a fresh one.
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_pool_worker, initargs=initargs) as pool:
+            pending: Dict[Future, int] = {}
+            alone: Optional[int] = None
+            broken = False
+            while True:
+                try:
+                    if suspects and not pending and not broken:
+                        alone = suspects[0][0]
+                        pending[pool.submit(_run_item_in_worker, *suspects[0])] = alone
+                        suspects.popleft()
+                    while queued and not suspects and not broken and len(pending) < workers * QUEUE_DEPTH:
+                        pending[pool.submit(_run_item_in_worker, *queued[0])] = queued[0][0]
+                        queued.popleft()
+                except BrokenProcessPool:
+                    broken = True
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        item = future.result()
+                    except BrokenProcessPool as exc:
+                        broken = True
+                        if index != alone:
+                            suspects.append((index, paths[index]))
+                            continue
+                        item = BatchItem(index, paths[index], "error", 0.0, error=f"{type(exc).__name__}: {exc}")
+                    except Exception as exc:  # e.g. a result that could not be pickled
+                        item = BatchItem(index, paths[index], "error", 0.0, error=f"{type(exc).__name__}: {exc}")
+                    record(item)
+
+
+class BatchProgress:
+    """Throttled ``done/total, rate, ETA`` line on a stream (stderr by default)."""
+
+    def __init__(self, total: int, stream: Optional[TextIO] = None, interval: float = 0.5) -> None:
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self._start = time.perf_counter()
+        self._last = 0.0
+        self._tty = getattr(self.stream, "isatty", lambda: False)()
+
+    def update(self, item: BatchItem) -> None:
+        self.done += 1
+        self.failed += not item.ok
+        now = time.perf_counter()
+        if self.done == self.total or now - self._last >= self.interval:
+            self._last = now
+            self._write(now)
+
+    def _write(self, now: float) -> None:
+        elapsed = now - self._start
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else 0.0
+        line = (
+            f"[{self.done}/{self.total}] failed={self.failed} "
+            f"{rate:.1f} datasets/s elapsed={elapsed:.1f}s eta={eta:.1f}s"
+        )
+        self.stream.write(("\r" + line) if self._tty else (line + "\n"))
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self._tty:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def run_batch(
+    inputs: Sequence[str | Path],
+    engine_name: Optional[str],
+    config: UGPConfig,
+    uncertainty: Optional[UncertaintyConfig] = None,
+    workers: int = 1,
+    executor: str = "process",
+    use_cache: bool = True,
+    on_item: Optional[Callable[[BatchItem], None]] = None,
+) -> BatchReport:
+    """
+    Run ``engine_name`` on every dataset in ``inputs``, calling ``on_item`` with each
+    outcome as it completes (completion order; ``BatchItem.index`` is input order).
+
+    Parallelism is across datasets, so each dataset's bootstrap runs serially
+    inside its worker rather than starting a nested pool. If a worker process
+    dies, the pool is replaced and the datasets that were in flight are rerun one
+    at a time, so only the dataset that crashes its worker is reported as failed.
+    """
+    if executor not in BATCH_EXECUTORS:
+        raise ValueError(f"Unknown executor '{executor}', expected one of {BATCH_EXECUTORS}")
+    if uncertainty is not None:
+        uncertainty = replace(uncertainty, workers=1, executor="serial")
+    paths = [str(path) for path in inputs]
+    report = BatchReport(total=len(paths))
+    start = time.perf_counter()
+
+    def record(item: BatchItem) -> None:
+        telemetry.merge(item.telemetry)
+        if item.ok:
+            report.succeeded += 1
+        else:
+            report.failed += 1
+            report.errors.append({"index": item.index, "input": item.input, "error": item.error})
+            logger.warning("%s failed: %s", item.input, item.error)
+        if on_item is not None:
+            on_item(item)
+
+    initargs = (engine_name, config, uncertainty, use_cache)
+    if executor == "serial" or workers <= 1:
+        _init_worker(*initargs)
+        for index, path in enumerate(paths):
+            record(_run_item(index, path))
+    else:
+        _run_pooled(paths, workers, initargs, record)
+
+    report.errors.sort(key=lambda error: error["index"])
+    report.wall_time_s = time.perf_counter() - start
+    return report
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import thanimampro_telemetry as telemetry
+from ugp.config import UGPConfig
+from ugp.io.reader import ensemble_from_dict
+from ugp.io.writer import ensemble_to_dict
+from ugp.models import ColumnarDataset, PTEnsemble, PTPoint, ThermoDataset, UncertaintyConfig
+
+# Bumped whenever key derivation changes (2: dataset_hash hashes the columnar arrays).
+CACHE_FORMAT_VERSION = 2
+# Size bookkeeping at the cache root: the total from the last full scan, plus an
+# append-only journal of bytes written since, so ``evict`` can skip the scan
+# while the store is clearly under its limit.
+USAGE_INDEX = "usage.json"
+USAGE_JOURNAL = "usage.log"
+
+# Settings that change how work is scheduled or where files go, never an engine's
+# numbers. Bootstrap settings are keyed from the UncertaintyConfig instead.
+_CONFIG_IGNORED = {
+    "data_dir",
+    "cache_dir",
+    "cache_max_mb",
+    "log_level",
+    "uncertainty_enabled",
+    "uncertainty_iterations",
+    "uncertainty_confidence",
+    "random_seed",
+}
+_UNCERTAINTY_IGNORED = {"workers", "executor", "chunk_size"}
+
+
+def _canonical(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return _canonical(asdict(value))
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, Path):
+        return str(value)
+    return value
+
+
+def canonical_hash(*parts: Any) -> str:
+    """SHA-256 of the parts' canonical JSON (sorted keys, exact float repr)."""
+    text = json.dumps([CACHE_FORMAT_VERSION, *(_canonical(p) for p in parts)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def dataset_hash(dataset: ThermoDataset | ColumnarDataset) -> str:
+    """Hash of the dataset's columnar form, so it costs a pass over arrays, not objects."""
+    data = ColumnarDataset.from_dataset(dataset)
+    order = sorted(range(len(data.oxides)), key=data.oxides.__getitem__)
+    digest = hashlib.sha256()
+    header = [
+        [data.oxides[i] for i in order],
+        list(data.mineral_names),
+        list(data.sample_metadata),
+        data.reference_frame,
+    ]
+    digest.update(canonical_hash(*header).encode())
+    for array in (data.values[:, order], data.minerals, data.samples):
+        digest.update(np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<")).tobytes())
+    return digest.hexdigest()
+
+
+def engine_key(dataset: ThermoDataset, engine, config: UGPConfig) -> str:
+    """Key for one engine's output on one dataset under the result-affecting config."""
+    engine_id = f"{type(engine).__module__}.{type(engine).__qualname__}"
+    settings = {k: v for k, v in asdict(config).items() if k not in _CONFIG_IGNORED}
+    return canonical_hash(dataset_hash(dataset), engine_id, getattr(engine, "version", "0"), settings)
+
+
+def pipeline_key(base_key: str, uncertainty: Optional[UncertaintyConfig]) -> str:
+    if uncertainty is None:
+        return base_key
+    settings = {k: v for k, v in asdict(uncertainty).items() if k not in _UNCERTAINTY_IGNORED}
+    return canonical_hash(base_key, settings)
+
+
+@dataclass
+class CacheStats:
+    directory: str
+    entries: int = 0
+    bytes: int = 0
+    namespaces: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    oldest: Optional[float] = None
+    newest: Optional[float] = None
+
+
+class ResultCache:
+    """
+    Content-addressed JSON store for engine results under ``UGPConfig.cache_dir``.
+
+    Entries live at ``<namespace>/<key[:2]>/<key>.json`` and are written with
+    write-then-rename, so concurrent readers never see a partial file. Reads touch
+    the file's mtime, which ``evict`` uses as the LRU order when the store grows
+    past ``max_bytes``. Each write also appends its size to a journal, so ``evict``
+    only walks the store when the estimated size exceeds the limit.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: Optional[int] = None) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_config(cls, config: UGPConfig) -> "ResultCache":
+        return cls(config.cache_dir, int(config.cache_max_mb * 1024 * 1024))
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.directory / namespace / key[:2] / f"{key}.json"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        path = self._path(namespace, key)
+        try:
+            payload = json.loads(path.read_text())
+            os.utime(path)
+        except (OSError, ValueError):
+            telemetry.count(f"ugp.cache.{namespace}.miss")
+            return None
+        telemetry.count(f"ugp.cache.{namespace}.hit")
+        return payload
+
+    def put(self, namespace: str, key: str, payload: Any) -> None:
+        path = self._path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w") as temp:
+                json.dump(payload, temp, separators=(",", ":"))
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        self._record_write(path.stat().st_size)
+
+    def _record_write(self, size: int) -> None:
+        # O_APPEND writes of one short line do not interleave across processes.
+        with open(self.directory / USAGE_JOURNAL, "a") as journal:
+            journal.write(f"{size}\n")
+
+    def estimated_bytes(self) -> Optional[int]:
+        """
+        Size at the last full scan plus bytes written since (None before any scan).
+
+        The journal is folded into the index as it is read, so it stays short even
+        when the store never needs a scan.
+        """
+        try:
+            scanned = int(json.loads((self.directory / USAGE_INDEX).read_text())["bytes"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        # Move the journal aside first so concurrent writers start a fresh one.
+        pending = self.directory / f"{USAGE_JOURNAL}.{os.getpid()}"
+        try:
+            os.replace(self.directory / USAGE_JOURNAL, pending)
+        except OSError:
+            return scanned
+        with open(pending) as journal:
+            total = scanned + sum(int(line) for line in journal if line.strip().isdigit())
+        self._save_usage(total)
+        pending.unlink(missing_ok=True)
+        return total
+
+    def _save_usage(self, total: int) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(handle, "w") as temp:
+            json.dump({"bytes": total}, temp)
+        os.replace(temp_name, self.directory / USAGE_INDEX)
+
+    def get_ensemble(self, key: str) -> Optional[PTEnsemble]:
+        payload = self.get("results", key)
+        return ensemble_from_dict(payload) if payload is not None else None
+
+    def put_ensemble(self, key: str, result: PTEnsemble) -> None:
+        self.put("results", key, ensemble_to_dict(result))
+
+    def has_points(self, key: str) -> bool:
+        return self._path("bootstrap", key).exists()
+
+    def get_points(self, key: str) -> Optional[List[PTPoint]]:
+        payload = self.get("bootstrap", key)
+        return [PTPoint(**entry) for entry in payload] if payload is not None else None
+
+    def put_points(self, key: str, points: List[PTPoint]) -> None:
+        self.put("bootstrap", key, [asdict(p) for p in points])
+
+    def _entries(self) -> Iterator[Tuple[Path, os.stat_result]]:
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("*/*/*.json"):
+            try:
+                yield path, path.stat()
+            except OSError:
+                continue
+
+    def stats(self) -> CacheStats:
+        stats = CacheStats(directory=str(self.directory))
+        for path, info in self._entries():
+            namespace = path.parent.parent.name
+            bucket = stats.namespaces.setdefault(namespace, {"entries": 0, "bytes": 0})
+            bucket["entries"] += 1
+            bucket["bytes"] += info.st_size
+            stats.entries += 1
+            stats.bytes += info.st_size
+            stats.oldest = info.st_mtime if stats.oldest is None else min(stats.oldest, info.st_mtime)
+            stats.newest = info.st_mtime if stats.newest is None else max(stats.newest, info.st_mtime)
+        return stats
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Delete least-recently-used entries until the store fits in ``max_bytes``.
+
+        The store is only scanned when ``estimated_bytes`` is unknown or over the
+        limit. The estimate counts a rewritten entry twice, which only makes a scan come sooner.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        if limit is None:
+            return 0
+        estimate = self.estimated_bytes()
+        if estimate is not None and estimate <= limit:
+            return 0
+        # Writes that land during the scan go to a fresh journal and are counted next time.
+        (self.directory / USAGE_JOURNAL).unlink(missing_ok=True)
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(info.st_size for _, info in entries)
+        removed = 0
+        for path, info in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= info.st_size
+            removed += 1
+        self._save_usage(total)
+        return removed
+
+    def purge(self, older_than_s: Optional[float] = None, namespace: Optional[str] = None) -> int:
+        """Delete every entry (or those unused for ``older_than_s`` seconds); returns the count."""
+        cutoff = None if older_than_s is None else time.time() - older_than_s
+        removed = 0
+        for path, info in list(self._entries()):
+            if namespace is not None and path.parent.parent.name != namespace:
+                continue
+            if cutoff is None or info.st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        # The recorded size is now stale; the next evict rescans.
+        (self.directory / USAGE_INDEX).unlink(missing_ok=True)
+        return removed
@@ -1,23 +1,233 @@
-from typing import Optional
+import logging
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import replace
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence
 
+import numpy as np
+
+import thanimampro_telemetry as telemetry
+from ugp.calculators.base import CalculatorEngine
 from ugp.config import UGPConfig
+from ugp.core.cache import ResultCache, engine_key, pipeline_key
 from ugp.core.registry import resolve_engine
-from ugp.models import PTEnsemble, ThermoDataset, UncertaintyConfig
+from ugp.models import PTEnsemble, PTPoint, ThermoDataset, UncertaintyConfig
 from ugp.uncertainty.bootstrap import bootstrap_ensemble
 
+ENGINE_EXECUTORS = ("thread", "process")
+
+logger = logging.getLogger(__name__)
+
+
+def _run_engine(engine: CalculatorEngine, dataset: ThermoDataset) -> PTEnsemble:
+    with telemetry.span("ugp.engine.run"):
+        return engine.run(dataset)
 
+
+@telemetry.timed("ugp.pipeline")
 def run_pipeline(
     dataset: ThermoDataset,
     engine_name: Optional[str],
     config: UGPConfig,
     uncertainty: Optional[UncertaintyConfig] = None,
+    cache: Optional[ResultCache] = None,
+    sink=None,
+    engine: Optional[CalculatorEngine] = None,
+) -> PTEnsemble:
+    """
+    Run one engine and, when enabled, a bootstrap that reuses its base run.
+
+    ``engine`` reuses an already built instance of ``engine_name`` (e.g. one per
+    batch worker) instead of constructing a new one. ``sink`` is handed to
+    ``bootstrap_ensemble`` to stream every bootstrap point; a cached final result
+    is then ignored so the sink still sees each iteration (the per-iteration
+    cache keeps that cheap).
+    """
+    if engine is None:
+        engine = resolve_engine(engine_name)(config)
+    bootstrapping = bool(config.uncertainty_enabled and uncertainty)
+    if cache is None:
+        base_results = _run_engine(engine, dataset)
+        if bootstrapping:
+            return bootstrap_ensemble(engine, dataset, uncertainty, base=base_results, sink=sink)
+        return base_results
+
+    base_key = engine_key(dataset, engine, config)
+    key = pipeline_key(base_key, uncertainty if bootstrapping else None)
+    # An unseeded bootstrap is a fresh random draw each time, so it is neither
+    # replayed from nor stored in the cache; the deterministic base run still is.
+    reusable = not bootstrapping or uncertainty.random_seed is not None
+    cached = cache.get_ensemble(key) if sink is None and reusable else None
+    if cached is not None:
+        logger.debug("Result cache hit for %s (%s)", engine_name, key[:12])
+        return cached
+
+    base_results = cache.get_ensemble(base_key)
+    if base_results is None:
+        base_results = _run_engine(engine, dataset)
+        cache.put_ensemble(base_key, base_results)
+    if not bootstrapping:
+        return base_results
+
+    result = bootstrap_ensemble(
+        engine, dataset, uncertainty, base=base_results, cache=cache, cache_key=base_key, sink=sink
+    )
+    if reusable:
+        cache.put_ensemble(key, result)
+    return result
+
+
+def _run_engine_task(
+    engine_name: str,
+    dataset: ThermoDataset,
+    config: UGPConfig,
+    uncertainty: Optional[UncertaintyConfig],
+    cache: Optional[ResultCache],
 ) -> PTEnsemble:
-    engine_factory = resolve_engine(engine_name)
-    engine = engine_factory(config)
-    base_results = engine.run(dataset)
+    return run_pipeline(dataset, engine_name, config, uncertainty, cache)
+
+
+def _stop_workers(pool: ProcessPoolExecutor) -> None:
+    # Terminate rather than wait: a timed-out engine would otherwise keep its
+    # worker busy and block interpreter exit until it finished.
+    terminate = getattr(pool, "terminate_workers", None)  # Python 3.14+
+    if terminate is not None:
+        terminate()
+    else:
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _tag_engine(points: Sequence[PTPoint], engine_name: str) -> List[PTPoint]:
+    return [replace(p, provenance={**p.provenance, "engine": engine_name}) for p in points]
+
+
+def _ensemble_estimate(result: PTEnsemble) -> Optional[np.ndarray]:
+    if "p_mean_gpa" in result.summary and "t_mean_c" in result.summary:
+        return np.array([result.summary["p_mean_gpa"], result.summary["t_mean_c"]], dtype=float)
+    if not result.results:
+        return None
+    return np.array([[p.pressure_gpa, p.temperature_c] for p in result.results], dtype=float).mean(axis=0)
+
+
+def engine_agreement(results: Dict[str, PTEnsemble]) -> Dict[str, Any]:
+    """
+    How well engine estimates agree: the spread of their P-T means and, for each
+    pair, the difference in units of combined bootstrap sigma when available.
+    """
+    estimates = {name: _ensemble_estimate(result) for name, result in results.items()}
+    estimates = {name: value for name, value in estimates.items() if value is not None}
+    if not estimates:
+        return {"engines": 0}
+    means = np.array(list(estimates.values()))
+    agreement: Dict[str, Any] = {
+        "engines": len(estimates),
+        "p_range_gpa": float(np.ptp(means[:, 0])),
+        "t_range_c": float(np.ptp(means[:, 1])),
+        "p_spread_gpa": float(means[:, 0].std()),
+        "t_spread_c": float(means[:, 1].std()),
+    }
+
+    pairs = []
+    sigmas = []
+    for left, right in combinations(estimates, 2):
+        delta = estimates[right] - estimates[left]
+        pair: Dict[str, Any] = {"engines": [left, right], "dp_gpa": float(delta[0]), "dt_c": float(delta[1])}
+        left_summary, right_summary = results[left].summary, results[right].summary
+        if "p_std_gpa" in left_summary and "p_std_gpa" in right_summary:
+            combined = np.hypot(
+                [left_summary["p_std_gpa"], left_summary["t_std_c"]],
+                [right_summary["p_std_gpa"], right_summary["t_std_c"]],
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                separation = np.where(combined > 0, np.abs(delta) / combined, np.where(delta == 0, 0.0, np.inf))
+            # No spread but different means has no finite separation; None keeps the
+            # diagnostics valid JSON, and ``consistent`` still records the disagreement.
+            pair["p_sigma"], pair["t_sigma"] = (float(value) if np.isfinite(value) else None for value in separation)
+            sigmas.append(float(separation.max()))
+        pairs.append(pair)
+    agreement["pairwise"] = pairs
+    # Consistent when every pair differs by at most two combined sigma (None without bootstrap).
+    agreement["consistent"] = bool(max(sigmas) <= 2.0) if sigmas and len(sigmas) == len(pairs) else None
+    return agreement
+
+
+@telemetry.timed("ugp.pipeline.multi")
+def run_pipeline_multi(
+    dataset: ThermoDataset,
+    engine_names: Sequence[str],
+    config: UGPConfig,
+    uncertainty: Optional[UncertaintyConfig] = None,
+    timeout: Optional[float] = None,
+    executor: str = "thread",
+    cache: Optional[ResultCache] = None,
+) -> PTEnsemble:
+    """
+    Run several engines on the same dataset concurrently and merge their ensembles.
+
+    Each engine runs its base calculation and, when enabled, a bootstrap that reuses
+    that base run. ``timeout`` is in seconds per engine, measured from the common
+    start, so total wall time follows the slowest engine rather than their sum.
+    Engines that time out or fail are reported in the diagnostics and left out of
+    the merged points. With ``executor="process"`` the workers of timed-out
+    engines are terminated; threads cannot be interrupted, so with the default
+    ``"thread"`` executor the timeout only bounds result collection and a
+    timed-out engine finishes in the background (interpreter exit waits for it).
+    Use ``executor="process"`` for CPU-bound pure-Python engines or engines that
+    may hang.
+    """
+    if executor not in ENGINE_EXECUTORS:
+        raise ValueError(f"Unknown executor '{executor}', expected one of {ENGINE_EXECUTORS}")
+    names = list(dict.fromkeys(engine_names))
+    for name in names:
+        resolve_engine(name)  # fail fast on unknown engines
+
+    pool_type = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    pool = pool_type(max_workers=max(1, len(names)))
+    started = time.perf_counter()
+    futures: Dict[str, Future] = {
+        name: pool.submit(_run_engine_task, name, dataset, config, uncertainty, cache) for name in names
+    }
 
-    if config.uncertainty_enabled and uncertainty:
-        return bootstrap_ensemble(engine, dataset, uncertainty)
+    results: Dict[str, PTEnsemble] = {}
+    status: Dict[str, Dict[str, Any]] = {}
+    try:
+        for name, future in futures.items():
+            remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - started))
+            try:
+                results[name] = future.result(timeout=remaining)
+                status[name] = {"status": "ok", "elapsed_s": time.perf_counter() - started}
+            except FutureTimeoutError:
+                future.cancel()
+                status[name] = {"status": "timeout", "elapsed_s": time.perf_counter() - started}
+                logger.warning("Engine %s timed out after %.1fs", name, timeout)
+            except Exception as exc:  # noqa: BLE001 - one failing engine must not sink the others
+                status[name] = {"status": "error", "error": f"{type(exc).__name__}: {exc}"}
+                logger.warning("Engine %s failed: %s", name, status[name]["error"])
+    finally:
+        timed_out = any(entry["status"] == "timeout" for entry in status.values())
+        if timed_out and isinstance(pool, ProcessPoolExecutor):
+            _stop_workers(pool)
+        else:
+            pool.shutdown(wait=False, cancel_futures=True)
 
-    return base_results
+    merged: List[PTPoint] = []
+    for name, result in results.items():
+        merged.extend(_tag_engine(result.results, name))
+    agreement = engine_agreement(results)
 
+    summary: Dict[str, Any] = {"engines": {name: result.summary for name, result in results.items()}}
+    estimates = [value for value in (_ensemble_estimate(result) for result in results.values()) if value is not None]
+    if estimates:
+        p_mean, t_mean = np.mean(estimates, axis=0)
+        summary["p_mean_gpa"] = float(p_mean)
+        summary["t_mean_c"] = float(t_mean)
+    diagnostics = {
+        "engines": status,
+        "agreement": agreement,
+        "wall_time_s": time.perf_counter() - started,
+    }
+    return PTEnsemble(results=merged, summary=summary, diagnostics=diagnostics)
@@ -1,27 +1,96 @@
+import importlib
+import threading
 from typing import Callable, Dict, List, Optional
 
+ENTRY_POINT_GROUP = "ugp.engines"
+
+# Built-in engines, declared by import path so listing them imports nothing.
+BUILTIN_ENGINES = {
+    "thermocalc": "ugp.calculators.thermocalc:build_thermocalc",
+    "perplex": "ugp.calculators.perplex:build_perplex",
+    "pywerami": "ugp.calculators.pywerami:build_pywerami",
+}
+
 
 class EngineRegistry:
-    """Lightweight registry for calculator engines."""
+    """
+    Lightweight registry for calculator engines.
+
+    Engines are either registered with a factory (usually via ``register_engine``
+    when their module is imported) or declared by name with a ``"module:attr"``
+    target, from ``BUILTIN_ENGINES`` or the ``ugp.engines`` entry-point group.
+    A declared engine's module is imported only when the engine is first requested.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, entry_point_group: Optional[str] = ENTRY_POINT_GROUP) -> None:
         self._engines: Dict[str, Callable] = {}
+        self._declared: Dict[str, str] = {}
+        self._entry_point_group = entry_point_group
+        self._discovered = entry_point_group is None
+        self._lock = threading.RLock()
 
     def register(self, name: str, factory: Callable) -> None:
-        if name in self._engines:
-            raise ValueError(f"Engine '{name}' already registered")
-        self._engines[name] = factory
+        with self._lock:
+            if name in self._engines:
+                raise ValueError(f"Engine '{name}' already registered")
+            self._engines[name] = factory
+
+    def unregister(self, name: str) -> None:
+        """Remove a registered factory (e.g. a test engine); declared targets are kept."""
+        with self._lock:
+            if self._engines.pop(name, None) is None:
+                raise KeyError(f"Engine '{name}' not registered")
+
+    def declare(self, name: str, target: str) -> None:
+        """Declare ``name`` as provided by ``"package.module:factory"`` without importing it."""
+        if ":" not in target:
+            raise ValueError(f"Engine target '{target}' must look like 'module:attribute'")
+        with self._lock:
+            existing = self._declared.get(name)
+            if existing is not None and existing != target:
+                raise ValueError(f"Engine '{name}' already declared as '{existing}'")
+            self._declared[name] = target
+
+    def _discover(self) -> None:
+        with self._lock:
+            if self._discovered:
+                return
+            self._discovered = True
+            from importlib.metadata import entry_points
+
+            for entry_point in entry_points(group=self._entry_point_group):
+                if entry_point.name not in self._engines and entry_point.name not in self._declared:
+                    self.declare(entry_point.name, entry_point.value)
+
+    def _load(self, name: str) -> None:
+        module_name, _, attribute = self._declared[name].partition(":")
+        module = importlib.import_module(module_name)
+        # Importing usually registers the engine through ``register_engine``;
+        # otherwise the declared attribute is the factory itself.
+        with self._lock:
+            if name not in self._engines:
+                self._engines[name] = getattr(module, attribute)
 
     def get(self, name: str) -> Callable:
+        if name not in self._engines and name not in self._declared:
+            self._discover()
         if name not in self._engines:
-            raise KeyError(f"Engine '{name}' not found")
+            if name not in self._declared:
+                raise KeyError(f"Engine '{name}' not found")
+            self._load(name)
         return self._engines[name]
 
     def available(self) -> List[str]:
-        return sorted(self._engines.keys())
+        self._discover()
+        return sorted(set(self._engines) | set(self._declared))
+
+    def loaded(self) -> List[str]:
+        return sorted(self._engines)
 
 
 registry = EngineRegistry()
+for _name, _target in BUILTIN_ENGINES.items():
+    registry.declare(_name, _target)
 
 
 def register_engine(name: str):
@@ -37,4 +106,3 @@ def register_engine(name: str):
 def resolve_engine(name: Optional[str]) -> Callable:
     target = name or "thermocalc"
     return registry.get(target)
-
@@ -1,5 +1,5 @@
-# Import side effects register engines.
+# Eagerly imports every built-in engine. The registry declares them by name and
+# imports them on first use, so this is only needed to preload them all.
 from ugp.calculators.thermocalc import build_thermocalc  # noqa: F401
 from ugp.calculators.perplex import build_perplex  # noqa: F401
 from ugp.calculators.pywerami import build_pywerami  # noqa: F401
-
@@ -0,0 +1,206 @@
+"""
+Memory-mappable columnar files: datasets (``.ugpc``) and result ensembles (``.ugpr``).
+
+Layout: an 8-byte magic, a little-endian uint64 header length, a UTF-8 JSON
+header (metadata plus an offset/dtype/shape entry per array), then the raw
+little-endian arrays, each aligned to 64 bytes so they can be mapped straight
+into NumPy without copying.
+"""
+
+import json
+import os
+import shutil
+import struct
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from thanimampro_telemetry import timed
+from ugp.models import ColumnarDataset, PTEnsemble, PTPoint, SampleMetadata
+
+DATASET_MAGIC = b"UGPCOL1\0"
+RESULT_MAGIC = b"UGPRES1\0"
+ALIGNMENT = 64
+# Per-point arrays of a ``.ugpr`` file and their on-disk types.
+RESULT_COLUMNS = {"pressure_gpa": np.float64, "temperature_c": np.float64, "methods": np.int32, "provenance": np.int32}
+_PREFIX = struct.Struct("<8sQ")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _layout(header: Dict[str, Any], specs: Mapping[str, Tuple[np.dtype, Tuple[int, ...]]]) -> Tuple[bytes, Dict[str, Any]]:
+    """Encoded header plus its per-array entries, given each array's ``(dtype, shape)``."""
+    header = dict(header, arrays={})
+    # Offsets depend on the header length, which depends on the offsets; reserve a
+    # fixed-width field per offset so one pass settles both.
+    for name, (dtype, shape) in specs.items():
+        header["arrays"][name] = {"dtype": dtype.str, "shape": list(shape), "offset": 10**15}
+    encoded = json.dumps(header).encode()
+    offset = _aligned(_PREFIX.size + len(encoded))
+    for name, (dtype, shape) in specs.items():
+        header["arrays"][name]["offset"] = offset
+        offset = _aligned(offset + dtype.itemsize * int(np.prod(shape)))
+    return json.dumps(header).encode().ljust(len(encoded)), header["arrays"]
+
+
+def write_arrays(path: str | Path, magic: bytes, header: Dict[str, Any], arrays: Mapping[str, np.ndarray]) -> None:
+    """Write ``header`` and the contiguous little-endian ``arrays`` in the aligned layout."""
+    arrays = {name: np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<")) for name, array in arrays.items()}
+    encoded, layout = _layout(header, {name: (array.dtype, array.shape) for name, array in arrays.items()})
+    with open(path, "wb") as handle:
+        handle.write(_PREFIX.pack(magic, len(encoded)))
+        handle.write(encoded)
+        for name, array in arrays.items():
+            handle.write(b"\0" * (layout[name]["offset"] - handle.tell()))
+            handle.write(array.tobytes())
+
+
+def write_spooled_arrays(
+    path: str | Path, magic: bytes, header: Dict[str, Any], spools: Mapping[str, Tuple[np.dtype, BinaryIO]]
+) -> None:
+    """
+    Like ``write_arrays`` for 1-D columns already written, little-endian, to binary
+    files; each is copied in chunks, so no column is ever held in memory whole.
+    """
+    specs = {}
+    for name, (dtype, spool) in spools.items():
+        dtype = np.dtype(dtype).newbyteorder("<")
+        specs[name] = (dtype, (spool.seek(0, os.SEEK_END) // dtype.itemsize,))
+    encoded, layout = _layout(header, specs)
+    with open(path, "wb") as handle:
+        handle.write(_PREFIX.pack(magic, len(encoded)))
+        handle.write(encoded)
+        for name, (_, spool) in spools.items():
+            handle.write(b"\0" * (layout[name]["offset"] - handle.tell()))
+            spool.seek(0)
+            shutil.copyfileobj(spool, handle)
+
+
+def read_header(path: str | Path, magic: bytes = DATASET_MAGIC) -> Dict[str, Any]:
+    with open(path, "rb") as handle:
+        found, length = _PREFIX.unpack(handle.read(_PREFIX.size))
+        if found != magic:
+            raise ValueError(f"{path} is not a {magic.rstrip(bytes(1)).decode()} file")
+        return json.loads(handle.read(length))
+
+
+def read_arrays(path: str | Path, magic: bytes, mmap: bool = True) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Header and arrays of a file; with ``mmap`` the arrays are read-only views of the file."""
+    header = read_header(path, magic)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape))
+        if mmap and count:
+            arrays[name] = np.memmap(path, dtype=spec["dtype"], mode="r", offset=spec["offset"], shape=shape)
+        else:
+            with open(path, "rb") as handle:
+                handle.seek(spec["offset"])
+                arrays[name] = np.fromfile(handle, dtype=spec["dtype"], count=count).reshape(shape)
+    return header, arrays
+
+
+@timed("ugp.io.write_columnar")
+def write_columnar(dataset: ColumnarDataset, path: str | Path) -> None:
+    header = {
+        "rows": len(dataset),
+        "oxides": list(dataset.oxides),
+        "mineral_names": list(dataset.mineral_names),
+        "sample_metadata": [asdict(meta) for meta in dataset.sample_metadata],
+        "reference_frame": dataset.reference_frame,
+    }
+    arrays = {
+        "values": np.asarray(dataset.values, dtype=np.float64),
+        "minerals": np.asarray(dataset.minerals, dtype=np.int32),
+        "samples": np.asarray(dataset.samples, dtype=np.int32),
+    }
+    write_arrays(path, DATASET_MAGIC, header, arrays)
+
+
+@timed("ugp.io.read_columnar")
+def read_columnar(path: str | Path, mmap: bool = True) -> ColumnarDataset:
+    header, arrays = read_arrays(path, DATASET_MAGIC, mmap)
+    return ColumnarDataset(
+        oxides=tuple(header["oxides"]),
+        values=arrays["values"],
+        minerals=arrays["minerals"],
+        mineral_names=tuple(header["mineral_names"]),
+        samples=arrays["samples"],
+        sample_metadata=tuple(SampleMetadata(**meta) for meta in header["sample_metadata"]),
+        reference_frame=header["reference_frame"],
+    )
+
+
+@dataclass
+class ResultColumns:
+    """
+    Column view of a ``.ugpr`` ensemble. ``methods`` and ``provenance`` are integer
+    codes into the ``method_names`` and ``provenance_table`` dictionaries.
+    """
+
+    pressure_gpa: np.ndarray
+    temperature_c: np.ndarray
+    methods: np.ndarray
+    method_names: List[str]
+    provenance: np.ndarray
+    provenance_table: List[Dict[str, Any]]
+    summary: Dict[str, Any] = field(default_factory=dict)
+    diagnostics: Dict[str, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return int(self.pressure_gpa.shape[0])
+
+    def to_ensemble(self) -> PTEnsemble:
+        points = [
+            PTPoint(
+                pressure_gpa=float(p),
+                temperature_c=float(t),
+                method=self.method_names[m],
+                provenance=dict(self.provenance_table[v]),
+            )
+            for p, t, m, v in zip(self.pressure_gpa, self.temperature_c, self.methods, self.provenance)
+        ]
+        return PTEnsemble(results=points, summary=self.summary, diagnostics=self.diagnostics)
+
+
+def result_header(
+    rows: int,
+    method_names: List[str],
+    provenance_table: List[Dict[str, Any]],
+    summary: Dict[str, Any],
+    diagnostics: Dict[str, Any],
+) -> Dict[str, Any]:
+    return {
+        "rows": rows,
+        "method_names": method_names,
+        "provenance_table": provenance_table,
+        "summary": summary,
+        "diagnostics": diagnostics,
+    }
+
+
+@timed("ugp.io.write_result_columns")
+def write_result_columns(columns: ResultColumns, path: str | Path) -> None:
+    header = result_header(
+        len(columns), columns.method_names, columns.provenance_table, columns.summary, columns.diagnostics
+    )
+    arrays = {name: np.asarray(getattr(columns, name), dtype=dtype) for name, dtype in RESULT_COLUMNS.items()}
+    write_arrays(path, RESULT_MAGIC, header, arrays)
+
+
+def read_result_columns(path: str | Path, mmap: bool = True) -> ResultColumns:
+    header, arrays = read_arrays(path, RESULT_MAGIC, mmap)
+    return ResultColumns(
+        pressure_gpa=arrays["pressure_gpa"],
+        temperature_c=arrays["temperature_c"],
+        methods=arrays["methods"],
+        method_names=header["method_names"],
+        provenance=arrays["provenance"],
+        provenance_table=header["provenance_table"],
+        summary=header["summary"],
+        diagnostics=header["diagnostics"],
+    )
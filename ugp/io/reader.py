@@ -1,34 +1,285 @@
+import csv
 import json
 from pathlib import Path
-from typing import Callable, Dict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
 
-from ugp.models import MineralAnalysis, SampleMetadata, ThermoDataset
+import numpy as np
+
+from thanimampro_telemetry import timed
+from ugp.io.binary import read_columnar, read_result_columns
+from ugp.models import ColumnarDataset, MineralAnalysis, PTEnsemble, PTPoint, SampleMetadata, ThermoDataset
+
+DEFAULT_CHUNK_SIZE = 10_000
+METADATA_FIELDS = ("sample_id", "rock_name", "location", "comments")
+
+
+def _analysis_from_entry(entry: Mapping[str, Any]) -> MineralAnalysis:
+    return MineralAnalysis(
+        mineral=entry["mineral"],
+        oxides_wt_pct=entry["oxides_wt_pct"],
+        metadata=SampleMetadata(**entry["metadata"]),
+    )
+
+
+def _chunked(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _ColumnarBuilder:
+    """
+    Accumulates analyses into column blocks without creating per-analysis objects.
+
+    Oxides may appear part-way through a stream; earlier blocks are padded with
+    NaN for them when the dataset is built.
+    """
+
+    def __init__(self, reference_frame: str = "wt%", block_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.reference_frame = reference_frame
+        self.block_size = block_size
+        self._oxides: Dict[str, int] = {}
+        self._minerals: Dict[str, int] = {}
+        self._samples: Dict[Tuple[Any, ...], int] = {}
+        self._blocks: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._pending: List[Tuple[Dict[int, float], int, int]] = []
+
+    def _sample_code(self, metadata: Mapping[str, Any]) -> int:
+        identity = tuple(metadata.get(name) for name in METADATA_FIELDS)
+        return self._samples.setdefault(identity, len(self._samples))
+
+    def add_entry(self, mineral: str, oxides: Mapping[str, float], metadata: Mapping[str, Any]) -> None:
+        row = {self._oxides.setdefault(name, len(self._oxides)): float(value) for name, value in oxides.items()}
+        self._pending.append(
+            (row, self._minerals.setdefault(mineral, len(self._minerals)), self._sample_code(metadata))
+        )
+        if len(self._pending) >= self.block_size:
+            self._flush()
+
+    def add_block(
+        self,
+        oxides: Sequence[str],
+        values: np.ndarray,
+        minerals: Sequence[str],
+        metadata: Sequence[Mapping[str, Any]],
+    ) -> None:
+        self._flush()
+        columns = [self._oxides.setdefault(name, len(self._oxides)) for name in oxides]
+        block = np.full((values.shape[0], len(self._oxides)), np.nan)
+        block[:, columns] = values
+        mineral_codes = np.array([self._minerals.setdefault(m, len(self._minerals)) for m in minerals], dtype=np.int32)
+        sample_codes = np.array([self._sample_code(meta) for meta in metadata], dtype=np.int32)
+        self._blocks.append((block, mineral_codes, sample_codes))
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        block = np.full((len(self._pending), len(self._oxides)), np.nan)
+        for index, (row, _, _) in enumerate(self._pending):
+            if row:
+                block[index, list(row)] = list(row.values())
+        minerals = np.fromiter((m for _, m, _ in self._pending), dtype=np.int32, count=len(self._pending))
+        samples = np.fromiter((s for _, _, s in self._pending), dtype=np.int32, count=len(self._pending))
+        self._blocks.append((block, minerals, samples))
+        self._pending = []
+
+    def build(self) -> ColumnarDataset:
+        self._flush()
+        width = len(self._oxides)
+        values = np.full((sum(b.shape[0] for b, _, _ in self._blocks), width), np.nan)
+        start = 0
+        for block, _, _ in self._blocks:
+            values[start : start + block.shape[0], : block.shape[1]] = block
+            start += block.shape[0]
+        empty = np.empty(0, dtype=np.int32)
+        minerals = np.concatenate([m for _, m, _ in self._blocks]) if self._blocks else empty
+        samples = np.concatenate([s for _, _, s in self._blocks]) if self._blocks else empty
+        self._blocks = []
+        return ColumnarDataset(
+            oxides=tuple(self._oxides),
+            values=values,
+            minerals=minerals,
+            mineral_names=tuple(self._minerals),
+            samples=samples,
+            sample_metadata=tuple(SampleMetadata(*identity) for identity in self._samples),
+            reference_frame=self.reference_frame,
+        )
 
 
 def _read_json(path: Path) -> ThermoDataset:
     payload = json.loads(path.read_text())
-    analyses = []
-    for entry in payload.get("analyses", []):
-        meta = SampleMetadata(**entry["metadata"])
-        analyses.append(
-            MineralAnalysis(
-                mineral=entry["mineral"],
-                oxides_wt_pct=entry["oxides_wt_pct"],
-                metadata=meta,
-            )
-        )
+    analyses = [_analysis_from_entry(entry) for entry in payload.get("analyses", [])]
     return ThermoDataset(analyses=analyses, reference_frame=payload.get("reference", "wt%"))
 
 
-_READERS: Dict[str, Callable[[Path], ThermoDataset]] = {
+def _iter_json(path: Path, chunk_size: int) -> Iterator[List[MineralAnalysis]]:
+    # Plain JSON has to be parsed whole; use NDJSON for exports that do not fit in memory.
+    yield from _chunked(_read_json(path).analyses, chunk_size)
+
+
+def _ndjson_entries(path: Path) -> Iterator[Dict[str, Any]]:
+    """Analysis entries, one JSON object per line; a ``{"reference": ...}`` line sets the frame."""
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _ndjson_reference(path: Path) -> str:
+    for entry in _ndjson_entries(path):
+        return entry.get("reference", "wt%") if "mineral" not in entry else "wt%"
+    return "wt%"
+
+
+def _iter_ndjson(path: Path, chunk_size: int) -> Iterator[List[MineralAnalysis]]:
+    entries = (_analysis_from_entry(entry) for entry in _ndjson_entries(path) if "mineral" in entry)
+    yield from _chunked(entries, chunk_size)
+
+
+def _read_ndjson(path: Path) -> ColumnarDataset:
+    builder = _ColumnarBuilder(_ndjson_reference(path))
+    for entry in _ndjson_entries(path):
+        if "mineral" in entry:
+            builder.add_entry(entry["mineral"], entry["oxides_wt_pct"], entry["metadata"])
+    return builder.build()
+
+
+def _csv_blocks(path: Path, chunk_size: int) -> Iterator[Tuple[List[str], np.ndarray, List[str], List[Dict[str, Any]]]]:
+    """
+    Yield ``(oxides, values, minerals, metadata)`` blocks from a CSV export.
+
+    Expected columns: ``mineral``, ``sample_id``, optionally the other metadata
+    fields, and one column per oxide. Empty oxide cells mean "not reported".
+    """
+    with open(path, "r", newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        header = [name.strip() for name in next(reader)]
+        if "mineral" not in header or "sample_id" not in header:
+            raise ValueError(f"{path}: CSV needs 'mineral' and 'sample_id' columns")
+        mineral_col = header.index("mineral")
+        meta_cols = [(name, header.index(name)) for name in METADATA_FIELDS if name in header]
+        oxide_cols = [i for i, name in enumerate(header) if name != "mineral" and name not in METADATA_FIELDS]
+        oxides = [header[i] for i in oxide_cols]
+        for rows in _chunked((row for row in reader if row), chunk_size):
+            values = np.array(
+                [[row[i].strip() or "nan" for i in oxide_cols] for row in rows], dtype=float
+            ).reshape(len(rows), len(oxide_cols))
+            metadata = [{name: (row[i] or None) for name, i in meta_cols} for row in rows]
+            yield oxides, values, [row[mineral_col] for row in rows], metadata
+
+
+def _iter_csv(path: Path, chunk_size: int) -> Iterator[List[MineralAnalysis]]:
+    for oxides, values, minerals, metadata in _csv_blocks(path, chunk_size):
+        chunk = []
+        for row, mineral, meta in zip(values, minerals, metadata):
+            present = ~np.isnan(row)
+            chunk.append(
+                MineralAnalysis(
+                    mineral=mineral,
+                    oxides_wt_pct={oxides[i]: float(row[i]) for i in np.flatnonzero(present)},
+                    metadata=SampleMetadata(**meta),
+                )
+            )
+        yield chunk
+
+
+def _read_csv(path: Path) -> ColumnarDataset:
+    builder = _ColumnarBuilder()
+    for block in _csv_blocks(path, DEFAULT_CHUNK_SIZE):
+        builder.add_block(*block)
+    return builder.build()
+
+
+def _read_binary(path: Path) -> ColumnarDataset:
+    return read_columnar(path, mmap=True)
+
+
+def _iter_binary(path: Path, chunk_size: int) -> Iterator[List[MineralAnalysis]]:
+    analyses = read_columnar(path, mmap=True).analyses
+    for start in range(0, len(analyses), chunk_size):
+        yield analyses[start : start + chunk_size]
+
+
+_READERS: Dict[str, Callable[[Path], ThermoDataset | ColumnarDataset]] = {
     ".json": _read_json,
+    ".ndjson": _read_ndjson,
+    ".jsonl": _read_ndjson,
+    ".csv": _read_csv,
+    ".ugpc": _read_binary,
+}
+DATASET_SUFFIXES = tuple(_READERS)
+
+_CHUNK_READERS: Dict[str, Callable[[Path, int], Iterator[List[MineralAnalysis]]]] = {
+    ".json": _iter_json,
+    ".ndjson": _iter_ndjson,
+    ".jsonl": _iter_ndjson,
+    ".csv": _iter_csv,
+    ".ugpc": _iter_binary,
 }
 
 
-def read_dataset(path: str) -> ThermoDataset:
+def _lookup(registry: Dict[str, Callable], path: str | Path) -> Tuple[Callable, Path]:
     file_path = Path(path)
-    reader = _READERS.get(file_path.suffix.lower())
+    reader = registry.get(file_path.suffix.lower())
     if not reader:
         raise ValueError(f"No reader for extension '{file_path.suffix}'")
+    return reader, file_path
+
+
+@timed("ugp.io.read_dataset")
+def read_dataset(path: str) -> ThermoDataset | ColumnarDataset:
+    """
+    Load a dataset. JSON gives a ThermoDataset; the streaming formats (NDJSON,
+    CSV, ``.ugpc``) load straight into a ColumnarDataset without building one
+    object per analysis, and ``.ugpc`` arrays are memory-mapped.
+    """
+    reader, file_path = _lookup(_READERS, path)
     return reader(file_path)
 
+
+def load_columnar(path: str) -> ColumnarDataset:
+    return ColumnarDataset.from_dataset(read_dataset(path))
+
+
+def iter_analyses(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[MineralAnalysis]]:
+    """Stream a dataset as lists of at most ``chunk_size`` analyses."""
+    reader, file_path = _lookup(_CHUNK_READERS, path)
+    return reader(file_path, chunk_size)
+
+
+def ensemble_from_dict(payload: Dict[str, Any]) -> PTEnsemble:
+    return PTEnsemble(
+        results=[PTPoint(**entry) for entry in payload.get("results", [])],
+        summary=payload.get("summary", {}),
+        diagnostics=payload.get("diagnostics", {}),
+    )
+
+
+def _read_result_ndjson(path: Path) -> PTEnsemble:
+    result = PTEnsemble(results=[])
+    for entry in _ndjson_entries(path):
+        if "summary" in entry:
+            result.summary, result.diagnostics = entry["summary"], entry.get("diagnostics", {})
+        else:
+            result.results.append(PTPoint(**entry))
+    return result
+
+
+_RESULT_READERS: Dict[str, Callable[[Path], PTEnsemble]] = {
+    ".json": lambda path: ensemble_from_dict(json.loads(path.read_text())),
+    ".ndjson": _read_result_ndjson,
+    ".jsonl": _read_result_ndjson,
+    ".ugpr": lambda path: read_result_columns(path).to_ensemble(),
+}
+
+
+@timed("ugp.io.read_result")
+def read_result(path: str) -> PTEnsemble:
+    """Load a result file written by ``ugp.io.writer`` (JSON, NDJSON or ``.ugpr``)."""
+    reader, file_path = _lookup(_RESULT_READERS, path)
+    return reader(file_path)
@@ -1,23 +1,217 @@
 import json
+import tempfile
+from abc import ABC, abstractmethod
+from array import array
 from pathlib import Path
-from typing import Dict
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Optional, TextIO
 
-from ugp.models import PTEnsemble
+import numpy as np
 
+from thanimampro_telemetry import timed
+from ugp.io.binary import RESULT_COLUMNS, RESULT_MAGIC, result_header, write_spooled_arrays
+from ugp.models import PTEnsemble, PTPoint
 
-def write_json(result: PTEnsemble, path: str) -> None:
-    payload: Dict[str, object] = {
+# Points a ColumnarResultWriter holds before spilling them to disk (1.5 MiB).
+FLUSH_ROWS = 65_536
+
+
+def _point_to_dict(point: PTPoint) -> Dict[str, object]:
+    return {
+        "pressure_gpa": point.pressure_gpa,
+        "temperature_c": point.temperature_c,
+        "method": point.method,
+        "provenance": point.provenance,
+    }
+
+
+def ensemble_to_dict(result: PTEnsemble) -> Dict[str, object]:
+    return {
         "summary": result.summary,
         "diagnostics": result.diagnostics,
-        "results": [
-            {
-                "pressure_gpa": p.pressure_gpa,
-                "temperature_c": p.temperature_c,
-                "method": p.method,
-                "provenance": p.provenance,
-            }
-            for p in result.results
-        ],
+        "results": [_point_to_dict(p) for p in result.results],
     }
-    Path(path).write_text(json.dumps(payload, indent=2))
 
+
+class ResultWriter(ABC):
+    """
+    Incremental result writer: call ``write_points`` as points are produced and
+    ``close`` with the summary once it is known. Usable as a bootstrap sink.
+
+    As a context manager it closes the writer on normal exit and, if the block
+    raises, removes the partly written file instead.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.count = 0
+        self.closed = False
+
+    @abstractmethod
+    def write_points(self, points: Iterable[PTPoint]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self, summary: Optional[Dict[str, Any]] = None, diagnostics: Optional[Dict[str, Any]] = None) -> None:
+        raise NotImplementedError
+
+    def _release(self) -> None:
+        """Close open handles without finishing the file."""
+
+    def abort(self) -> None:
+        """Stop writing and delete the partial file."""
+        self._release()
+        self.closed = True
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if self.closed:
+            return
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class _TextResultWriter(ResultWriter):
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._handle: TextIO = open(self.path, "w", encoding="utf-8")
+
+    def _release(self) -> None:
+        self._handle.close()
+
+
+class JSONResultWriter(_TextResultWriter):
+    """Writes ``{"results": [...], "summary": ..., "diagnostics": ...}`` one point at a time."""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._handle.write('{"results": [')
+
+    def write_points(self, points: Iterable[PTPoint]) -> None:
+        for point in points:
+            self._handle.write(("," if self.count else "") + "\n  " + json.dumps(_point_to_dict(point)))
+            self.count += 1
+
+    def close(self, summary: Optional[Dict[str, Any]] = None, diagnostics: Optional[Dict[str, Any]] = None) -> None:
+        self._handle.write(f'\n],\n"summary": {json.dumps(summary or {}, indent=2)},\n')
+        self._handle.write(f'"diagnostics": {json.dumps(diagnostics or {}, indent=2)}\n}}\n')
+        self._handle.close()
+        self.closed = True
+
+
+class NDJSONResultWriter(_TextResultWriter):
+    """One point per line, flushed as written; the last line holds the summary and diagnostics."""
+
+    def write_points(self, points: Iterable[PTPoint]) -> None:
+        for point in points:
+            self._handle.write(json.dumps(_point_to_dict(point)) + "\n")
+            self.count += 1
+        self._handle.flush()
+
+    def close(self, summary: Optional[Dict[str, Any]] = None, diagnostics: Optional[Dict[str, Any]] = None) -> None:
+        self._handle.write(json.dumps({"summary": summary or {}, "diagnostics": diagnostics or {}}) + "\n")
+        self._handle.close()
+        self.closed = True
+
+
+class ColumnarResultWriter(ResultWriter):
+    """
+    Writes a ``.ugpr`` file of packed float64/int32 columns (24 bytes per point)
+    with dictionary-encoded method and provenance.
+
+    Points are buffered ``FLUSH_ROWS`` at a time and then spilled to one temporary
+    file per column beside ``path``. The header needs the final row count, so
+    ``close`` writes it and copies the columns in after it; memory stays at one
+    block plus the method and provenance dictionaries.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._spools: Dict[str, BinaryIO] = {
+            name: tempfile.TemporaryFile(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".part")
+            for name in RESULT_COLUMNS
+        }
+        self._blocks: Dict[str, array] = {}
+        self._method_codes: Dict[str, int] = {}
+        self._provenance_codes: Dict[str, int] = {}
+        self._provenance_table: list = []
+        self._new_block()
+
+    def _new_block(self) -> None:
+        self._blocks = {
+            "pressure_gpa": array("d"),
+            "temperature_c": array("d"),
+            "methods": array("i"),
+            "provenance": array("i"),
+        }
+
+    def _flush(self) -> None:
+        for name, block in self._blocks.items():
+            on_disk = np.dtype(RESULT_COLUMNS[name]).newbyteorder("<")
+            np.frombuffer(block, dtype=block.typecode).astype(on_disk).tofile(self._spools[name])
+        self._new_block()
+
+    def write_points(self, points: Iterable[PTPoint]) -> None:
+        blocks = self._blocks
+        for point in points:
+            blocks["pressure_gpa"].append(point.pressure_gpa)
+            blocks["temperature_c"].append(point.temperature_c)
+            blocks["methods"].append(self._method_codes.setdefault(point.method, len(self._method_codes)))
+            key = json.dumps(point.provenance, sort_keys=True)
+            code = self._provenance_codes.get(key)
+            if code is None:
+                code = self._provenance_codes[key] = len(self._provenance_table)
+                self._provenance_table.append(point.provenance)
+            blocks["provenance"].append(code)
+            self.count += 1
+            if len(blocks["provenance"]) >= FLUSH_ROWS:
+                self._flush()
+                blocks = self._blocks
+
+    def _release(self) -> None:
+        for spool in self._spools.values():
+            spool.close()
+
+    def close(self, summary: Optional[Dict[str, Any]] = None, diagnostics: Optional[Dict[str, Any]] = None) -> None:
+        self._flush()
+        header = result_header(
+            self.count, list(self._method_codes), self._provenance_table, summary or {}, diagnostics or {}
+        )
+        spools = {name: (np.dtype(dtype), self._spools[name]) for name, dtype in RESULT_COLUMNS.items()}
+        write_spooled_arrays(self.path, RESULT_MAGIC, header, spools)
+        self._release()
+        self.closed = True
+
+
+_WRITERS: Dict[str, Callable[[Path], ResultWriter]] = {
+    ".json": JSONResultWriter,
+    ".ndjson": NDJSONResultWriter,
+    ".jsonl": NDJSONResultWriter,
+    ".ugpr": ColumnarResultWriter,
+}
+
+
+def open_result_writer(path: str | Path) -> ResultWriter:
+    """Streaming writer for ``path``, chosen by its extension."""
+    file_path = Path(path)
+    writer = _WRITERS.get(file_path.suffix.lower())
+    if not writer:
+        raise ValueError(f"No writer for extension '{file_path.suffix}'")
+    return writer(file_path)
+
+
+@timed("ugp.io.write_result")
+def write_result(result: PTEnsemble, path: str | Path) -> None:
+    with open_result_writer(path) as writer:
+        writer.write_points(result.results)
+        writer.close(result.summary, result.diagnostics)
+
+
+def write_json(result: PTEnsemble, path: str) -> None:
+    with JSONResultWriter(path) as writer:
+        writer.write_points(result.results)
+        writer.close(result.summary, result.diagnostics)
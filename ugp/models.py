@@ -1,5 +1,8 @@
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections.abc import Sequence as SequenceABC
+from dataclasses import astuple, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 @dataclass
@@ -23,6 +26,137 @@ class ThermoDataset:
     reference_frame: str = "wt%"
 
 
+class AnalysisView(SequenceABC):
+    """Read-only sequence of ``MineralAnalysis`` objects built on access from a ColumnarDataset."""
+
+    def __init__(self, dataset: "ColumnarDataset") -> None:
+        self._dataset = dataset
+
+    def __len__(self) -> int:
+        return len(self._dataset)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        data = self._dataset
+        row = data.values[index]
+        present = ~np.isnan(row)
+        return MineralAnalysis(
+            mineral=data.mineral_names[data.minerals[index]],
+            oxides_wt_pct={data.oxides[i]: float(row[i]) for i in np.flatnonzero(present)},
+            metadata=data.sample_metadata[data.samples[index]],
+        )
+
+
+@dataclass
+class ColumnarDataset:
+    """
+    Array-backed dataset: one row per analysis, one column per oxide.
+
+    Oxides not reported for an analysis are NaN. Minerals and samples are integer
+    codes into ``mineral_names`` and ``sample_metadata``, so each distinct name and
+    metadata record is stored once. ``analyses`` gives the familiar per-analysis
+    view lazily, which lets a ColumnarDataset stand in for a ThermoDataset.
+    """
+
+    oxides: Tuple[str, ...]
+    values: np.ndarray
+    minerals: np.ndarray
+    mineral_names: Tuple[str, ...]
+    samples: np.ndarray
+    sample_metadata: Tuple[SampleMetadata, ...]
+    reference_frame: str = "wt%"
+
+    def __eq__(self, other: object) -> bool:
+        # The generated __eq__ compares arrays with ``==``, whose truth value is ambiguous.
+        if not isinstance(other, ColumnarDataset):
+            return NotImplemented
+        return (
+            self.oxides == other.oxides
+            and self.mineral_names == other.mineral_names
+            and self.sample_metadata == other.sample_metadata
+            and self.reference_frame == other.reference_frame
+            and np.array_equal(self.values, other.values, equal_nan=True)
+            and np.array_equal(self.minerals, other.minerals)
+            and np.array_equal(self.samples, other.samples)
+        )
+
+    def __len__(self) -> int:
+        return int(self.values.shape[0])
+
+    @property
+    def analyses(self) -> AnalysisView:
+        return AnalysisView(self)
+
+    @property
+    def sample_ids(self) -> np.ndarray:
+        return np.array([meta.sample_id for meta in self.sample_metadata], dtype=object)[self.samples]
+
+    def column(self, oxide: str) -> np.ndarray:
+        return self.values[:, self.oxides.index(oxide)]
+
+    def mineral_mask(self, mineral: str) -> np.ndarray:
+        if mineral not in self.mineral_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.minerals == self.mineral_names.index(mineral)
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> "ColumnarDataset":
+        """Rows at ``indices`` (repeats allowed, as in a bootstrap resample); categories are shared."""
+        indices = np.asarray(indices, dtype=np.intp)
+        return ColumnarDataset(
+            oxides=self.oxides,
+            values=self.values[indices],
+            minerals=self.minerals[indices],
+            mineral_names=self.mineral_names,
+            samples=self.samples[indices],
+            sample_metadata=self.sample_metadata,
+            reference_frame=self.reference_frame,
+        )
+
+    @classmethod
+    def from_analyses(cls, analyses: Iterable[MineralAnalysis], reference_frame: str = "wt%") -> "ColumnarDataset":
+        oxide_index: Dict[str, int] = {}
+        mineral_index: Dict[str, int] = {}
+        sample_index: Dict[tuple, int] = {}
+        sample_metadata: List[SampleMetadata] = []
+        rows: List[Dict[int, float]] = []
+        minerals: List[int] = []
+        samples: List[int] = []
+        for analysis in analyses:
+            rows.append(
+                {oxide_index.setdefault(oxide, len(oxide_index)): value for oxide, value in analysis.oxides_wt_pct.items()}
+            )
+            minerals.append(mineral_index.setdefault(analysis.mineral, len(mineral_index)))
+            identity = astuple(analysis.metadata)
+            if identity not in sample_index:
+                sample_index[identity] = len(sample_metadata)
+                sample_metadata.append(analysis.metadata)
+            samples.append(sample_index[identity])
+
+        values = np.full((len(rows), len(oxide_index)), np.nan)
+        for row, entries in enumerate(rows):
+            if entries:
+                values[row, list(entries)] = list(entries.values())
+        return cls(
+            oxides=tuple(oxide_index),
+            values=values,
+            minerals=np.array(minerals, dtype=np.int32),
+            mineral_names=tuple(mineral_index),
+            samples=np.array(samples, dtype=np.int32),
+            sample_metadata=tuple(sample_metadata),
+            reference_frame=reference_frame,
+        )
+
+    @classmethod
+    def from_dataset(cls, dataset: "ThermoDataset | ColumnarDataset") -> "ColumnarDataset":
+        if isinstance(dataset, ColumnarDataset):
+            return dataset
+        return cls.from_analyses(dataset.analyses, dataset.reference_frame)
+
+    def to_dataset(self) -> "ThermoDataset":
+        return ThermoDataset(analyses=list(self.analyses), reference_frame=self.reference_frame)
+
+
 @dataclass
 class PTPoint:
     pressure_gpa: float
@@ -43,4 +177,9 @@ class UncertaintyConfig:
     bootstrap_iterations: int = 200
     confidence: float = 0.95
     random_seed: Optional[int] = None
+    workers: int = 1
+    executor: str = "process"
+    chunk_size: Optional[int] = None
+    interval: str = "percentile"
+    keep_runs: bool = False
 
@@ -1,34 +1,223 @@
-import random
-from statistics import mean, pstdev
-from typing import List
+import hashlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
 
-from ugp.models import PTEnsemble, PTPoint, ThermoDataset, UncertaintyConfig
+import numpy as np
 
+import thanimampro_telemetry as telemetry
+from ugp.models import ColumnarDataset, PTEnsemble, PTPoint, ThermoDataset, UncertaintyConfig
+from ugp.uncertainty.stats import EnsembleAccumulator, jackknife_acceleration
 
-def _resample_dataset(dataset: ThermoDataset) -> ThermoDataset:
-    picked = [random.choice(dataset.analyses) for _ in dataset.analyses]
-    return ThermoDataset(analyses=picked, reference_frame=dataset.reference_frame)
+EXECUTORS = ("serial", "thread", "process")
+INTERVALS = ("percentile", "bca")
+JACKKNIFE_GROUPS = 50
 
+# Per-process state for pool workers, set once by the initializer so each chunk
+# only ships its seeds instead of re-pickling the engine and dataset.
+_WORKER_STATE: Optional[Tuple[Any, ThermoDataset]] = None
 
-def bootstrap_ensemble(engine, dataset: ThermoDataset, config: UncertaintyConfig) -> PTEnsemble:
-    if config.random_seed is not None:
-        random.seed(config.random_seed)
 
-    runs: List[PTPoint] = []
-    for _ in range(config.bootstrap_iterations):
-        resampled = _resample_dataset(dataset)
-        result = engine.run(resampled)
-        runs.extend(result.results)
+def iteration_streams(seed: Optional[int], iterations: int) -> List[np.random.SeedSequence]:
+    """One independent child stream per bootstrap iteration, spawned from ``seed``."""
+    return np.random.SeedSequence(seed).spawn(iterations)
 
-    pressures = [r.pressure_gpa for r in runs]
-    temps = [r.temperature_c for r in runs]
+
+def resample_indices(streams: Sequence[np.random.SeedSequence], size: int) -> np.ndarray:
+    """One row of ``size`` with-replacement draws per stream, shape ``(len(streams), size)``."""
+    indices = np.empty((len(streams), size), dtype=np.intp)
+    for row, stream in enumerate(streams):
+        indices[row] = np.random.default_rng(stream).integers(0, size, size=size)
+    return indices
+
+
+def _resample_dataset(dataset: ThermoDataset | ColumnarDataset, picks: np.ndarray) -> ThermoDataset | ColumnarDataset:
+    if isinstance(dataset, ColumnarDataset):
+        return dataset.take(picks)
+    analyses = dataset.analyses
+    return ThermoDataset(analyses=[analyses[i] for i in picks.tolist()], reference_frame=dataset.reference_frame)
+
+
+def _run_iteration(engine, dataset: ThermoDataset, picks: np.ndarray) -> List[PTPoint]:
+    with telemetry.span("ugp.bootstrap.iteration"):
+        return engine.run(_resample_dataset(dataset, picks)).results
+
+
+def _run_chunk(engine, dataset: ThermoDataset, streams: Sequence[np.random.SeedSequence]) -> List[List[PTPoint]]:
+    indices = resample_indices(streams, len(dataset.analyses))
+    return [_run_iteration(engine, dataset, picks) for picks in indices]
+
+
+def _init_worker(engine, dataset: ThermoDataset) -> None:
+    global _WORKER_STATE
+    _WORKER_STATE = (engine, dataset)
+    telemetry.reset()  # drop measurements inherited from a forked parent
+
+
+def _run_chunk_in_worker(streams: Sequence[np.random.SeedSequence]) -> Tuple[List[List[PTPoint]], Optional[dict]]:
+    engine, dataset = _WORKER_STATE
+    points = _run_chunk(engine, dataset, streams)
+    # Worker-side spans travel back with the chunk so the parent's totals include them.
+    return points, telemetry.drain() if telemetry.enabled() else None
+
+
+def _chunk_size(config: UncertaintyConfig, workers: int) -> int:
+    if config.chunk_size:
+        return config.chunk_size
+    # About four chunks per worker keeps the pool busy without per-iteration overhead.
+    return max(1, -(-config.bootstrap_iterations // (4 * workers)))
+
+
+def _make_executor(config: UncertaintyConfig, workers: int, engine, dataset: ThermoDataset) -> Executor:
+    if config.executor == "process":
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine, dataset))
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def _compute_runs(
+    engine, dataset: ThermoDataset, config: UncertaintyConfig, streams: List[np.random.SeedSequence]
+) -> Iterator[List[PTPoint]]:
+    workers = max(1, config.workers)
+    size = _chunk_size(config, workers)
+    chunks = [streams[start : start + size] for start in range(0, len(streams), size)]
+    if config.executor == "serial" or workers == 1:
+        for chunk in chunks:
+            yield from _run_chunk(engine, dataset, chunk)
+        return
+
+    with _make_executor(config, workers, engine, dataset) as pool:
+        if config.executor == "process":
+            for chunk_points, measurements in pool.map(_run_chunk_in_worker, chunks):
+                telemetry.merge(measurements)
+                yield from chunk_points
+        else:
+            for chunk_points in pool.map(lambda chunk: _run_chunk(engine, dataset, chunk), chunks):
+                yield from chunk_points
+
+
+def _iteration_key(cache_key: str, seed: int, index: int) -> str:
+    return hashlib.sha256(f"{cache_key}:{seed}:{index}".encode()).hexdigest()
+
+
+def iter_bootstrap_runs(
+    engine,
+    dataset: ThermoDataset,
+    config: UncertaintyConfig,
+    cache=None,
+    cache_key: Optional[str] = None,
+) -> Iterator[List[PTPoint]]:
+    """
+    Yield each bootstrap iteration's points, in iteration order.
+
+    Iteration ``i`` always resamples with the ``i``-th child of the seed sequence,
+    so the output is identical for any worker count, executor or chunk size. With
+    a ``cache`` (a ``ugp.core.cache.ResultCache``), a ``cache_key`` identifying the
+    dataset and engine, and a fixed seed, each iteration is stored as it finishes
+    and an interrupted run only recomputes the iterations it had not reached.
+    """
+    if config.executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor '{config.executor}', expected one of {EXECUTORS}")
+    if not dataset.analyses:
+        raise ValueError("Cannot bootstrap an empty dataset")
+    streams = iteration_streams(config.random_seed, config.bootstrap_iterations)
+    if cache is None or cache_key is None or config.random_seed is None:
+        yield from _compute_runs(engine, dataset, config, streams)
+        return
+
+    keys = [_iteration_key(cache_key, config.random_seed, index) for index in range(len(streams))]
+    hits = [cache.has_points(key) for key in keys]
+    computed = _compute_runs(engine, dataset, config, [s for s, hit in zip(streams, hits) if not hit])
+    for index, (key, hit) in enumerate(zip(keys, hits)):
+        points = cache.get_points(key) if hit else None
+        if points is None:
+            # A miss comes from the pool; an entry that vanished since the check is redone inline.
+            points = next(computed) if not hit else _run_chunk(engine, dataset, [streams[index]])[0]
+            cache.put_points(key, points)
+        yield points
+
+
+def _estimate(points: Sequence[PTPoint]) -> np.ndarray:
+    return np.array([[p.pressure_gpa, p.temperature_c] for p in points], dtype=float).mean(axis=0)
+
+
+def _jackknife_acceleration(engine, dataset: ThermoDataset) -> np.ndarray:
+    """Per-variable BCa acceleration from a grouped leave-out jackknife (at most JACKKNIFE_GROUPS runs)."""
+    size = len(dataset.analyses)
+    groups = np.array_split(np.arange(size), min(size, JACKKNIFE_GROUPS))
+    if len(groups) < 2:
+        return np.zeros(2)
+    estimates = np.array(
+        [_estimate(engine.run(_resample_dataset(dataset, np.delete(np.arange(size), group))).results) for group in groups]
+    )
+    return np.array([jackknife_acceleration(estimates[:, column]) for column in range(2)])
+
+
+@telemetry.timed("ugp.bootstrap")
+def bootstrap_ensemble(
+    engine,
+    dataset: ThermoDataset,
+    config: UncertaintyConfig,
+    base: Optional[PTEnsemble] = None,
+    cache=None,
+    cache_key: Optional[str] = None,
+    sink=None,
+) -> PTEnsemble:
+    """
+    Bootstrap the engine over resampled datasets and summarise the P-T spread.
+
+    Statistics are accumulated as iterations finish, so memory does not grow with
+    the iteration count unless ``config.keep_runs`` asks for every point; otherwise
+    the returned results are the base (non-resampled) points. ``base`` reuses an
+    existing run on the full dataset instead of repeating it; ``cache`` and
+    ``cache_key`` are passed to ``iter_bootstrap_runs`` for seeded runs. A ``sink`` (e.g. a
+    ``ugp.io.writer.ResultWriter``) receives every iteration's points as they
+    arrive via ``write_points``, so full ensembles can go straight to disk.
+    """
+    if config.interval not in INTERVALS:
+        raise ValueError(f"Unknown interval method '{config.interval}', expected one of {INTERVALS}")
+    # Unseeded runs must draw fresh resamples, so their iterations are never cached
+    # (a key built from the substituted entropy below could never be hit again).
+    if config.random_seed is None:
+        cache = None
+    # Fix the entropy up front so an unseeded run is still reproducible from its diagnostics.
+    config = replace(config, random_seed=np.random.SeedSequence(config.random_seed).entropy)
+    if base is None:
+        base = engine.run(dataset)
+
+    accumulator = EnsembleAccumulator(base=_estimate(base.results) if base.results else None)
+    kept: List[PTPoint] = []
+    for points in iter_bootstrap_runs(engine, dataset, config, cache, cache_key):
+        accumulator.update([p.pressure_gpa for p in points], [p.temperature_c for p in points])
+        if sink is not None:
+            sink.write_points(points)
+        if config.keep_runs:
+            kept.extend(points)
+
+    acceleration = _jackknife_acceleration(engine, dataset) if config.interval == "bca" else None
+    intervals = accumulator.intervals(config.confidence, config.interval, acceleration)
+    mean = accumulator.moments.mean
+    std = accumulator.moments.std()
     summary = {
-        "p_mean_gpa": mean(pressures),
-        "p_std_gpa": pstdev(pressures) if len(pressures) > 1 else 0.0,
-        "t_mean_c": mean(temps),
-        "t_std_c": pstdev(temps) if len(temps) > 1 else 0.0,
+        "p_mean_gpa": float(mean[0]),
+        "p_std_gpa": float(std[0]),
+        "t_mean_c": float(mean[1]),
+        "t_std_c": float(std[1]),
+        "pt_covariance": float(accumulator.moments.covariance()[0, 1]),
+        "pt_correlation": float(accumulator.moments.correlation()[0, 1]),
+        "p_interval_gpa": list(intervals["pressure_gpa"]),
+        "t_interval_c": list(intervals["temperature_c"]),
+        "interval_method": config.interval,
+        "samples": accumulator.count,
         "iterations": config.bootstrap_iterations,
         "confidence": config.confidence,
     }
-    return PTEnsemble(results=runs, summary=summary, diagnostics={"bootstrap": True})
-
+    diagnostics = {
+        "bootstrap": True,
+        "executor": config.executor,
+        "workers": config.workers,
+        "random_seed": config.random_seed,
+        "runs_kept": config.keep_runs,
+    }
+    if acceleration is not None:
+        diagnostics["acceleration"] = acceleration.tolist()
+    return PTEnsemble(results=kept if config.keep_runs else list(base.results), summary=summary, diagnostics=diagnostics)
@@ -0,0 +1,217 @@
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+_NORMAL = NormalDist()
+
+
+class RunningMoments:
+    """
+    Online mean and co-moment matrix for ``dim`` variables (Welford / Chan et al.).
+
+    Batches are folded in with the pairwise update, so adding a chunk costs one
+    small matrix product and two accumulators can be merged exactly.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.count = 0
+        self.mean = np.zeros(dim)
+        self._comoment = np.zeros((dim, dim))
+
+    def update(self, rows: np.ndarray) -> None:
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        if not rows.shape[0]:
+            return
+        batch_mean = rows.mean(axis=0)
+        centered = rows - batch_mean
+        self._combine(rows.shape[0], batch_mean, centered.T @ centered)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count:
+            self._combine(other.count, other.mean, other._comoment)
+
+    def _combine(self, count: int, mean: np.ndarray, comoment: np.ndarray) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self._comoment = self._comoment + comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.mean = self.mean + delta * (count / total)
+        self.count = total
+
+    def covariance(self, ddof: int = 0) -> np.ndarray:
+        if self.count <= ddof:
+            return np.zeros_like(self._comoment)
+        return self._comoment / (self.count - ddof)
+
+    def std(self, ddof: int = 0) -> np.ndarray:
+        return np.sqrt(np.diag(self.covariance(ddof)))
+
+    def correlation(self) -> np.ndarray:
+        std = self.std()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.covariance() / np.outer(std, std)
+        return np.nan_to_num(corr)
+
+
+class QuantileSketch:
+    """
+    Bounded-memory, mergeable quantile estimator (a merging t-digest).
+
+    Values are buffered and periodically collapsed into weighted centroids whose
+    size limit shrinks towards the tails (the logistic ``k2`` scale), so extreme
+    quantiles stay accurate while memory is O(``compression``).
+    """
+
+    def __init__(self, compression: int = 200) -> None:
+        self.compression = compression
+        self.count = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer: list = []
+        self._buffer_weights: list = []
+        self._buffered = 0
+
+    def update(self, values: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        if not values.size:
+            return
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=float).ravel()
+        self._buffer.append(values)
+        self._buffer_weights.append(weights)
+        self._buffered += values.size
+        self.count += float(weights.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered > 5 * self.compression:
+            self._flush()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        other._flush()
+        if other.count:
+            self.update(other._means, other._weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def _flush(self) -> None:
+        if not self._buffered:
+            return
+        means = np.concatenate([self._means, *self._buffer])
+        weights = np.concatenate([self._weights, *self._buffer_weights])
+        self._buffer, self._buffer_weights, self._buffered = [], [], 0
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        # Bucket each entry by the k-scale value at its weight midpoint; one bucket
+        # spans at most one unit of k, which bounds every centroid's size. The
+        # logistic scale makes buckets shrink towards both tails.
+        total = weights.sum()
+        midpoints = (np.cumsum(weights) - weights / 2.0) / total
+        normalizer = 4.0 * np.log(max(total / self.compression, 1.0)) + 24.0
+        scale = self.compression / normalizer * np.log(midpoints / (1.0 - midpoints))
+        buckets = np.floor(scale - scale[0]).astype(np.intp)
+        bucket_weights = np.bincount(buckets, weights=weights)
+        filled = bucket_weights > 0
+        self._means = (np.bincount(buckets, weights=means * weights) / np.where(filled, bucket_weights, 1.0))[filled]
+        self._weights = bucket_weights[filled]
+
+    def quantile(self, q: float | Sequence[float]) -> np.ndarray:
+        self._flush()
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        positions = np.cumsum(self._weights) - self._weights / 2.0
+        knots = np.concatenate([[0.0], positions, [self.count]])
+        values = np.concatenate([[self.min], self._means, [self.max]])
+        return np.interp(np.clip(q, 0.0, 1.0) * self.count, knots, values)
+
+    def centroids(self) -> int:
+        self._flush()
+        return int(self._means.size)
+
+
+def percentile_interval(sketch: QuantileSketch, confidence: float) -> Tuple[float, float]:
+    alpha = (1.0 - confidence) / 2.0
+    low, high = sketch.quantile([alpha, 1.0 - alpha])
+    return float(low), float(high)
+
+
+def bias_correction(fraction_below: float, samples: int) -> float:
+    """z0 from the share of bootstrap replicates below the base estimate, kept finite."""
+    floor = 0.5 / max(samples, 1)
+    return _NORMAL.inv_cdf(min(max(fraction_below, floor), 1.0 - floor))
+
+
+def jackknife_acceleration(estimates: np.ndarray) -> float:
+    """BCa acceleration from leave-one(-group)-out estimates."""
+    estimates = np.asarray(estimates, dtype=float)
+    deviations = estimates.mean() - estimates
+    denominator = 6.0 * float(np.sum(deviations**2)) ** 1.5
+    return float(np.sum(deviations**3)) / denominator if denominator else 0.0
+
+
+def bca_interval(sketch: QuantileSketch, confidence: float, z0: float, acceleration: float) -> Tuple[float, float]:
+    """Bias-corrected and accelerated interval (Efron 1987) read off the sketch."""
+    alpha = (1.0 - confidence) / 2.0
+    levels = []
+    for tail in (alpha, 1.0 - alpha):
+        z = z0 + _NORMAL.inv_cdf(tail)
+        levels.append(_NORMAL.cdf(z0 + z / (1.0 - acceleration * z)))
+    low, high = sketch.quantile(levels)
+    return float(low), float(high)
+
+
+class EnsembleAccumulator:
+    """
+    Streaming pressure/temperature statistics for a bootstrap ensemble.
+
+    Holds running moments, one quantile sketch per variable and, when a base
+    estimate is given, the counts needed for the BCa bias correction.
+    """
+
+    variables = ("pressure_gpa", "temperature_c")
+
+    def __init__(self, base: Optional[Sequence[float]] = None, compression: int = 200) -> None:
+        self.moments = RunningMoments(2)
+        self.sketches = [QuantileSketch(compression), QuantileSketch(compression)]
+        self.base = None if base is None else np.asarray(base, dtype=float)
+        self._below = np.zeros(2)
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    def update(self, pressures: np.ndarray, temperatures: np.ndarray) -> None:
+        rows = np.column_stack([np.asarray(pressures, dtype=float), np.asarray(temperatures, dtype=float)])
+        self.moments.update(rows)
+        for column, sketch in enumerate(self.sketches):
+            sketch.update(rows[:, column])
+        if self.base is not None:
+            # Ties count half, as in the usual BCa definition.
+            self._below += (rows < self.base).sum(axis=0) + 0.5 * (rows == self.base).sum(axis=0)
+
+    def merge(self, other: "EnsembleAccumulator") -> None:
+        self.moments.merge(other.moments)
+        for mine, theirs in zip(self.sketches, other.sketches):
+            mine.merge(theirs)
+        self._below += other._below
+
+    def intervals(
+        self,
+        confidence: float,
+        method: str = "percentile",
+        acceleration: Optional[Sequence[float]] = None,
+    ) -> Dict[str, Tuple[float, float]]:
+        if method not in ("percentile", "bca"):
+            raise ValueError(f"Unknown interval method '{method}'")
+        if method == "bca" and self.base is None:
+            raise ValueError("BCa intervals need the base estimate")
+        accel = np.zeros(2) if acceleration is None else np.asarray(acceleration, dtype=float)
+        intervals = {}
+        for column, (name, sketch) in enumerate(zip(self.variables, self.sketches)):
+            if method == "bca":
+                z0 = bias_correction(self._below[column] / max(self.count, 1), self.count)
+                intervals[name] = bca_interval(sketch, confidence, z0, float(accel[column]))
+            else:
+                intervals[name] = percentile_interval(sketch, confidence)
+        return intervals